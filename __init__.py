@@ -3,11 +3,15 @@ import inspect
 import logging
 import os
 import re
+import time
 from os import walk
 from os.path import abspath, dirname, join, sep
 
 from signature_nodes.env import env
 
+from .background_loading import BackgroundImporter, PluginImportGraph, discover_nodes
+from .node_manifest import LazyNode, NodeManifest, make_lazy_mappings
+from .profiling import PluginLoadProfiler
 from .utils import parallel_for
 
 logger = logging.getLogger(__name__)
@@ -47,6 +51,14 @@ except ImportError:
 def get_node_class_mappings(nodes_directory: str):
     node_class_mappings = {}
     node_display_name_mappings = {}
+    failed_plugin_paths = set()
+
+    profiler = None
+    if os.getenv("PROFILE_NODE_LOADING", "False") == "True":
+        report_path = os.getenv(
+            "NODE_LOADING_PROFILE_PATH", join(dirname(abspath(__file__)), "node_loading_profile.json")
+        )
+        profiler = PluginLoadProfiler(report_path)
 
     plugin_file_paths = []
     for path, _, files in walk(nodes_directory):
@@ -65,8 +77,12 @@ def get_node_class_mappings(nodes_directory: str):
         if not NEUROCHAIN_AVAILABLE and plugin_rel_path.startswith("neurochain"):
             return {}, {}
 
+        record = profiler.start(plugin_rel_path) if profiler is not None else None
         try:
+            import_start = time.perf_counter()
             module = importlib.import_module("signature_nodes." + plugin_rel_path)
+            if record is not None:
+                record.import_time = time.perf_counter() - import_start
 
             for item in dir(module):
                 value = getattr(module, item)
@@ -90,20 +106,103 @@ def get_node_class_mappings(nodes_directory: str):
                     file_display_mappings[key] = f"SIG {item_name}"
         except ImportError as e:
             logger.info(f"[red]Error importing {plugin_rel_path}: {e}")
+            failed_plugin_paths.add(plugin_file_path)
+            if record is not None:
+                record.error = str(e)
+        finally:
+            if record is not None:
+                profiler.finish(record, len(file_class_mappings))
 
         return file_class_mappings, file_display_mappings
 
+    manifest = None
+    if os.getenv("LAZY_NODE_LOADING", "False") == "True":
+        manifest_path = os.getenv("NODE_MANIFEST_PATH", join(dirname(abspath(__file__)), ".node_manifest.json"))
+        fingerprint = {"signature_core": __version__, "neurochain": NEUROCHAIN_AVAILABLE}
+        manifest = NodeManifest.load(manifest_path, nodes_directory, fingerprint)
+
+    import_graph = None
+    if os.getenv("BACKGROUND_NODE_LOADING", "False") == "True":
+        import_graph = PluginImportGraph(nodes_directory)
+
+    plugin_results = {}
+    pending_file_paths = []
+    deferred_file_paths = []
+    uncached_deferred_paths = set()
+    for file_path in plugin_file_paths:
+        cached = manifest.lookup(file_path) if manifest is not None else None
+        if import_graph is not None and import_graph.is_heavy(file_path):
+            skipped = not NEUROCHAIN_AVAILABLE and import_graph.module_name(file_path).startswith(
+                "signature_nodes.neurochain"
+            )
+            discovered = None if skipped else discover_nodes(import_graph, file_path)
+            if cached is None and discovered is not None:
+                cached = make_lazy_mappings(discovered)
+                uncached_deferred_paths.add(file_path)
+            if cached is not None and not skipped:
+                deferred_file_paths.append(file_path)
+                plugin_results[file_path] = cached
+                continue
+        if cached is None:
+            pending_file_paths.append(file_path)
+        else:
+            plugin_results[file_path] = cached
+
     parallel_process = os.getenv("PARALLEL_PROCESSING", "False") == "True"
+    if parallel_process and profiler is not None:
+        logger.warning("PROFILE_NODE_LOADING processes plugin files sequentially, ignoring PARALLEL_PROCESSING")
+        parallel_process = False
     if parallel_process:
-        results = parallel_for(process_plugin_file, plugin_file_paths)
+        results = parallel_for(process_plugin_file, pending_file_paths)
     else:
-        results = [process_plugin_file(file_path, idx, 0) for idx, file_path in enumerate(plugin_file_paths)]
-
-    for file_mappings, file_display_names in results:
+        results = [process_plugin_file(file_path, idx, 0) for idx, file_path in enumerate(pending_file_paths)]
+    plugin_results.update(zip(pending_file_paths, results))
+    cached_count = len(plugin_file_paths) - len(pending_file_paths) - len(deferred_file_paths)
+
+    if manifest is not None:
+        for file_path in pending_file_paths:
+            result = plugin_results[file_path]
+            if file_path not in failed_plugin_paths and isinstance(result, tuple):
+                manifest.record(file_path, *result)
+        manifest.prune(plugin_file_paths)
+        manifest.save()
+        logger.info(f"Node manifest: {cached_count} cached, {len(pending_file_paths)} imported")
+
+    for file_path in plugin_file_paths:
+        file_mappings, file_display_names = plugin_results[file_path]
         if isinstance(file_mappings, dict) and isinstance(file_display_names, dict):
             node_class_mappings.update(file_mappings)
             node_display_name_mappings.update(file_display_names)
 
+    if not deferred_file_paths:
+        if profiler is not None:
+            profiler.report(cached_count=cached_count)
+        return node_class_mappings, node_display_name_mappings
+
+    def on_imported(file_path: str, file_mappings: dict, file_display_names: dict) -> None:
+        for key, node_class in file_mappings.items():
+            registered = node_class_mappings.get(key)
+            if isinstance(registered, type) and issubclass(registered, LazyNode):
+                registered._resolve()
+            elif registered is None:
+                logger.warning(f"Node {key} was only found after import and will be registered on the next start")
+        if manifest is not None and file_path in uncached_deferred_paths and file_path not in failed_plugin_paths:
+            manifest.record(file_path, file_mappings, file_display_names)
+
+    def on_finished() -> None:
+        if manifest is not None:
+            manifest.save()
+        if profiler is not None:
+            profiler.report(cached_count=cached_count)
+
+    logger.info(f"Registered {len(deferred_file_paths)} plugin files lazily, importing them in the background")
+    BackgroundImporter(
+        deferred_file_paths,
+        process_plugin_file,
+        on_imported,
+        on_finished,
+    ).start()
+
     return node_class_mappings, node_display_name_mappings
 
 
@@ -0,0 +1,226 @@
+import ast
+import logging
+import os
+import re
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# Top-level packages whose import dominates start-up time. Plugin files that reach any of these, directly or
+# through other signature_nodes modules, are imported on the background thread.
+HEAVY_PACKAGES = frozenset(
+    {
+        "boto3",
+        "cv2",
+        "datasets",
+        "kornia",
+        "matplotlib",
+        "neurochain",
+        "pandas",
+        "sam2",
+        "signature_core",
+        "spandrel",
+        "torch",
+        "torchvision",
+        "transformers",
+    }
+)
+
+
+class PluginImportGraph:
+    """Static view of the imports of every plugin file, built without executing any of them.
+
+    Args:
+        nodes_directory (str): Root directory of the signature_nodes package.
+        package (str): Name of the package rooted at nodes_directory.
+    """
+
+    def __init__(self, nodes_directory: str, package: str = "signature_nodes"):
+        self.nodes_directory = nodes_directory
+        self.package = package
+        self._trees: dict[str, ast.Module | None] = {}
+        self._heavy: dict[str, bool] = {}
+
+    def module_name(self, file_path: str) -> str:
+        rel_path = os.path.relpath(file_path, self.nodes_directory)[: -len(".py")]
+        parts = [self.package, *rel_path.split(os.sep)]
+        if parts[-1] == "__init__":
+            parts.pop()
+        return ".".join(parts)
+
+    def _file_path(self, module_name: str) -> str | None:
+        if module_name != self.package and not module_name.startswith(self.package + "."):
+            return None
+        rel_parts = module_name.split(".")[1:]
+        base = os.path.join(self.nodes_directory, *rel_parts)
+        for candidate in (base + ".py", os.path.join(base, "__init__.py")):
+            if os.path.isfile(candidate):
+                return candidate
+        return None
+
+    def tree(self, file_path: str) -> ast.Module | None:
+        if file_path not in self._trees:
+            try:
+                with open(file_path, encoding="utf-8") as f:
+                    self._trees[file_path] = ast.parse(f.read(), filename=file_path)
+            except (OSError, SyntaxError, ValueError):
+                self._trees[file_path] = None
+        return self._trees[file_path]
+
+    def _imports(self, file_path: str) -> list[str]:
+        tree = self.tree(file_path)
+        if tree is None:
+            return []
+        module_parts = self.module_name(file_path).split(".")
+        package_parts = module_parts if file_path.endswith("__init__.py") else module_parts[:-1]
+
+        imports = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                imports.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                if node.level == 0:
+                    base = node.module or ""
+                else:
+                    anchor = package_parts[: len(package_parts) - node.level + 1]
+                    base = ".".join(anchor + ([node.module] if node.module else []))
+                imports.append(base)
+                imports.extend(f"{base}.{alias.name}" for alias in node.names)
+        return imports
+
+    def is_heavy(self, file_path: str) -> bool:
+        """Checks whether importing the file pulls in any of the HEAVY_PACKAGES.
+
+        Files that cannot be parsed are reported as heavy so they are never imported on the critical path.
+        """
+        if file_path in self._heavy:
+            return self._heavy[file_path]
+        if self.tree(file_path) is None:
+            return True
+
+        # Mark as light while visiting so import cycles terminate
+        self._heavy[file_path] = False
+        heavy = False
+        for name in self._imports(file_path):
+            if name.split(".")[0] in HEAVY_PACKAGES:
+                heavy = True
+                break
+            dependency = self._file_path(name)
+            if dependency is not None and dependency != file_path and self.is_heavy(dependency):
+                heavy = True
+                break
+        self._heavy[file_path] = heavy
+        return heavy
+
+
+def _literal(node: ast.expr):
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        raise TypeError("not a literal")
+
+
+def discover_nodes(graph: PluginImportGraph, file_path: str) -> dict[str, dict] | None:
+    """Finds the node classes a plugin file defines by reading its source.
+
+    Keys and display names follow the same rules as the loader applies to imported classes. Only class body
+    assignments that are plain literals are captured as attributes; everything else is served by importing the
+    real class.
+
+    Args:
+        graph (PluginImportGraph): The import graph holding the parsed file.
+        file_path (str): The plugin file to inspect.
+
+    Returns:
+        dict[str, dict] | None: Node descriptions by key, or None if the keys cannot be determined statically.
+    """
+    tree = graph.tree(file_path)
+    if tree is None:
+        return None
+
+    nodes = {}
+    for class_def in tree.body:
+        if not isinstance(class_def, ast.ClassDef):
+            continue
+        assignments = {}
+        for statement in class_def.body:
+            if isinstance(statement, ast.Assign):
+                for target in statement.targets:
+                    if isinstance(target, ast.Name):
+                        assignments[target.id] = statement.value
+        if "FUNCTION" not in assignments:
+            continue
+
+        attrs = {}
+        for name, value in assignments.items():
+            if name.isupper():
+                try:
+                    attrs[name] = _literal(value)
+                except TypeError:
+                    pass
+
+        item = class_def.name
+        if "CLASS_ID" in assignments or "CLASS_NAME" in assignments:
+            id_attr = "CLASS_ID" if "CLASS_ID" in assignments else "CLASS_NAME"
+            if id_attr not in attrs:
+                return None
+            snake_case = str(attrs[id_attr])
+        else:
+            snake_case = re.sub(r"(?<!^)(?=[A-Z])", "_", item.replace("2", "")).lower()
+        key = f"signature_{snake_case}"
+        item_name = re.sub(r"(?<=[a-z])(?=[A-Z])|(?<=[A-Z]{2})(?=[A-Z][a-z])", " ", item)
+
+        nodes[key] = {
+            "module": graph.module_name(file_path),
+            "class_name": item,
+            "attrs": {name: value for name, value in attrs.items() if isinstance(value, (str, int, float, bool))},
+            "lazy_attrs": None,
+            "input_types": None,
+            "display_name": f"SIG {item_name}",
+        }
+    return nodes
+
+
+class BackgroundImporter(threading.Thread):
+    """Imports deferred plugin files after registration so heavy dependencies are warm before first use.
+
+    Nodes of deferred files are registered as lazy proxies. A node used before its file has been imported here
+    imports it on the calling thread; Python's per-module import lock makes that wait for, rather than repeat,
+    an import already in progress on this thread.
+
+    Args:
+        file_paths (list[str]): Deferred plugin files, in import order.
+        import_file (Callable[[str], tuple[dict, dict]]): Imports a plugin file and returns its class and display
+            name mappings.
+        on_imported (Callable[[str, dict, dict], None]): Called with each file and its real mappings.
+        on_finished (Callable[[], None] | None): Called once all files have been imported.
+    """
+
+    def __init__(
+        self,
+        file_paths: list[str],
+        import_file: Callable[[str], tuple[dict, dict]],
+        on_imported: Callable[[str, dict, dict], None],
+        on_finished: Callable[[], None] | None = None,
+    ):
+        super().__init__(name="signature-nodes-prewarm", daemon=True)
+        self.file_paths = file_paths
+        self.import_file = import_file
+        self.on_imported = on_imported
+        self.on_finished = on_finished
+        self.ready = threading.Event()
+
+    def run(self) -> None:
+        try:
+            for file_path in self.file_paths:
+                try:
+                    class_mappings, display_mappings = self.import_file(file_path)
+                    self.on_imported(file_path, class_mappings, display_mappings)
+                except Exception as e:
+                    logger.warning(f"Background import of {file_path} failed: {e}")
+            if self.on_finished is not None:
+                self.on_finished()
+        finally:
+            self.ready.set()
+            logger.info(f"Background import of {len(self.file_paths)} plugin files finished")
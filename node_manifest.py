@@ -0,0 +1,269 @@
+import copy
+import importlib
+import json
+import logging
+import os
+import threading
+from typing import Any
+
+from signature_nodes.shared import AnyType
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def _encode(value: Any) -> Any:
+    """Encodes a node attribute into JSON-compatible data.
+
+    Only exact builtin types are accepted so that subclasses with custom behaviour (e.g. ByPassTypeTuple)
+    are never flattened into plain values. AnyType and tuples are tagged so they can be restored faithfully.
+
+    Raises:
+        TypeError: If the value cannot be encoded without losing behaviour.
+    """
+    value_type = type(value)
+    if value is None or value_type in (bool, int, float, str):
+        return value
+    if value_type is AnyType:
+        return {"__any__": str(value)}
+    if value_type is tuple:
+        return {"__tuple__": [_encode(item) for item in value]}
+    if value_type is list:
+        return [_encode(item) for item in value]
+    if value_type is dict and all(type(key) is str for key in value):
+        return {key: _encode(item) for key, item in value.items()}
+    raise TypeError(f"Cannot encode value of type {value_type.__name__}")
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    if isinstance(value, dict):
+        if "__any__" in value:
+            return AnyType(value["__any__"])
+        if "__tuple__" in value:
+            return tuple(_decode(item) for item in value["__tuple__"])
+        return {key: _decode(item) for key, item in value.items()}
+    return value
+
+
+def _has_combo_inputs(input_types: dict) -> bool:
+    """Checks whether any input is a combo, whose choices may be built dynamically (e.g. from model folders)."""
+    for group in input_types.values():
+        if not isinstance(group, dict):
+            continue
+        for spec in group.values():
+            if isinstance(spec, tuple) and spec and isinstance(spec[0], list):
+                return True
+    return False
+
+
+def describe_node(node_class: type) -> dict:
+    """Captures the ComfyUI-facing metadata of a node class.
+
+    Uppercase class attributes that can be encoded are stored as values. Callables and attributes that
+    cannot be encoded are only listed by name, so a proxy knows it must import the real class to serve them.
+    INPUT_TYPES is stored only when it contains no combo inputs, since combo choices are often read from disk.
+
+    Args:
+        node_class (type): The node class to describe.
+
+    Returns:
+        dict: The manifest description of the node.
+    """
+    attrs = {}
+    lazy_attrs = []
+    for name in dir(node_class):
+        if not name.isupper() or name.startswith("_"):
+            continue
+        value = getattr(node_class, name)
+        if callable(value):
+            lazy_attrs.append(name)
+            continue
+        try:
+            attrs[name] = _encode(value)
+        except TypeError:
+            lazy_attrs.append(name)
+
+    input_types = None
+    try:
+        raw_input_types = node_class.INPUT_TYPES()
+        if not _has_combo_inputs(raw_input_types):
+            input_types = _encode(raw_input_types)
+    except Exception as e:
+        logger.debug(f"INPUT_TYPES of {node_class.__name__} not cached: {e}")
+
+    return {
+        "module": node_class.__module__,
+        "class_name": node_class.__name__,
+        "attrs": attrs,
+        "lazy_attrs": lazy_attrs,
+        "input_types": input_types,
+    }
+
+
+class _LazyNodeMeta(type):
+    """Metaclass that forwards anything the proxy does not know to the real node class."""
+
+    def __getattr__(cls, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        # Without a complete attribute list (nodes discovered from source) every lookup goes to the real class
+        if cls._lazy_attrs is not None and name.isupper() and name not in cls._lazy_attrs:
+            raise AttributeError(name)
+        return getattr(cls._resolve(), name)
+
+    def __call__(cls, *args, **kwargs):
+        return cls._resolve()(*args, **kwargs)
+
+
+class LazyNode(metaclass=_LazyNodeMeta):
+    """Base for lightweight stand-ins of node classes recorded in the manifest.
+
+    Proxies expose the cached metadata ComfyUI reads while listing nodes. The node's module is only imported
+    when the node is instantiated or when an attribute that was not cached is accessed.
+    """
+
+    _module: str = ""
+    _class_name: str = ""
+    _lazy_attrs: frozenset | None = frozenset()
+    _input_types: dict | None = None
+    _real_class: type | None = None
+    _lock: threading.Lock
+
+    @classmethod
+    def _resolve(cls) -> type:
+        if cls._real_class is None:
+            with cls._lock:
+                if cls._real_class is None:
+                    module = importlib.import_module(cls._module)
+                    cls._real_class = getattr(module, cls._class_name)
+                    logger.debug(f"Resolved lazy node {cls._module}.{cls._class_name}")
+        return cls._real_class
+
+    @classmethod
+    def INPUT_TYPES(cls):  # type: ignore
+        if cls._input_types is not None and cls._real_class is None:
+            return copy.deepcopy(cls._input_types)
+        return cls._resolve().INPUT_TYPES()
+
+
+def make_lazy_node(description: dict) -> type:
+    """Builds a proxy class from a manifest description.
+
+    Args:
+        description (dict): A description produced by describe_node. A ``lazy_attrs`` of None means the
+            attribute list is incomplete and any attribute that is not cached is read from the real class.
+
+    Returns:
+        type: A LazyNode subclass carrying the cached metadata.
+    """
+    namespace = {name: _decode(value) for name, value in description["attrs"].items()}
+    input_types = description.get("input_types")
+    lazy_attrs = description.get("lazy_attrs")
+    namespace.update(
+        {
+            "_module": description["module"],
+            "_class_name": description["class_name"],
+            "_lazy_attrs": frozenset(lazy_attrs) if lazy_attrs is not None else None,
+            "_input_types": _decode(input_types) if input_types is not None else None,
+            "_lock": threading.Lock(),
+            "__module__": description["module"],
+            "__qualname__": description["class_name"],
+        }
+    )
+    return _LazyNodeMeta(description["class_name"], (LazyNode,), namespace)
+
+
+def make_lazy_mappings(nodes: dict[str, dict]) -> tuple[dict, dict]:
+    """Builds class and display name mappings of proxies from node descriptions keyed by node key."""
+    class_mappings = {}
+    display_mappings = {}
+    for key, node in nodes.items():
+        class_mappings[key] = make_lazy_node(node)
+        display_mappings[key] = node["display_name"]
+    return class_mappings, display_mappings
+
+
+class NodeManifest:
+    """Persisted record of the nodes each plugin file registers.
+
+    Entries are keyed on the plugin file path relative to the nodes directory and are only reused while the
+    file's mtime and size are unchanged. The whole manifest is discarded when the environment fingerprint
+    (manifest format, available optional packages, core version) differs from the one it was written with.
+
+    Args:
+        path (str): Location of the manifest JSON file.
+        nodes_directory (str): Root directory of the plugin files.
+        fingerprint (dict): Environment values that invalidate the whole manifest when they change.
+    """
+
+    def __init__(self, path: str, nodes_directory: str, fingerprint: dict):
+        self.path = path
+        self.nodes_directory = nodes_directory
+        self.fingerprint = {"version": MANIFEST_VERSION, **fingerprint}
+        self.files: dict[str, dict] = {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: str, nodes_directory: str, fingerprint: dict) -> "NodeManifest":
+        manifest = cls(path, nodes_directory, fingerprint)
+        if not os.path.exists(path):
+            return manifest
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable node manifest {path}: {e}")
+            return manifest
+        if data.get("fingerprint") != manifest.fingerprint:
+            logger.info("Node manifest fingerprint changed, rebuilding")
+            return manifest
+        manifest.files = data.get("files", {})
+        return manifest
+
+    def _key(self, file_path: str) -> str:
+        return os.path.relpath(file_path, self.nodes_directory)
+
+    @staticmethod
+    def _stat(file_path: str) -> tuple[int, int]:
+        stat = os.stat(file_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def lookup(self, file_path: str) -> tuple[dict, dict] | None:
+        """Returns proxy class and display name mappings for a file, or None if it must be imported."""
+        entry = self.files.get(self._key(file_path))
+        if entry is None or (entry["mtime_ns"], entry["size"]) != self._stat(file_path):
+            return None
+
+        return make_lazy_mappings(entry["nodes"])
+
+    def record(self, file_path: str, class_mappings: dict, display_mappings: dict) -> None:
+        """Stores the nodes a freshly imported file registered."""
+        nodes = {}
+        for key, node_class in class_mappings.items():
+            nodes[key] = {**describe_node(node_class), "display_name": display_mappings[key]}
+        mtime_ns, size = self._stat(file_path)
+        self.files[self._key(file_path)] = {"mtime_ns": mtime_ns, "size": size, "nodes": nodes}
+        self.dirty = True
+
+    def prune(self, file_paths: list[str]) -> None:
+        """Drops entries for files that no longer exist."""
+        keep = {self._key(file_path) for file_path in file_paths}
+        stale = [key for key in self.files if key not in keep]
+        for key in stale:
+            del self.files[key]
+        self.dirty = self.dirty or bool(stale)
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": self.fingerprint, "files": self.files}, f)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            logger.warning(f"Could not write node manifest {self.path}: {e}")
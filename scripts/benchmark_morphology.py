@@ -0,0 +1,119 @@
+"""Benchmarks the running max/min morphology engine against kernel-based morphology and checks their parity.
+
+Usage:
+    uv run python scripts/benchmark_morphology.py --size 1024 --batch 4 --kernel-sizes 3 11 25 51 101
+
+Every operation of MaskMorphology is run with every kernel size and iteration count. The baseline is
+signature_core.functional.morphology when installed, kornia.morphology applied iterations times otherwise. Both the
+float and the bool storage of the engine are timed, and the maximum absolute difference to the baseline is
+reported. The script exits with 1 if any difference exceeds --tolerance.
+"""
+
+import argparse
+import importlib.util
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import torch
+
+BASE_DIR = Path(__file__).parent.parent
+OPERATIONS = ["dilation", "erosion", "opening", "closing", "gradient", "top_hat", "bottom_hat"]
+
+
+def load_engine():
+    # The engine module only depends on torch, so it is loaded on its own without ComfyUI
+    path = BASE_DIR / "src" / "signature_nodes" / "core" / "mask" / "shared.py"
+    spec = importlib.util.spec_from_file_location("morphology_engine", path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_baseline():
+    try:
+        from signature_core.functional import morphology  # type: ignore
+        from signature_core.img.tensor_image import TensorImage  # type: ignore
+
+        def run(mask: torch.Tensor, operation: str, kernel_size: int, iterations: int) -> torch.Tensor:
+            function = getattr(morphology, operation)
+            return function(image=TensorImage(mask), kernel_size=kernel_size, iterations=iterations)
+
+        return "signature_core", run
+    except ImportError:
+        from kornia import morphology  # type: ignore
+
+        def run(mask: torch.Tensor, operation: str, kernel_size: int, iterations: int) -> torch.Tensor:
+            kernel = torch.ones((kernel_size, kernel_size), device=mask.device)
+            output = mask
+            for _ in range(iterations):
+                output = getattr(morphology, operation)(output, kernel)
+            return output
+
+        return "kornia", run
+
+
+def timed(function, repeats: int) -> tuple[float, torch.Tensor]:
+    output = function()
+    times = []
+    for _ in range(repeats):
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        function()
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), output
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1024)
+    parser.add_argument("--batch", type=int, default=4)
+    parser.add_argument("--kernel-sizes", type=int, nargs="+", default=[3, 11, 25, 51, 101])
+    parser.add_argument("--operations", nargs="+", default=OPERATIONS, choices=OPERATIONS)
+    parser.add_argument("--iterations", type=int, nargs="+", default=[1, 5])
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=1e-6)
+    args = parser.parse_args()
+
+    engine = load_engine()
+    baseline_name, baseline = load_baseline()
+    generator = torch.Generator().manual_seed(0)
+    mask = (torch.rand((args.batch, 1, args.size, args.size), generator=generator) > 0.995).float().to(args.device)
+    compact = mask.bool()
+
+    print(
+        f"{'operation':>10} {'kernel':>6} {'iter':>4} {baseline_name:>14} {'engine':>9} {'engine bool':>12} "
+        f"{'speedup':>8} {'max diff':>9}"
+    )
+    mismatches = []
+    for operation in args.operations:
+        for kernel_size in args.kernel_sizes:
+            for iterations in args.iterations:
+                settings = (operation, kernel_size, iterations)
+                baseline_time, expected = timed(lambda: baseline(mask, *settings), args.repeats)
+                engine_time, output = timed(lambda: engine.morphology(mask, *settings), args.repeats)
+                bool_time, _ = timed(lambda: engine.morphology(compact, *settings), args.repeats)
+                difference = (output - expected.as_subclass(torch.Tensor)).abs().max().item()
+                if difference > args.tolerance:
+                    mismatches.append(settings)
+                print(
+                    f"{operation:>10} {kernel_size:>6} {iterations:>4} {baseline_time * 1000:>12.1f}ms "
+                    f"{engine_time * 1000:>7.1f}ms {bool_time * 1000:>10.1f}ms "
+                    f"{baseline_time / engine_time:>7.1f}x {difference:>9.4f}"
+                )
+
+    for operation, kernel_size, iterations in mismatches:
+        print(f"Mismatch: {operation} with kernel size {kernel_size} and {iterations} iterations")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
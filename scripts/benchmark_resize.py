@@ -0,0 +1,94 @@
+"""Benchmarks the cached separable resize engine against signature_core's resize on CPU.
+
+Usage:
+    uv run python scripts/benchmark_resize.py --megapixels 1 4 8 16 24 --target 1024 --interpolation lanczos
+
+For each input size, a 3:2 RGB batch is resized so its longest side is --target (a thumbnail) and to half its size
+(a normalization step). The first engine call includes building the filter weights, the following ones reuse them.
+The maximum absolute difference to signature_core's output is reported as a sanity check.
+"""
+
+import argparse
+import importlib.util
+import math
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import torch
+
+BASE_DIR = Path(__file__).parent.parent
+
+
+def load_engine():
+    # The engine module only depends on torch, so it is loaded on its own without ComfyUI
+    path = BASE_DIR / "src" / "signature_nodes" / "core" / "image_processing" / "shared.py"
+    spec = importlib.util.spec_from_file_location("resize_engine", path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def timed(function, repeats: int) -> tuple[float, float, torch.Tensor]:
+    start = time.perf_counter()
+    output = function()
+    first = time.perf_counter() - start
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return first, statistics.median(times) if times else first, output
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--megapixels", type=float, nargs="+", default=[1, 4, 8, 16, 24])
+    parser.add_argument("--target", type=int, default=1024, help="Longest side of the thumbnail case")
+    parser.add_argument("--interpolation", default="lanczos", choices=["lanczos", "bicubic", "bilinear"])
+    parser.add_argument("--batch", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    engine = load_engine()
+    try:
+        from signature_core.functional.transform import resize  # type: ignore
+        from signature_core.img.tensor_image import TensorImage  # type: ignore
+    except ImportError:
+        resize = None
+        print("signature_core is not installed, only the engine is timed")
+
+    print(f"{'input':>12} {'output':>12} {'engine 1st':>11} {'engine':>9} {'core':>9} {'speedup':>8} {'max diff':>9}")
+    for megapixels in args.megapixels:
+        height = round(math.sqrt(megapixels * 1e6 / 1.5))
+        width = round(height * 1.5)
+        image = torch.rand((args.batch, 3, height, width))
+        thumbnail = (round(height * args.target / width), args.target)
+        for out_h, out_w in (thumbnail, (height // 2, width // 2)):
+            engine.resize_weights.cache_clear()
+            first, engine_time, output = timed(
+                lambda: engine.resize_tensor(image, (out_h, out_w), args.interpolation), args.repeats
+            )
+            core_time, difference = float("nan"), float("nan")
+            if resize is not None:
+                _, core_time, reference = timed(
+                    lambda: resize(TensorImage(image), out_w, out_h, "STRETCH", args.interpolation, True, 1),
+                    args.repeats,
+                )
+                difference = (output - reference).abs().max().item()
+            print(
+                f"{width:>5}x{height:<6} {out_w:>5}x{out_h:<6} {first * 1000:>9.1f}ms {engine_time * 1000:>7.1f}ms "
+                f"{core_time * 1000:>7.1f}ms {core_time / engine_time:>7.2f}x {difference:>9.4f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""Profiles node registration and optionally fails when it exceeds a time budget.
+
+Usage:
+    uv run python scripts/profile_node_loading.py --report node_loading_profile.json --max-seconds 20
+
+The plugin package is loaded exactly as ComfyUI loads it, with PROFILE_NODE_LOADING enabled. The script exits
+with status 1 when the total registration time or any single plugin file exceeds its budget, so it can be
+used to catch import-time regressions.
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+
+
+def load_plugin_package(report_path: Path) -> dict:
+    os.environ["PROFILE_NODE_LOADING"] = "True"
+    os.environ["NODE_LOADING_PROFILE_PATH"] = str(report_path)
+    sys.path.insert(0, str(BASE_DIR / "src"))
+
+    spec = importlib.util.spec_from_file_location(
+        "signature_nodes_plugin", BASE_DIR / "__init__.py", submodule_search_locations=[str(BASE_DIR)]
+    )
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load plugin package from {BASE_DIR}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+
+    with open(report_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--report", type=Path, default=BASE_DIR / "node_loading_profile.json")
+    parser.add_argument("--max-seconds", type=float, default=None, help="Budget for the whole registration")
+    parser.add_argument("--max-plugin-seconds", type=float, default=None, help="Budget for any single plugin file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    report = load_plugin_package(args.report)
+
+    failed = False
+    if args.max_seconds is not None and report["total_time"] > args.max_seconds:
+        print(f"Node registration took {report['total_time']:.2f}s, budget is {args.max_seconds:.2f}s")
+        failed = True
+    if args.max_plugin_seconds is not None:
+        for plugin in report["plugins"]:
+            if plugin["wall_time"] > args.max_plugin_seconds:
+                print(f"{plugin['plugin']} took {plugin['wall_time']:.2f}s, budget is {args.max_plugin_seconds:.2f}s")
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
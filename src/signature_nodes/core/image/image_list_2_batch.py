@@ -3,6 +3,7 @@ from signature_core.functional.transform import resize
 from signature_core.img.tensor_image import TensorImage
 
 from ...categories import IMAGE_CAT
+from ..image_processing.shared import RESIZE_FILTERS, resize_tensor
 
 
 class ImageList2Batch:
@@ -38,6 +39,7 @@ class ImageList2Batch:
         - Original image qualities are preserved as much as possible
         - Memory efficient processing for large batches
         - GPU acceleration is automatically used when available
+        - In STRETCH mode, images of the same size are resized together with cached separable filters
     """
 
     @classmethod
@@ -61,6 +63,20 @@ class ImageList2Batch:
     with customizable interpolation methods. Useful for batch processing operations.
     """
 
+    @staticmethod
+    def stretch(images: list[torch.Tensor], width: int, height: int, interpolation: str) -> torch.Tensor:
+        groups: dict[tuple, list[int]] = {}
+        for index, img in enumerate(images):
+            groups.setdefault(tuple(img.shape), []).append(index)
+
+        resized: list[torch.Tensor] = [torch.empty(0)] * len(images)
+        for indices in groups.values():
+            batch = TensorImage.from_BWHC(torch.cat([images[index] for index in indices]))
+            output = TensorImage(resize_tensor(batch, (height, width), interpolation)).get_BWHC()
+            for index, img in zip(indices, output.split([images[index].shape[0] for index in indices])):
+                resized[index] = img.squeeze(0)
+        return torch.stack(resized)
+
     def execute(
         self,
         images: list[torch.Tensor],
@@ -77,6 +93,9 @@ class ImageList2Batch:
         max_height = max(img.shape[1] for img in images)
         max_width = max(img.shape[2] for img in images)
 
+        if mode == "STRETCH" and interpolation in RESIZE_FILTERS:
+            return (self.stretch(images, max_width, max_height, interpolation),)
+
         resized_images = []
         for img in images:
             tensor_img = TensorImage.from_BWHC(img)
@@ -1,3 +1,5 @@
+from typing import Optional
+
 import torch
 from kornia.geometry import transform
 from signature_core.img.tensor_image import TensorImage
@@ -20,6 +22,9 @@ class ImageTranspose:
         Y (int): Vertical offset in pixels from top edge
         rotation (int): Rotation angle in degrees (-360 to 360)
         feathering (int): Edge feathering radius in pixels (0-100)
+        x_list (list, optional): Horizontal offset of each item, overrides X
+        y_list (list, optional): Vertical offset of each item, overrides Y
+        rotation_list (list, optional): Rotation angle of each item, overrides rotation
 
     Returns:
         tuple[torch.Tensor, torch.Tensor]: Two-element tuple containing:
@@ -36,6 +41,9 @@ class ImageTranspose:
         - Automatically handles padding and cropping
         - Feathering creates smooth edges around the overlay
         - All transformations preserve aspect ratio when specified
+        - Only the overlay rectangle grown by the feathering radius is blended, so the cost follows the overlay
+          size rather than the base size. Overlays reaching past the base image are clipped
+        - A batch of overlays is placed in one call, each with its own position and rotation from the lists
     """
 
     def __init__(self):
@@ -54,6 +62,11 @@ class ImageTranspose:
                 "rotation": ("INT", {"default": 0, "min": -360, "max": 360, "step": 1}),
                 "feathering": ("INT", {"default": 0, "min": 0, "max": 100, "step": 1}),
             },
+            "optional": {
+                "x_list": ("LIST",),
+                "y_list": ("LIST",),
+                "rotation_list": ("LIST",),
+            },
         }
 
     RETURN_TYPES = (
@@ -72,6 +85,59 @@ class ImageTranspose:
     Returns both RGB and RGBA versions.
     """
 
+    @staticmethod
+    def per_item(values: Optional[list], default: int, count: int) -> list[int]:
+        if not values:
+            return [default] * count
+        if len(values) == 1:
+            return [int(values[0])] * count
+        if len(values) != count:
+            raise ValueError(f"Expected 1 or {count} values per item, got {len(values)}")
+        return [int(value) for value in values]
+
+    @staticmethod
+    def blend_region(
+        result: torch.Tensor,
+        alpha: torch.Tensor,
+        overlay: torch.Tensor,
+        mask: torch.Tensor,
+        x: int,
+        y: int,
+        feathering: int,
+    ) -> None:
+        """Blends BCHW overlays and masks into the BWHC result at (x, y), in place.
+
+        Only the overlay rectangle grown by the feathering radius is touched. Within it the overlay and mask are
+        zero outside the rectangle, like a full-frame padded overlay.
+        """
+        _, base_height, base_width, _ = result.shape
+        height, width = overlay.shape[2:]
+        top, left = max(y - feathering, 0), max(x - feathering, 0)
+        bottom, right = min(y + height + feathering, base_height), min(x + width + feathering, base_width)
+        if top >= bottom or left >= right:
+            return
+
+        # Part of the overlay inside the region
+        inner_top, inner_left = max(y, top), max(x, left)
+        inner_bottom, inner_right = min(y + height, bottom), min(x + width, right)
+        region_mask = mask.new_zeros((mask.shape[0], 1, bottom - top, right - left))
+        region_overlay = overlay.new_zeros((overlay.shape[0], 3, bottom - top, right - left))
+        if inner_top < inner_bottom and inner_left < inner_right:
+            rows, columns = slice(inner_top - top, inner_bottom - top), slice(inner_left - left, inner_right - left)
+            source_rows, source_columns = slice(inner_top - y, inner_bottom - y), slice(inner_left - x, inner_right - x)
+            region_mask[:, :, rows, columns] = mask[:, :, source_rows, source_columns]
+            region_overlay[:, :, rows, columns] = overlay[:, :3, source_rows, source_columns]
+
+        if feathering > 0:
+            kernel_size = 2 * feathering + 1
+            feather_kernel = torch.ones((1, 1, kernel_size, kernel_size), device=mask.device) / (kernel_size**2)
+            region_mask = torch.nn.functional.conv2d(region_mask, feather_kernel, padding=feathering)
+
+        region_mask = region_mask.permute(0, 2, 3, 1)
+        region = result[:, top:bottom, left:right, :]
+        region.mul_(1 - region_mask).add_(region_overlay.permute(0, 2, 3, 1) * region_mask)
+        alpha[:, top:bottom, left:right, :] = region_mask
+
     def execute(
         self,
         image: torch.Tensor,
@@ -82,24 +148,33 @@ class ImageTranspose:
         y: int = 0,
         rotation: int = 0,
         feathering: int = 0,
+        x_list: Optional[list] = None,
+        y_list: Optional[list] = None,
+        rotation_list: Optional[list] = None,
     ) -> tuple[torch.Tensor, torch.Tensor]:
-        base_image = TensorImage.from_BWHC(image)
-        overlay_image = TensorImage.from_BWHC(image_overlay)
+        device = image.device
+        overlay_image = TensorImage.from_BWHC(image_overlay).to(device)
 
         if width == -1:
             width = overlay_image.shape[3]
         if height == -1:
             height = overlay_image.shape[2]
 
-        device = base_image.device
-        overlay_image = overlay_image.to(device)
+        lengths = [len(values or []) for values in (x_list, y_list, rotation_list)]
+        count = max(image.shape[0], overlay_image.shape[0], *lengths)
+        xs = self.per_item(x_list, x, count)
+        ys = self.per_item(y_list, y, count)
+        rotations = self.per_item(rotation_list, rotation, count)
 
         # Resize overlay image
         overlay_image = transform.resize(overlay_image, (height, width))
 
-        if rotation != 0:
-            angle = torch.tensor(rotation, dtype=torch.float32, device=device)
-            center = torch.tensor([width / 2, height / 2], dtype=torch.float32, device=device)
+        if any(angle != 0 for angle in rotations):
+            if len(set(rotations)) > 1:
+                overlay_image = overlay_image.expand(count, -1, -1, -1)
+            batch = overlay_image.shape[0]
+            angle = torch.tensor(rotations[:batch], dtype=torch.float32, device=device)
+            center = torch.tensor([[width / 2, height / 2]], dtype=torch.float32, device=device).expand(batch, -1)
             overlay_image = transform.rotate(overlay_image, angle, center=center)
 
         # Create mask (handle both RGB and RGBA cases)
@@ -108,30 +183,25 @@ class ImageTranspose:
         else:
             mask = torch.ones((1, 1, height, width), device=device)
 
-        # Pad overlay image and mask
-        pad_left = x
-        pad_top = y
-        pad_right = max(0, base_image.shape[3] - overlay_image.shape[3] - x)
-        pad_bottom = max(0, base_image.shape[2] - overlay_image.shape[2] - y)
-
-        overlay_image = torch.nn.functional.pad(overlay_image, (pad_left, pad_right, pad_top, pad_bottom))
-        mask = torch.nn.functional.pad(mask, (pad_left, pad_right, pad_top, pad_bottom))
-
-        # Resize to match base image
-        overlay_image = transform.resize(overlay_image, base_image.shape[2:])
-        mask = transform.resize(mask, base_image.shape[2:])
-
-        if feathering > 0:
-            kernel_size = 2 * feathering + 1
-            feather_kernel = torch.ones((1, 1, kernel_size, kernel_size), device=device) / (kernel_size**2)
-            mask = torch.nn.functional.conv2d(mask, feather_kernel, padding=feathering)
-
-        # Blend images
-        result = base_image * (1 - mask) + overlay_image[:, :3, :, :] * mask
-
-        result = TensorImage(result).get_BWHC()
+        # Blend only the overlay region of a copy of the base images
+        result = image.expand(count, -1, -1, -1).clone()
+        alpha = torch.zeros((count, image.shape[1], image.shape[2], 1), dtype=result.dtype, device=device)
+        if len(set(xs)) == 1 and len(set(ys)) == 1:
+            self.blend_region(result, alpha, overlay_image, mask, xs[0], ys[0], feathering)
+        else:
+            for index in range(count):
+                item = slice(index, index + 1)
+                self.blend_region(
+                    result[item],
+                    alpha[item],
+                    overlay_image[item] if overlay_image.shape[0] > 1 else overlay_image,
+                    mask[item] if mask.shape[0] > 1 else mask,
+                    xs[index],
+                    ys[index],
+                    feathering,
+                )
 
         rgb = result
-        rgba = torch.cat([rgb, mask.permute(0, 2, 3, 1)], dim=3)
+        rgba = torch.cat([rgb, alpha], dim=3)
 
         return (rgb, rgba)
@@ -0,0 +1,278 @@
+import math
+from typing import Optional
+
+import torch
+import torch.nn.functional as F
+
+from ...categories import IMAGE_PROCESSING_CAT
+
+# Offsets closer than this to an integer are treated as integers by the exact fast path
+INTEGER_TOLERANCE = 1e-6
+
+
+class AffineTransform:
+    """Rotates, scales, translates and crops images and masks in a single resampling pass.
+
+    The operations are composed into one affine matrix, so a chain such as rotate -> resize -> crop resamples the
+    pixels once instead of once per node. Image and mask are resampled together when they have the same size, and an
+    absent input is skipped instead of being transformed as a placeholder. Rotations by multiples of 90 degrees with
+    whole-pixel offsets use an exact path (rot90, at most one resize, then slicing) instead of grid sampling.
+
+    Args:
+        image (torch.Tensor, optional): Input image in BWHC format with values in range [0, 1]
+        mask (torch.Tensor, optional): Input mask in BWH format with values in range [0, 1]
+        angle (float): Counterclockwise rotation in degrees, around the image center.
+        scale_x (float): Horizontal scale, applied before the rotation.
+        scale_y (float): Vertical scale, applied before the rotation.
+        translate_x (float): Horizontal shift of the content in output pixels.
+        translate_y (float): Vertical shift of the content in output pixels.
+        expand (bool): Whether the canvas grows to contain the whole rotated content. Otherwise the canvas is the
+            scaled input size and rotated corners may be clipped.
+        crop_x (int): Left edge of the output window on the canvas.
+        crop_y (int): Top edge of the output window on the canvas.
+        crop_width (int): Width of the output window, 0 for the rest of the canvas.
+        crop_height (int): Height of the output window, 0 for the rest of the canvas.
+        interpolation (str): Sampling method, "bilinear", "nearest" or "bicubic".
+        antialias (bool): Whether to prefilter the input when it is scaled below half its size.
+
+    Returns:
+        tuple:
+            - image (torch.Tensor): Transformed image in BWHC format
+            - mask (torch.Tensor): Transformed mask in BWH format
+
+    Raises:
+        ValueError: If neither image nor mask is provided
+        ValueError: If the output window is empty
+
+    Notes:
+        - Areas outside the input are filled with black
+        - An absent input is returned as a 1x1 black placeholder
+        - Identity transforms and whole-pixel quarter turns do not interpolate
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):  # type: ignore
+        return {
+            "required": {},
+            "optional": {
+                "image": ("IMAGE", {"default": None}),
+                "mask": ("MASK", {"default": None}),
+                "angle": ("FLOAT", {"default": 0.0, "min": -360.0, "max": 360.0, "step": 0.1}),
+                "scale_x": ("FLOAT", {"default": 1.0, "min": 0.01, "max": 100.0, "step": 0.01}),
+                "scale_y": ("FLOAT", {"default": 1.0, "min": 0.01, "max": 100.0, "step": 0.01}),
+                "translate_x": ("FLOAT", {"default": 0.0, "min": -40960.0, "max": 40960.0, "step": 1.0}),
+                "translate_y": ("FLOAT", {"default": 0.0, "min": -40960.0, "max": 40960.0, "step": 1.0}),
+                "expand": ("BOOLEAN", {"default": False}),
+                "crop_x": ("INT", {"default": 0, "min": -40960, "max": 40960}),
+                "crop_y": ("INT", {"default": 0, "min": -40960, "max": 40960}),
+                "crop_width": ("INT", {"default": 0, "min": 0, "max": 40960}),
+                "crop_height": ("INT", {"default": 0, "min": 0, "max": 40960}),
+                "interpolation": (["bilinear", "nearest", "bicubic"],),
+                "antialias": ("BOOLEAN", {"default": True}),
+            },
+        }
+
+    RETURN_TYPES = (
+        "IMAGE",
+        "MASK",
+    )
+    FUNCTION = "execute"
+    CATEGORY = IMAGE_PROCESSING_CAT
+    DESCRIPTION = """
+    Rotates, scales, translates and crops images and masks in a single resampling pass.
+    Replaces chains of Rotate, Resize and crop nodes with one transform, so pixels are only interpolated once.
+    Quarter turns with whole-pixel offsets are exact.
+    """
+
+    @staticmethod
+    def canvas_size(
+        height: int, width: int, angle: float, scale_x: float, scale_y: float, expand: bool
+    ) -> tuple[int, int]:
+        if not expand:
+            return max(round(height * scale_y), 1), max(round(width * scale_x), 1)
+        radians = math.radians(angle)
+        cos, sin = abs(math.cos(radians)), abs(math.sin(radians))
+        scaled_w, scaled_h = width * scale_x, height * scale_y
+        return max(round(scaled_w * sin + scaled_h * cos), 1), max(round(scaled_w * cos + scaled_h * sin), 1)
+
+    @staticmethod
+    def sampling_theta(
+        input_size: tuple[int, int],
+        output_size: tuple[int, int],
+        angle: float,
+        scale: tuple[float, float],
+        origin: tuple[float, float],
+        virtual_size: tuple[int, int] | None = None,
+    ) -> torch.Tensor:
+        """Returns the (1, 2, 3) affine_grid matrix mapping output to input normalized coordinates.
+
+        The forward transform is o = R S (p - c) + origin, with p and o in pixel-edge coordinates of the input and
+        output, c the input center and R a counterclockwise rotation in y-down coordinates.
+
+        Args:
+            input_size (tuple[int, int]): Input (height, width).
+            output_size (tuple[int, int]): Output (height, width).
+            angle (float): Rotation in degrees.
+            scale (tuple[float, float]): (scale_x, scale_y).
+            origin (tuple[float, float]): Output position of the input center, (x, y).
+            virtual_size (tuple[int, int] | None): Size the sampled tensor spans in input pixels, when it was pooled.
+        """
+        height, width = input_size
+        out_h, out_w = output_size
+        virtual_h, virtual_w = virtual_size or input_size
+        radians = math.radians(angle)
+        cos, sin = math.cos(radians), math.sin(radians)
+        scale_x, scale_y = scale
+
+        inverse = torch.tensor([[cos / scale_x, -sin / scale_x], [sin / scale_y, cos / scale_y]], dtype=torch.float64)
+        to_input = torch.diag(torch.tensor([2.0 / virtual_w, 2.0 / virtual_h], dtype=torch.float64))
+        from_output = torch.diag(torch.tensor([out_w / 2.0, out_h / 2.0], dtype=torch.float64))
+        output_half = torch.tensor([out_w / 2.0, out_h / 2.0], dtype=torch.float64)
+        input_center = torch.tensor([width / 2.0, height / 2.0], dtype=torch.float64)
+
+        # u -> o = from_output u + output_half -> p = inverse (o - origin) + input_center -> to_input p - 1
+        linear = to_input @ inverse @ from_output
+        origin_tensor = torch.tensor(origin, dtype=torch.float64)
+        translation = to_input @ (inverse @ (output_half - origin_tensor) + input_center) - 1.0
+        return torch.cat([linear, translation[:, None]], dim=1).float()[None]
+
+    @staticmethod
+    def paste(tensor: torch.Tensor, output_size: tuple[int, int], top: int, left: int) -> torch.Tensor:
+        """Places a BCHW tensor with its top-left corner at (top, left) of a black canvas of output_size."""
+        out_h, out_w = output_size
+        height, width = tensor.shape[-2:]
+        if top == 0 and left == 0 and (height, width) == (out_h, out_w):
+            return tensor
+        output = tensor.new_zeros((*tensor.shape[:2], out_h, out_w))
+        src_top, src_left = max(-top, 0), max(-left, 0)
+        dst_top, dst_left = max(top, 0), max(left, 0)
+        rows = min(height - src_top, out_h - dst_top)
+        columns = min(width - src_left, out_w - dst_left)
+        if rows > 0 and columns > 0:
+            output[..., dst_top : dst_top + rows, dst_left : dst_left + columns] = tensor[
+                ..., src_top : src_top + rows, src_left : src_left + columns
+            ]
+        return output
+
+    def transform(
+        self,
+        tensor: torch.Tensor,
+        angle: float,
+        scale: tuple[float, float],
+        translate: tuple[float, float],
+        expand: bool,
+        crop: tuple[int, int, int, int],
+        interpolation: str,
+        antialias: bool,
+    ) -> torch.Tensor:
+        """Transforms a BCHW tensor, see the class docstring for the parameters."""
+        height, width = tensor.shape[-2:]
+        scale_x, scale_y = scale
+        canvas_h, canvas_w = self.canvas_size(height, width, angle, scale_x, scale_y, expand)
+        crop_x, crop_y, crop_width, crop_height = crop
+        out_w = crop_width or canvas_w - crop_x
+        out_h = crop_height or canvas_h - crop_y
+        if out_w <= 0 or out_h <= 0:
+            raise ValueError("The output window is empty")
+
+        quarter_turns = angle / 90.0
+        if abs(quarter_turns - round(quarter_turns)) < INTEGER_TOLERANCE:
+            turns = round(quarter_turns) % 4
+            scaled_h, scaled_w = height * scale_y, width * scale_x
+            rotated_h, rotated_w = (scaled_w, scaled_h) if turns % 2 else (scaled_h, scaled_w)
+            # The rotated content is centered on the origin
+            top = canvas_h / 2.0 + translate[1] - crop_y - rotated_h / 2.0
+            left = canvas_w / 2.0 + translate[0] - crop_x - rotated_w / 2.0
+            whole = [rotated_h, rotated_w, top, left]
+            if all(abs(value - round(value)) < INTEGER_TOLERANCE for value in whole):
+                result = torch.rot90(tensor, turns, dims=(-2, -1)) if turns else tensor
+                size = (round(rotated_h), round(rotated_w))
+                if tuple(result.shape[-2:]) != size:
+                    downscaling = size[0] < result.shape[-2] or size[1] < result.shape[-1]
+                    if interpolation == "nearest":
+                        result = F.interpolate(result, size=size, mode="nearest-exact")
+                    else:
+                        result = F.interpolate(
+                            result,
+                            size=size,
+                            mode=interpolation,
+                            align_corners=False,
+                            antialias=antialias and downscaling,
+                        )
+                return self.paste(result, (out_h, out_w), round(top), round(left))
+
+        # Average whole blocks first when shrinking by 2x or more, as grid_sample does not antialias
+        pool_x = max(int(1 / scale_x), 1) if antialias else 1
+        pool_y = max(int(1 / scale_y), 1) if antialias else 1
+        source = tensor
+        virtual_size = (height, width)
+        if pool_x > 1 or pool_y > 1:
+            source = F.avg_pool2d(
+                tensor, (pool_y, pool_x), stride=(pool_y, pool_x), ceil_mode=True, count_include_pad=False
+            )
+            virtual_size = (source.shape[-2] * pool_y, source.shape[-1] * pool_x)
+
+        origin = (canvas_w / 2.0 + translate[0] - crop_x, canvas_h / 2.0 + translate[1] - crop_y)
+        theta = self.sampling_theta((height, width), (out_h, out_w), angle, scale, origin, virtual_size)
+        grid = F.affine_grid(
+            theta.to(source.device).expand(source.shape[0], 2, 3),
+            [source.shape[0], source.shape[1], out_h, out_w],
+            align_corners=False,
+        )
+        return F.grid_sample(
+            source, grid.to(source.dtype), mode=interpolation, padding_mode="zeros", align_corners=False
+        )
+
+    def execute(
+        self,
+        image: Optional[torch.Tensor] = None,
+        mask: Optional[torch.Tensor] = None,
+        angle: float = 0.0,
+        scale_x: float = 1.0,
+        scale_y: float = 1.0,
+        translate_x: float = 0.0,
+        translate_y: float = 0.0,
+        expand: bool = False,
+        crop_x: int = 0,
+        crop_y: int = 0,
+        crop_width: int = 0,
+        crop_height: int = 0,
+        interpolation: str = "bilinear",
+        antialias: bool = True,
+    ):
+        has_image = isinstance(image, torch.Tensor)
+        has_mask = isinstance(mask, torch.Tensor)
+        if not has_image and not has_mask:
+            raise ValueError("Either image or mask must be provided")
+
+        def run(tensor: torch.Tensor) -> torch.Tensor:
+            return self.transform(
+                tensor,
+                angle,
+                (scale_x, scale_y),
+                (translate_x, translate_y),
+                expand,
+                (crop_x, crop_y, crop_width, crop_height),
+                interpolation,
+                antialias,
+            )
+
+        output_image = torch.zeros((1, 1, 1, 3))
+        output_mask = torch.zeros((1, 1, 1))
+        if has_image and has_mask and image.shape[:3] == mask.shape and image.device == mask.device:
+            # One pass for both, with the mask as an extra channel
+            channels = image.shape[-1]
+            stacked = torch.cat([image.movedim(-1, 1), mask.unsqueeze(1).to(image.dtype)], dim=1)
+            result = run(stacked)
+            output_image = result[:, :channels].movedim(1, -1)
+            output_mask = result[:, channels].to(mask.dtype)
+        else:
+            if has_image:
+                output_image = run(image.movedim(-1, 1)).movedim(1, -1)
+            if has_mask:
+                output_mask = run(mask.unsqueeze(1)).squeeze(1)
+
+        return (
+            output_image,
+            output_mask,
+        )
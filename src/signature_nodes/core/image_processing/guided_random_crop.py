@@ -1,9 +1,12 @@
-import random
+import math
 from typing import Tuple
 
-import cv2
-import numpy as np
 import torch
+import torch.nn.functional as F
+from torchvision import ops
+
+# Longest side of the mask grid used to pick sampling cells
+SAMPLING_GRID_SIZE = 256
 
 
 class GuidedRandomCrop:
@@ -20,7 +23,11 @@ class GuidedRandomCrop:
                 "min_crop_size": ("INT", {"default": 128, "min": 32, "max": 2048}),
                 "max_crop_size": ("INT", {"default": 256, "min": 32, "max": 2048}),
                 "num_samples": ("INT", {"default": 4, "min": 1, "max": 200}),
-            }
+            },
+            "optional": {
+                "seed": ("INT", {"default": -1, "min": -1, "max": 10000000000000000}),
+                "debug_view": ("BOOLEAN", {"default": True}),
+            },
         }
 
     RETURN_TYPES = ("IMAGE", "IMAGE")
@@ -33,8 +40,79 @@ class GuidedRandomCrop:
     adjusting the crop window position if needed to stay within image boundaries. Returns both the crops and a debug
     visualization showing the mask area (blue hatched pattern), sampled points (red dots), and crop windows (blue
     rectangles).
+    Use a seed of -1 for random sampling, any other value gives reproducible crops. When debug_view is off, the input
+    images are returned as debug view.
     """
 
+    @staticmethod
+    def sample_points(valid: torch.Tensor, num_samples: int, generator: torch.Generator) -> list[torch.Tensor]:
+        """Samples up to num_samples distinct points per image among the valid mask pixels.
+
+        A cell of a coarse grid is drawn with a probability proportional to its number of valid pixels, then a
+        valid pixel is drawn inside the cell, so every valid pixel is equally likely without indexing them all.
+
+        Args:
+            valid (torch.Tensor): Boolean masks of shape (B, H, W).
+            num_samples (int): Number of points per image.
+            generator (torch.Generator): CPU generator used for every draw.
+
+        Returns:
+            list[torch.Tensor]: For each image, an (N, 2) int64 tensor of (y, x) points on valid's device. N is 0
+                for images without valid pixels.
+        """
+        batch, height, width = valid.shape
+        cell = max(math.ceil(max(height, width) / SAMPLING_GRID_SIZE), 1)
+        grid_h, grid_w = math.ceil(height / cell), math.ceil(width / cell)
+        padded = F.pad(valid.to(torch.uint8), (0, grid_w * cell - width, 0, grid_h * cell - height))
+        blocks = padded.view(batch, grid_h, cell, grid_w, cell).permute(0, 1, 3, 2, 4).reshape(batch, -1, cell * cell)
+        weights = blocks.sum(dim=2, dtype=torch.float32).cpu()
+
+        points = []
+        for index in range(batch):
+            cell_weights = weights[index]
+            count = int(cell_weights.sum())
+            if count == 0:
+                points.append(torch.zeros((0, 2), dtype=torch.long, device=valid.device))
+                continue
+            samples = min(num_samples, count)
+            replacement = samples > int((cell_weights > 0).sum())
+            cells = torch.multinomial(cell_weights, samples, replacement=replacement, generator=generator)
+            pixel_weights = blocks[index, cells.to(valid.device)].float().cpu()
+            offsets = torch.multinomial(pixel_weights, 1, generator=generator).squeeze(1)
+            y = (cells // grid_w) * cell + offsets // cell
+            x = (cells % grid_w) * cell + offsets % cell
+            points.append(torch.stack([y, x], dim=1).to(valid.device))
+        return points
+
+    @staticmethod
+    def draw_debug_view(
+        image: torch.Tensor, valid: torch.Tensor, boxes: torch.Tensor, points: torch.Tensor
+    ) -> torch.Tensor:
+        """Draws the mask overlay, crop windows and sampled points on an HWC image."""
+        overlay = torch.tensor([0.0, 1.0, 1.0], dtype=image.dtype, device=image.device)
+        debug_view = image + 0.3 * valid.unsqueeze(-1).to(image.dtype) * overlay
+        height, width = image.shape[:2]
+        blue = torch.tensor([0.0, 0.0, 1.0], dtype=image.dtype, device=image.device)
+        red = torch.tensor([1.0, 0.0, 0.0], dtype=image.dtype, device=image.device)
+
+        radius = 5
+        offsets = torch.arange(-radius, radius + 1, device=image.device)
+        disk = offsets[:, None] ** 2 + offsets[None, :] ** 2 <= radius**2
+        for (start_x, start_y, end_x, end_y), (y, x) in zip(boxes.round().long().tolist(), points.tolist()):
+            # 2px outline centered on the window's edges
+            top, bottom = max(start_y - 1, 0), min(end_y + 1, height)
+            left, right = max(start_x - 1, 0), min(end_x + 1, width)
+            debug_view[top : min(start_y + 1, height), left:right] = blue
+            debug_view[max(end_y - 1, 0) : bottom, left:right] = blue
+            debug_view[top:bottom, left : min(start_x + 1, width)] = blue
+            debug_view[top:bottom, max(end_x - 1, 0) : right] = blue
+
+            y0, y1 = max(y - radius, 0), min(y + radius + 1, height)
+            x0, x1 = max(x - radius, 0), min(x + radius + 1, width)
+            window = disk[y0 - (y - radius) : y1 - (y - radius), x0 - (x - radius) : x1 - (x - radius)]
+            debug_view[y0:y1, x0:x1][window] = red
+        return debug_view
+
     def guided_crop(
         self,
         images: torch.Tensor,
@@ -44,89 +122,53 @@ class GuidedRandomCrop:
         min_crop_size: int = 128,
         max_crop_size: int = 256,
         num_samples: int = 4,
+        seed: int = -1,
+        debug_view: bool = True,
     ) -> Tuple[torch.Tensor, torch.Tensor]:
         """
         Perform guided random cropping based on masks
         """
-        # Convert tensors to numpy for easier processing
-        images_np = images.cpu().numpy()
-        masks_np = masks.cpu().numpy()
+        generator = torch.Generator()
+        if seed == -1:
+            generator.seed()
+        else:
+            generator.manual_seed(seed)
+
+        _, height, width, _ = images.shape
+        valid = masks.to(images.device) > 0.5
+        points = self.sample_points(valid, num_samples, generator)
+        kept = [index for index, image_points in enumerate(points) if len(image_points) > 0]
+        if not kept:
+            raise ValueError("No mask pixels above 0.5 in any of the masks")
+
+        batch_indices = torch.cat([torch.full((len(points[index]),), index) for index in kept]).to(images.device)
+        centers = torch.cat([points[index] for index in kept])
+        low, high = sorted((min_crop_size, max_crop_size))
+        sizes = torch.randint(low, high + 1, (len(centers),), generator=generator).to(images.device)
+
+        # Center a window on each point and shift it back inside the image
+        extent = (sizes // 2) * 2
+        start_y = (centers[:, 0] - sizes // 2).clamp(min=0).minimum((height - extent).clamp(min=0))
+        start_x = (centers[:, 1] - sizes // 2).clamp(min=0).minimum((width - extent).clamp(min=0))
+        end_y = (start_y + extent).clamp(max=height)
+        end_x = (start_x + extent).clamp(max=width)
+        boxes = torch.stack([start_x, start_y, end_x, end_y], dim=1).to(images.dtype)
+
+        # One roi_align call crops and resizes every window of the batch
+        crops = ops.roi_align(
+            images.movedim(-1, 1),
+            torch.cat([batch_indices[:, None].to(images.dtype), boxes], dim=1),
+            output_size=(output_height, output_width),
+            spatial_scale=1.0,
+            sampling_ratio=-1,
+            aligned=True,
+        ).movedim(1, -1)
+
+        if not debug_view:
+            return (crops, images[kept])
 
-        batch_size = images_np.shape[0]
-        crops = []
         debug_views = []
-
-        for b in range(batch_size):
-            image = images_np[b]
-            mask = masks_np[b]
-
-            # Find valid points inside the mask where the mask is greater than 0.5
-            valid_points = np.where(mask > 0.5)
-            # If there are no valid points on y-coordinates, skip this image
-            if len(valid_points[0]) == 0:
-                continue
-
-            point_indices = random.sample(range(len(valid_points[0])), min(num_samples, len(valid_points[0])))
-
-            debug_view = image.copy()
-
-            # Add semi-transparent mask overlay
-            mask_overlay = np.zeros_like(image)
-            mask_overlay[mask > 0.5] = [0, 1, 1]
-            debug_view = cv2.addWeighted(debug_view, 1, mask_overlay, 0.3, 0)
-
-            for idx in point_indices:
-                y, x = valid_points[0][idx], valid_points[1][idx]
-                # Randomly select crop dimensions between min and max
-                crop_size = random.randint(min_crop_size, max_crop_size)
-
-                # Calculate initial crop boundaries
-                dimension = crop_size // 2
-
-                # Calculate initial boundaries
-                start_x = x - dimension
-                end_x = x + dimension
-                start_y = y - dimension
-                end_y = y + dimension
-
-                # Shift the box if it goes out of bounds
-                if start_x < 0:
-                    # Shift right
-                    end_x -= start_x  # Add the negative offset
-                    start_x = 0
-                elif end_x > image.shape[1]:
-                    # Shift left
-                    offset = end_x - image.shape[1]
-                    end_x = image.shape[1]
-                    start_x -= offset
-
-                if start_y < 0:
-                    # Shift down
-                    end_y -= start_y  # Add the negative offset
-                    start_y = 0
-                elif end_y > image.shape[0]:
-                    # Shift up
-                    offset = end_y - image.shape[0]
-                    end_y = image.shape[0]
-                    start_y -= offset
-
-                # Get the crop
-                crop = image[start_y:end_y, start_x:end_x]
-
-                # Resize the crop to match output dimensions
-                standardized_crop = cv2.resize(crop, (output_width, output_height), interpolation=cv2.INTER_LINEAR)
-
-                # Append the standardized crop
-                crops.append(standardized_crop)
-
-                # Draw debug visualization
-                cv2.rectangle(debug_view, (start_x, start_y), (end_x, end_y), (0, 0, 1), 2)  # Blue rectangle
-                cv2.circle(debug_view, (x, y), 5, (1, 0, 0), -1)  # Red point
-
-            debug_views.append(debug_view)
-
-        # Convert lists to tensors
-        crops_tensor = torch.from_numpy(np.stack(crops)).to(images.device)
-        debug_views_tensor = torch.from_numpy(np.stack(debug_views)).to(images.device)
-
-        return (crops_tensor, debug_views_tensor)
+        for index in kept:
+            selected = batch_indices == index
+            debug_views.append(self.draw_debug_view(images[index], valid[index], boxes[selected], centers[selected]))
+        return (crops, torch.stack(debug_views))
@@ -5,6 +5,7 @@ from signature_core.functional.transform import rescale
 from signature_core.img.tensor_image import TensorImage
 
 from ...categories import IMAGE_PROCESSING_CAT
+from .shared import RESIZE_FILTERS, resize_tensor
 
 
 class Rescale:
@@ -44,6 +45,7 @@ class Rescale:
         - Antialiasing is recommended when downscaling to prevent artifacts
         - All interpolation methods preserve the value range [0, 1]
         - Memory usage scales quadratically with factor
+        - lanczos, bicubic and bilinear use cached separable filters, with 2x area halving before large downscales
     """
 
     @classmethod
@@ -84,6 +86,12 @@ class Rescale:
     Useful for uniform scaling operations.
     """
 
+    @staticmethod
+    def rescale_tensor(tensor: TensorImage, factor: float, interpolation: str, antialias: bool) -> torch.Tensor:
+        height, width = tensor.shape[-2:]
+        size = (max(round(height * factor), 1), max(round(width * factor), 1))
+        return TensorImage(resize_tensor(tensor, size, interpolation, antialias)).get_BWHC()
+
     def execute(
         self,
         image: Optional[torch.Tensor] = None,
@@ -100,6 +108,11 @@ class Rescale:
         input_mask = (
             TensorImage.from_BWHC(mask) if isinstance(mask, torch.Tensor) else TensorImage(torch.zeros((1, 1, 1, 1)))
         )
+        if interpolation in RESIZE_FILTERS:
+            return (
+                self.rescale_tensor(input_image, factor, interpolation, antialias),
+                self.rescale_tensor(input_mask, factor, interpolation, antialias),
+            )
         output_image = rescale(
             input_image,
             factor,
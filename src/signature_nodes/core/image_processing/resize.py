@@ -5,6 +5,7 @@ from signature_core.functional.transform import resize
 from signature_core.img.tensor_image import TensorImage
 
 from ...categories import IMAGE_PROCESSING_CAT
+from .shared import RESIZE_FILTERS, resize_tensor
 
 
 class Resize:
@@ -53,6 +54,8 @@ class Resize:
         - ASPECT mode preserves proportions using longest edge
         - Antialiasing recommended when downscaling
         - When multiple_of is set, final dimensions will be adjusted to nearest multiple
+        - STRETCH with lanczos, bicubic or bilinear uses cached separable filters, with 2x area halving before
+          large downscales
     """
 
     @classmethod
@@ -92,6 +95,15 @@ class Resize:
     and dimension constraints. Handles both RGB and grayscale inputs.
     """
 
+    @staticmethod
+    def stretch(
+        tensor: Optional[torch.Tensor], channels: int, width: int, height: int, interpolation: str, antialias: bool
+    ) -> torch.Tensor:
+        if not isinstance(tensor, torch.Tensor):
+            return TensorImage(torch.zeros((1, channels, height, width))).get_BWHC()
+        output = resize_tensor(TensorImage.from_BWHC(tensor), (height, width), interpolation, antialias)
+        return TensorImage(output).get_BWHC()
+
     def execute(
         self,
         image: Optional[torch.Tensor] = None,
@@ -103,6 +115,17 @@ class Resize:
         antialias: bool = True,
         multiple_of: int = 1,
     ):
+        if (
+            mode == "STRETCH"
+            and interpolation in RESIZE_FILTERS
+            and width % multiple_of == 0
+            and height % multiple_of == 0
+        ):
+            return (
+                self.stretch(image, 3, width, height, interpolation, antialias),
+                self.stretch(mask, 1, width, height, interpolation, antialias),
+            )
+
         input_image = (
             TensorImage.from_BWHC(image)
             if isinstance(image, torch.Tensor)
@@ -128,14 +128,15 @@ class ResizeWithMegapixels:
 
         target_width, target_height = self.get_dimensions(megapixels, orig_width, orig_height)
 
-        # Create a Resize instance and call its execute method
+        # The target dimensions already keep the aspect ratio, so without a multiple_of constraint they can be used
+        # as is, which takes Resize's cached-filter path
         resize_node = Resize()
         output_image, output_mask = resize_node.execute(
             image=image,
             mask=mask,
             width=target_width,
             height=target_height,
-            mode="ASPECT",
+            mode="STRETCH" if multiple_of == 1 else "ASPECT",
             interpolation=interpolation,
             antialias=antialias,
             multiple_of=multiple_of,
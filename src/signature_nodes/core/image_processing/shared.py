@@ -0,0 +1,126 @@
+import math
+from functools import lru_cache
+
+import torch
+import torch.nn.functional as F
+
+
+def _triangle(x: torch.Tensor) -> torch.Tensor:
+    return (1.0 - x.abs()).clamp(min=0.0)
+
+
+def _cubic(x: torch.Tensor, a: float = -0.5) -> torch.Tensor:
+    x = x.abs()
+    near = ((a + 2.0) * x - (a + 3.0)) * x * x + 1.0
+    far = ((a * x - 5.0 * a) * x + 8.0 * a) * x - 4.0 * a
+    return torch.where(x <= 1.0, near, torch.where(x < 2.0, far, torch.zeros_like(x)))
+
+
+def _lanczos(x: torch.Tensor, a: float = 3.0) -> torch.Tensor:
+    return torch.where(x.abs() < a, torch.sinc(x) * torch.sinc(x / a), torch.zeros_like(x))
+
+
+# Separable filters and their support radius in input pixels
+RESIZE_FILTERS = {
+    "bilinear": (_triangle, 1.0),
+    "bicubic": (_cubic, 2.0),
+    "lanczos": (_lanczos, 3.0),
+}
+
+
+@lru_cache(maxsize=512)
+def resize_weights(
+    in_size: int, out_size: int, interpolation: str, antialias: bool, device: str = "cpu"
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """Returns the banded weight matrix resampling one axis from in_size to out_size.
+
+    Row i of the matrix has its non-zero weights at columns indices[i], so the resampled axis is
+    sum_k weights[:, k] * x[indices[:, k]]. Taps outside the input are dropped and each row is renormalized, like
+    PIL. With antialias, the filter is stretched by the downscale ratio.
+
+    Args:
+        in_size (int): Input length.
+        out_size (int): Output length.
+        interpolation (str): One of RESIZE_FILTERS.
+        antialias (bool): Whether to widen the filter when downscaling.
+        device (str): Device of the returned tensors.
+
+    Returns:
+        tuple[torch.Tensor, torch.Tensor]: (indices, weights), both of shape (out_size, taps).
+    """
+    kernel, support = RESIZE_FILTERS[interpolation]
+    scale = in_size / out_size
+    filter_scale = max(scale, 1.0) if antialias else 1.0
+    radius = support * filter_scale
+    taps = math.ceil(2 * radius) + 1
+
+    centers = (torch.arange(out_size, dtype=torch.float64) + 0.5) * scale
+    first = torch.floor(centers - radius).long()
+    indices = first[:, None] + torch.arange(taps)[None, :]
+    weights = kernel((indices.double() + 0.5 - centers[:, None]) / filter_scale)
+    weights = torch.where((indices >= 0) & (indices < in_size), weights, torch.zeros_like(weights))
+    weights = weights / weights.sum(dim=1, keepdim=True).clamp(min=1e-12)
+    indices = indices.clamp(0, in_size - 1)
+    return indices.to(device), weights.float().to(device)
+
+
+def _resample_axis(tensor: torch.Tensor, dim: int, out_size: int, interpolation: str, antialias: bool) -> torch.Tensor:
+    in_size = tensor.shape[dim]
+    if in_size == out_size:
+        return tensor
+    indices, weights = resize_weights(in_size, out_size, interpolation, antialias, str(tensor.device))
+    shape = [1] * tensor.dim()
+    shape[dim] = out_size
+    output = None
+    # One gather per tap keeps memory at twice the output instead of taps times the output
+    for tap in range(indices.shape[1]):
+        term = tensor.index_select(dim, indices[:, tap]) * weights[:, tap].to(tensor.dtype).view(shape)
+        output = term if output is None else output.add_(term)
+    return output
+
+
+def resize_tensor(
+    tensor: torch.Tensor,
+    size: tuple[int, int],
+    interpolation: str = "lanczos",
+    antialias: bool = True,
+    reducing_gap: float = 2.0,
+) -> torch.Tensor:
+    """Resizes a BCHW tensor to (height, width) with cached separable filters.
+
+    Large downscales first halve the input with 2x2 area averaging while it stays at least reducing_gap times the
+    target, so the final filtered step only spans a few taps. "nearest" and "area" use F.interpolate directly.
+
+    Args:
+        tensor (torch.Tensor): Input in BCHW format with values in range [0, 1].
+        size (tuple[int, int]): Output (height, width).
+        interpolation (str): "lanczos", "bicubic", "bilinear", "nearest" or "area".
+        antialias (bool): Whether to filter when downscaling. Halving is only used with antialias.
+        reducing_gap (float): Minimum ratio kept between the halved input and the target.
+
+    Returns:
+        torch.Tensor: Resized tensor in BCHW format, clamped to [0, 1].
+    """
+    out_h, out_w = size
+    if tuple(tensor.shape[-2:]) == (out_h, out_w):
+        return tensor
+    if interpolation not in RESIZE_FILTERS:
+        mode = "nearest-exact" if interpolation == "nearest" else interpolation
+        return F.interpolate(tensor, size=(out_h, out_w), mode=mode)
+
+    dtype = tensor.dtype
+    output = tensor.float()
+    while antialias:
+        halve_h = output.shape[-2] >= 2 * reducing_gap * out_h
+        halve_w = output.shape[-1] >= 2 * reducing_gap * out_w
+        if not halve_h and not halve_w:
+            break
+        kernel = (2 if halve_h else 1, 2 if halve_w else 1)
+        output = F.avg_pool2d(output, kernel, stride=kernel, ceil_mode=True, count_include_pad=False)
+
+    # Resample the axis that shrinks the most first, so the second pass works on less data
+    height_first = out_h / output.shape[-2] <= out_w / output.shape[-1]
+    axes = [(-2, out_h), (-1, out_w)] if height_first else [(-1, out_w), (-2, out_h)]
+    for dim, out_size in axes:
+        output = _resample_axis(output, dim, out_size, interpolation, antialias)
+    return output.clamp_(0.0, 1.0).to(dtype)
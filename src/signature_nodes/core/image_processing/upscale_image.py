@@ -1,3 +1,4 @@
+import logging
 from typing import Optional
 
 import comfy  # type: ignore
@@ -8,9 +9,10 @@ from signature_core.functional.transform import (
     resize,
 )
 from signature_core.img.tensor_image import TensorImage
-from spandrel import ImageModelDescriptor, ModelLoader
+from spandrel import ImageModelDescriptor
 
 from ...categories import IMAGE_PROCESSING_CAT
+from ..models.shared import load_upscale_model, plan_upscale, resample, upscale_with_model
 
 
 class UpscaleImage:
@@ -35,6 +37,8 @@ class UpscaleImage:
             Options: "bilinear", "nearest", "bicubic", "area". Defaults to "bilinear".
         tiled_size (int, optional): Size of processing tiles in pixels. Larger tiles use more GPU memory.
             Defaults to 512.
+        allow_input_downscale (bool, optional): Lets the planner shrink the input before the first model pass when
+            the model overshoots the target, trading some detail for speed. Defaults to False.
 
     Returns:
         tuple[torch.Tensor]: Single-element tuple containing:
@@ -46,12 +50,13 @@ class UpscaleImage:
         TypeError: If input tensors are of incorrect type
 
     Notes:
-        - Models are loaded from the "upscale_models" directory
+        - Models are loaded from the "upscale_models" directory and kept on the device between executions
         - Processing is done in tiles to manage GPU memory efficiently
-        - For large upscaling factors, multiple passes may be performed
+        - For large upscaling factors, multiple passes may be performed. Intermediate results are downscaled to
+          the size the remaining passes need, and the plan and its cost are logged
         - The aspect ratio is always preserved in "resize" mode
         - If GPU memory is insufficient, tile size is automatically reduced
-        - Tiled processing may show slight seams with some models
+        - Overlapping tiles are blended with weighted windows to hide seams
         - Final output is always clamped to [0, 1] range
         - Model scale factor is automatically detected and respected
         - Progress bar shows processing status for large images
@@ -79,7 +84,10 @@ class UpscaleImage:
                     "INT",
                     {"default": 512, "min": 128, "max": 2048, "step": 128},
                 ),
-            }
+            },
+            "optional": {
+                "allow_input_downscale": ("BOOLEAN", {"default": False}),
+            },
         }
 
     RETURN_TYPES = ("IMAGE",)
@@ -92,16 +100,7 @@ class UpscaleImage:
     """
 
     def load_model(self, model_name):
-        model_path = folder_paths.get_full_path("upscale_models", model_name)
-        sd = comfy.utils.load_torch_file(model_path, safe_load=True)
-        if "module.layers.0.residual_group.blocks.0.norm1.weight" in sd:
-            sd = comfy.utils.state_dict_prefix_replace(sd, {"module.": ""})
-        out = ModelLoader().load_from_state_dict(sd)
-
-        if not isinstance(out, ImageModelDescriptor):
-            raise ValueError("Upscale model must be a single-image model.")
-
-        return out
+        return load_upscale_model(model_name, comfy.model_management.get_torch_device())
 
     def upscale_with_model(
         self,
@@ -120,43 +119,7 @@ class UpscaleImage:
         if not hasattr(upscale_model, "scale"):
             raise ValueError("upscale_model must have a scale attribute")
 
-        memory_required = comfy.model_management.module_size(upscale_model.model)
-        memory_required += (tile * tile * 3) * image.element_size() * max(upscale_model.scale, 1.0) * 384.0
-        memory_required += image.nelement() * image.element_size()
-        comfy.model_management.free_memory(memory_required, device)
-        in_img = image.movedim(-1, -3).to(device)
-
-        s = None
-        oom = True
-        while oom:
-            try:
-                steps = in_img.shape[0] * comfy.utils.get_tiled_scale_steps(
-                    in_img.shape[3],
-                    in_img.shape[2],
-                    tile_x=tile,
-                    tile_y=tile,
-                    overlap=overlap,
-                )
-                pbar = comfy.utils.ProgressBar(steps)
-                s = comfy.utils.tiled_scale(
-                    in_img,
-                    lambda a: upscale_model(a),
-                    tile_x=tile,
-                    tile_y=tile,
-                    overlap=overlap,
-                    upscale_amount=upscale_model.scale,
-                    pbar=pbar,
-                )
-                oom = False
-            except comfy.model_management.OOM_EXCEPTION as e:
-                tile //= 2
-                if tile < 128:
-                    raise e
-
-        if not isinstance(s, torch.Tensor):
-            raise ValueError("Upscaling failed")
-        s = torch.clamp(s.movedim(-3, -1), min=0, max=1.0)  # type: ignore
-        return s
+        return upscale_with_model(image, upscale_model, device, tile=tile, overlap=overlap)
 
     def execute(
         self,
@@ -167,25 +130,24 @@ class UpscaleImage:
         resize_size: int = 1024,
         resampling_method: str = "bilinear",
         tiled_size: int = 512,
+        allow_input_downscale: bool = False,
     ):
-        # Load upscale model
-        up_model = self.load_model(upscale_model)
+        # The model is cached and stays on the device between executions
         device = comfy.model_management.get_torch_device()
-        up_model.to(device)
+        up_model = load_upscale_model(upscale_model, device)
 
         # target size
         _, H, W, _ = image.shape
         target_size = resize_size if mode == "resize" else max(H, W) * rescale_factor
-        current_size = max(H, W)
+        plan = plan_upscale(H, W, target_size, up_model.scale, allow_input_downscale)
+        logging.info(
+            f"Upscale plan for {W}x{H} to {target_size:.0f}px with a {up_model.scale}x model: {plan.describe()}"
+        )
         up_image = image
-        while current_size < target_size:
-            step = self.upscale_with_model(upscale_model=up_model, image=up_image, device=device, tile=tiled_size)
-            del up_image
-            up_image = step.to("cpu")
-            _, H, W, _ = up_image.shape
-            current_size = max(H, W)
-
-        up_model.to("cpu")
+        for upscale_pass in plan.passes:
+            up_image = resample(up_image, upscale_pass.input_size, "bicubic")
+            up_image = self.upscale_with_model(upscale_model=up_model, image=up_image, device=device, tile=tiled_size)
+
         tensor_image = TensorImage.from_BWHC(up_image)
 
         if mode == "resize":
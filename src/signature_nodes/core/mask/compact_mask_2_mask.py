@@ -0,0 +1,42 @@
+import torch
+
+from ...categories import MASK_CAT
+from .shared import COMPACT_MASK, to_float
+
+
+class CompactMask2Mask:
+    """Converts a compact mask back to ComfyUI's float mask format.
+
+    Compact masks (bool, uint8 or packed) travel through COMPACT_MASK sockets so they never reach nodes that
+    expect float masks. This node promotes them to a regular MASK for any other mask node.
+
+    Args:
+        compact (torch.Tensor | PackedMask): Mask in one of the compact storages
+
+    Returns:
+        tuple[torch.Tensor]: Single-element tuple containing the mask in BWHC format with values in range [0, 1]
+
+    Notes:
+        - bool and packed masks become 0.0 and 1.0
+        - uint8 masks are scaled from 0-255 to [0, 1]
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "compact": (COMPACT_MASK,),
+            },
+        }
+
+    RETURN_TYPES = ("MASK",)
+    FUNCTION = "execute"
+    CATEGORY = MASK_CAT
+    CLASS_ID = "compact_to_mask"
+    DESCRIPTION = """
+    Converts a compact mask (bool, uint8 or packed) back to a regular float mask.
+    Use it to feed compact mask outputs to any node that takes a MASK.
+    """
+
+    def execute(self, compact) -> tuple[torch.Tensor]:
+        return (to_float(compact),)
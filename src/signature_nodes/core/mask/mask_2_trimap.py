@@ -1,8 +1,8 @@
 import torch
-from signature_core.functional.morphology import dilation, erosion
 from signature_core.img.tensor_image import TensorImage
 
 from ...categories import MASK_CAT
+from .shared import COMPACT_MASK, MASK_OR_COMPACT, MASK_STORAGES, dilate, erode, storage_outputs, to_float
 
 
 class Mask2Trimap:
@@ -12,40 +12,51 @@ class Mask2Trimap:
     using threshold values and morphological operations.
 
     Args:
-        mask (torch.Tensor): Input binary mask in BWHC format
+        mask (torch.Tensor): Input binary mask in BWHC format, float or compact
         inner_min_threshold (int): Minimum threshold for inner/foreground region. Default: 200
         inner_max_threshold (int): Maximum threshold for inner/foreground region. Default: 255
         outer_min_threshold (int): Minimum threshold for outer/background region. Default: 15
         outer_max_threshold (int): Maximum threshold for outer/background region. Default: 240
         kernel_size (int): Size of morphological kernel for region processing. Default: 10
+        storage (str): Storage of the processed mask: "float" on the MASK output, or the compact "bool", "uint8"
+            (0-255) or "packed" (1 bit per pixel) on the COMPACT_MASK output. Default: "float"
 
     Returns:
-        tuple[torch.Tensor, torch.Tensor]: Tuple containing:
-            - Processed mask in BWHC format
+        tuple[Optional[torch.Tensor], torch.Tensor, Optional[torch.Tensor]]: Tuple containing:
+            - Processed mask in BWHC format, set for the "float" storage
             - Trimap tensor with foreground, background, and uncertain regions
+            - Processed mask in the compact storage, set for the other storages
 
     Raises:
         ValueError: If mask is not a valid torch.Tensor
 
     Notes:
         - Output trimap has values: 0 (background), 0.5 (uncertain), 1 (foreground)
+        - The foreground is the thresholded mask eroded once, the uncertain band is its dilation by 5 iterations
+        - The whole batch is processed at once on boolean masks
         - Kernel size affects the smoothness of region boundaries
+        - Compact input masks are promoted to float for thresholding. A bool or packed processed mask keeps only
+          the foreground, a uint8 one stores the uncertain region as 128
     """
 
     @classmethod
     def INPUT_TYPES(cls):
         return {
             "required": {
-                "mask": ("MASK",),
+                "mask": (MASK_OR_COMPACT,),
                 "inner_min_threshold": ("INT", {"default": 200, "min": 0, "max": 255}),
                 "inner_max_threshold": ("INT", {"default": 255, "min": 0, "max": 255}),
                 "outer_min_threshold": ("INT", {"default": 15, "min": 0, "max": 255}),
                 "outer_max_threshold": ("INT", {"default": 240, "min": 0, "max": 255}),
                 "kernel_size": ("INT", {"default": 10, "min": 1, "max": 100}),
-            }
+            },
+            "optional": {
+                "storage": (MASK_STORAGES,),
+            },
         }
 
-    RETURN_TYPES = ("MASK", "TRIMAP")
+    RETURN_TYPES = ("MASK", "TRIMAP", COMPACT_MASK)
+    RETURN_NAMES = ("mask", "trimap", "compact")
     FUNCTION = "execute"
     CATEGORY = MASK_CAT
     CLASS_ID = "mask_trimap"
@@ -63,46 +74,23 @@ class Mask2Trimap:
         outer_min_threshold: int = 15,
         outer_max_threshold: int = 240,
         kernel_size: int = 10,
-    ) -> tuple[torch.Tensor, torch.Tensor]:
-        step = TensorImage.from_BWHC(mask)
-        inner_mask = TensorImage(step.clone())
-        inner_mask[inner_mask > (inner_max_threshold / 255.0)] = 1.0
-        inner_mask[inner_mask <= (inner_min_threshold / 255.0)] = 0.0
+        storage: str = "float",
+    ) -> tuple:
+        step = TensorImage.from_BWHC(to_float(mask))
 
-        step = TensorImage.from_BWHC(mask)
-        inner_mask = erosion(image=inner_mask, kernel_size=kernel_size, iterations=1)
+        # Inner band: pixels above the inner minimum threshold, eroded. Outer band: the inner band dilated
+        inner = erode(step > (inner_min_threshold / 255.0), kernel_size=kernel_size, iterations=1)
+        outer = dilate(inner, kernel_size=kernel_size, iterations=5)
 
-        inner_mask[inner_mask != 0.0] = 1.0
+        trimap_im = outer.to(step.dtype).mul_(0.5).masked_fill_(inner, 1.0)
+        # Channel 0 marks the background, channel 1 the foreground
+        trimap = torch.cat([~outer, inner], dim=1).to(step.dtype)
 
-        outter_mask = step.clone()
-        outter_mask[outter_mask > (outer_max_threshold / 255.0)] = 1.0
-        outter_mask[outter_mask <= (outer_min_threshold / 255.0)] = 0.0
-        outter_mask = dilation(image=inner_mask, kernel_size=kernel_size, iterations=5)
-
-        outter_mask[outter_mask != 0.0] = 1.0
-
-        trimap_im = torch.zeros_like(step)
-        trimap_im[outter_mask == 1.0] = 0.5
-        trimap_im[inner_mask == 1.0] = 1.0
-        batch_size = step.shape[0]
-
-        trimap = torch.zeros(
-            batch_size,
-            2,
-            step.shape[2],
-            step.shape[3],
-            dtype=step.dtype,
-            device=step.device,
-        )
-        for i in range(batch_size):
-            tar_trimap = trimap_im[i][0]
-            trimap[i][1][tar_trimap == 1] = 1
-            trimap[i][0][tar_trimap == 0] = 1
-
-        output_0 = TensorImage(trimap_im).get_BWHC()
+        output_0, compact = storage_outputs(TensorImage(trimap_im).get_BWHC(), storage)
         output_1 = trimap.permute(0, 2, 3, 1)
 
         return (
             output_0,
             output_1,
+            compact,
         )
@@ -0,0 +1,180 @@
+from typing import Optional
+
+import torch
+
+from ...categories import MASK_CAT
+from .shared import MASK_OR_COMPACT, connected_components, to_binary
+
+
+def _first_last(active: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
+    """Indices of the first and last True along the last axis, for rows with at least one True."""
+    length = active.shape[-1]
+    positions = torch.arange(length, device=active.device)
+    first = torch.where(active, positions, length).amin(dim=-1)
+    last = torch.where(active, positions, -1).amax(dim=-1)
+    return first, last
+
+
+class MaskAnalytics:
+    """Computes per-item and per-component statistics of a batch of masks in one pass.
+
+    For every mask of the batch, returns its area, bounding box and centroid, the IoU against every mask of an
+    optional second batch, and its connected components with their own area, bounding box and centroid. Every
+    statistic is computed for the whole batch at once with tensor operations, including the connected component
+    labelling, which uses label propagation.
+
+    Args:
+        mask (torch.Tensor): Input masks in BWHC format, float or compact
+        threshold (float): Value above which a pixel belongs to the mask. Default: 0.5
+        connectivity (str): "8" to connect diagonal neighbours, "4" otherwise. Default: "8"
+        min_component_area (int): Components with fewer pixels are dropped from the labels and stats. Default: 0
+        other_mask (torch.Tensor, optional): Second batch of masks for the pairwise IoU
+
+    Returns:
+        tuple[dict, list, list, torch.Tensor]: A tuple containing:
+            - Statistics: "area", "area_fraction", "bbox", "centroid" and "components" per item, "iou" as a
+              matrix with one row per mask and one column per other mask (None without other_mask), and
+              "labels" as an int64 tensor of shape (B, H, W)
+            - The area of each mask in pixels
+            - The bounding box of each mask as [x, y, width, height], None for empty masks
+            - The component labels scaled to [0, 1] per mask, for previews
+
+    Notes:
+        - Centroids are [x, y] pixel coordinates, None for empty masks
+        - Each component is a dict with "label", "area", "bbox" and "centroid", labels start at 1 in every mask
+        - The IoU of two empty masks is 1.0
+        - Masks are thresholded once, soft values are never promoted to float
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "mask": (MASK_OR_COMPACT,),
+                "threshold": ("FLOAT", {"default": 0.5, "min": 0.0, "max": 1.0, "step": 0.01}),
+                "connectivity": (["8", "4"],),
+                "min_component_area": ("INT", {"default": 0, "min": 0, "max": 100000000, "step": 1}),
+            },
+            "optional": {
+                "other_mask": (MASK_OR_COMPACT,),
+            },
+        }
+
+    RETURN_TYPES = ("DICT", "LIST", "LIST", "MASK")
+    RETURN_NAMES = ("stats", "areas", "bboxes", "components")
+    FUNCTION = "execute"
+    CATEGORY = MASK_CAT
+    DESCRIPTION = """
+    Computes per-item statistics of a batch of masks in one pass: area, bounding box, centroid,
+    IoU against a second batch and connected components with their own stats.
+    Useful for quality checks and cropping logic over long mask batches.
+    """
+
+    @staticmethod
+    def foreground(mask, threshold: float) -> torch.Tensor:
+        binary = to_binary(mask, threshold)
+        return binary.unsqueeze(0) if binary.dim() == 2 else binary
+
+    @staticmethod
+    def pairwise_iou(first: torch.Tensor, second: torch.Tensor) -> torch.Tensor:
+        # float64 keeps pixel counts exact beyond 16MP, MPS only has float32
+        dtype = torch.float32 if first.device.type == "mps" else torch.float64
+        a = first.flatten(1).to(dtype)
+        b = second.to(first.device).flatten(1).to(dtype)
+        intersection = a @ b.T
+        union = a.sum(dim=1)[:, None] + b.sum(dim=1)[None, :] - intersection
+        return torch.where(union > 0, intersection / union.clamp(min=1), 1.0)
+
+    @staticmethod
+    def component_stats(labels: torch.Tensor, counts: torch.Tensor, min_area: int) -> tuple[list, torch.Tensor]:
+        batch, height, width = labels.shape
+        offsets = torch.cat([counts.new_zeros(1), counts.cumsum(0)[:-1]])
+        total = int(counts.sum())
+        # Global component id, 0 for the background
+        ids = torch.where(labels > 0, labels + offsets.view(-1, 1, 1), 0).flatten()
+        ys = torch.arange(height, device=labels.device).view(1, -1, 1).expand(batch, -1, width).flatten()
+        xs = torch.arange(width, device=labels.device).view(1, 1, -1).expand(batch, height, -1).flatten()
+
+        def reduce(values: torch.Tensor, operation: str, initial: int) -> torch.Tensor:
+            output = torch.full((total + 1,), initial, dtype=values.dtype, device=values.device)
+            return output.scatter_reduce(0, ids, values, reduce=operation, include_self=True)[1:]
+
+        areas = torch.bincount(ids, minlength=total + 1)[1:]
+        sum_x, sum_y = reduce(xs, "sum", 0), reduce(ys, "sum", 0)
+        min_x, max_x = reduce(xs, "amin", width), reduce(xs, "amax", -1)
+        min_y, max_y = reduce(ys, "amin", height), reduce(ys, "amax", -1)
+
+        kept = areas >= max(min_area, 1)
+        if not bool(kept.all()):
+            # Renumber the kept components from 1 within each mask and clear the dropped ones
+            owner = torch.repeat_interleave(torch.arange(batch, device=labels.device), counts)
+            kept_counts = torch.zeros(batch, dtype=torch.long, device=labels.device).index_add_(0, owner, kept.long())
+            kept_offsets = torch.cat([kept_counts.new_zeros(1), kept_counts.cumsum(0)[:-1]])
+            new_labels = kept.long().cumsum(0) - kept_offsets[owner]
+            mapping = torch.cat([new_labels.new_zeros(1), torch.where(kept, new_labels, 0)])
+            labels = mapping[ids].view(batch, height, width)
+
+        rows = torch.stack([areas, min_x, min_y, max_x - min_x + 1, max_y - min_y + 1], dim=1).tolist()
+        centroids = (torch.stack([sum_x, sum_y], dim=1).cpu().double() / areas.cpu().clamp(min=1)[:, None]).tolist()
+        kept_list = kept.tolist()
+        components: list[list[dict]] = [[] for _ in range(batch)]
+        index = 0
+        for item, count in enumerate(counts.tolist()):
+            for _ in range(count):
+                if kept_list[index]:
+                    area, x, y, w, h = rows[index]
+                    components[item].append(
+                        {
+                            "label": len(components[item]) + 1,
+                            "area": area,
+                            "bbox": [x, y, w, h],
+                            "centroid": centroids[index],
+                        }
+                    )
+                index += 1
+        return components, labels
+
+    def execute(
+        self,
+        mask: torch.Tensor,
+        threshold: float = 0.5,
+        connectivity: str = "8",
+        min_component_area: int = 0,
+        other_mask: Optional[torch.Tensor] = None,
+    ) -> tuple[dict, list, list, torch.Tensor]:
+        foreground = self.foreground(mask, threshold)
+        batch, height, width = foreground.shape
+
+        areas = foreground.sum(dim=(1, 2))
+        first_x, last_x = _first_last(foreground.any(dim=1))
+        first_y, last_y = _first_last(foreground.any(dim=2))
+        # Integer sums stay exact on every device
+        sum_x = (foreground.sum(dim=1) * torch.arange(width, device=foreground.device)).sum(dim=1)
+        sum_y = (foreground.sum(dim=2) * torch.arange(height, device=foreground.device)).sum(dim=1)
+
+        labels, counts = connected_components(foreground, int(connectivity))
+        components, labels = self.component_stats(labels, counts, min_component_area)
+
+        iou = None
+        if other_mask is not None:
+            other = self.foreground(other_mask, threshold)
+            iou = self.pairwise_iou(foreground, other).tolist()
+
+        area_list = areas.tolist()
+        boxes = torch.stack([first_x, first_y, last_x - first_x + 1, last_y - first_y + 1], dim=1).tolist()
+        centers = torch.stack([sum_x, sum_y], dim=1).cpu().double() / areas.cpu().clamp(min=1)[:, None]
+        bboxes = [box if area > 0 else None for box, area in zip(boxes, area_list)]
+        centroids = [center if area > 0 else None for center, area in zip(centers.tolist(), area_list)]
+
+        stats = {
+            "area": area_list,
+            "area_fraction": [area / (height * width) for area in area_list],
+            "bbox": bboxes,
+            "centroid": centroids,
+            "iou": iou,
+            "components": components,
+            "labels": labels,
+        }
+        max_labels = labels.flatten(1).amax(dim=1).clamp(min=1).view(-1, 1, 1)
+        preview = labels.float() / max_labels
+        return (stats, area_list, bboxes, preview)
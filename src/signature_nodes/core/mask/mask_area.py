@@ -1,5 +1,9 @@
+import math
+
 import torch
 
+from .shared import MASK_OR_COMPACT, PackedMask, to_binary
+
 
 class MaskArea:
     """
@@ -12,6 +16,9 @@ class MaskArea:
         mask (torch.Tensor): A binary mask tensor where white pixels (values > 0.5)
                             represent areas of interest.
 
+        The mask can also be a COMPACT_MASK in one of the compact storages (bool, uint8 or packed), which are
+        counted without converting them to float.
+
     Outputs:
         PERCENTAGE (float): The percentage of white pixels in the mask (0-100%).
         PIXELS (int): The absolute count of white pixels in the mask.
@@ -27,7 +34,7 @@ class MaskArea:
     def INPUT_TYPES(cls):
         return {
             "required": {
-                "mask": ("MASK",),
+                "mask": (MASK_OR_COMPACT,),
             }
         }
 
@@ -38,12 +45,16 @@ class MaskArea:
     DESCRIPTION = "Extracts white areas from a mask"
 
     def execute(self, mask: torch.Tensor) -> tuple[float, int]:
-        # Calculate total number of pixels
-        total_pixels = mask.numel()
-
-        # Count white pixels (pixels with value close to 1.0)
-        # Using a threshold to account for floating point precision
-        white_pixels = int(torch.sum(mask > 0.5).item())
+        if isinstance(mask, PackedMask):
+            total_pixels = math.prod(mask.shape)
+            white_pixels = mask.count()
+        else:
+            # Calculate total number of pixels
+            total_pixels = mask.numel()
+
+            # Count white pixels (pixels with value close to 1.0)
+            # Using a threshold to account for floating point precision
+            white_pixels = int(torch.sum(to_binary(mask)).item())
 
         # Calculate percentage of white pixels
         white_percentage = (white_pixels / total_pixels) * 100.0 if total_pixels > 0 else 0.0
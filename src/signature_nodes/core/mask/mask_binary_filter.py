@@ -2,6 +2,7 @@ import torch
 from signature_core.img.tensor_image import TensorImage
 
 from ...categories import MASK_CAT
+from .shared import COMPACT_MASK, MASK_OR_COMPACT, MASK_STORAGES, is_compact, storage_outputs, to_binary
 
 
 class MaskBinaryFilter:
@@ -11,11 +12,14 @@ class MaskBinaryFilter:
     binary mask.
 
     Args:
-        mask (torch.Tensor): Input mask in BWHC format
+        mask (torch.Tensor): Input mask in BWHC format, float or compact
         threshold (float): Threshold value for binary conversion. Default: 0.01
+        storage (str): Storage of the output mask: "float" on the MASK output, or the compact "bool", "uint8"
+            (0-255) or "packed" (1 bit per pixel) on the COMPACT_MASK output. Default: "float"
 
     Returns:
-        tuple[torch.Tensor]: Single-element tuple containing the binary mask
+        tuple[torch.Tensor, Optional[torch.Tensor]]: Tuple containing the binary mask as a float mask and as a
+            compact mask, only the one matching the storage is set
 
     Raises:
         ValueError: If mask is not a valid torch.Tensor
@@ -24,21 +28,27 @@ class MaskBinaryFilter:
         - Values > threshold become 1.0
         - Values ≤ threshold become 0.0
         - Useful for cleaning up masks with intermediate values
+        - Compact input masks are thresholded without converting them to float. A uint8 mask's threshold is
+          scaled to 0-255
     """
 
     @classmethod
     def INPUT_TYPES(cls):
         return {
             "required": {
-                "mask": ("MASK",),
+                "mask": (MASK_OR_COMPACT,),
                 "threshold": (
                     "FLOAT",
                     {"default": 0.01, "min": 0.00, "max": 1.00, "step": 0.01},
                 ),
-            }
+            },
+            "optional": {
+                "storage": (MASK_STORAGES,),
+            },
         }
 
-    RETURN_TYPES = ("MASK",)
+    RETURN_TYPES = ("MASK", COMPACT_MASK)
+    RETURN_NAMES = ("mask", "compact")
     FUNCTION = "execute"
     CATEGORY = MASK_CAT
     DESCRIPTION = """
@@ -47,9 +57,12 @@ class MaskBinaryFilter:
     black and white mask without intermediate values.
     """
 
-    def execute(self, mask: torch.Tensor, threshold: float = 0.01) -> tuple[torch.Tensor]:
+    def execute(self, mask: torch.Tensor, threshold: float = 0.01, storage: str = "float") -> tuple:
+        if storage != "float" or is_compact(mask):
+            return storage_outputs(to_binary(mask, threshold), storage)
+
         step = TensorImage.from_BWHC(mask)
         step[step > threshold] = 1.0
         step[step <= threshold] = 0.0
         output = TensorImage(step).get_BWHC()
-        return (output,)
+        return (output, None)
@@ -2,6 +2,16 @@ import torch
 from signature_core.img.tensor_image import TensorImage
 
 from ...categories import MASK_CAT
+from .shared import (
+    COMPACT_MASK,
+    MASK_OR_COMPACT,
+    MASK_STORAGES,
+    PackedMask,
+    is_compact,
+    storage_outputs,
+    to_binary,
+    to_uint8,
+)
 
 
 class MaskBitwise:
@@ -11,17 +21,20 @@ class MaskBitwise:
     or comparing mask regions.
 
     Args:
-        mask_1 (torch.Tensor): First input mask in BWHC format
-        mask_2 (torch.Tensor): Second input mask in BWHC format
+        mask_1 (torch.Tensor): First input mask in BWHC format, float or compact
+        mask_2 (torch.Tensor): Second input mask in BWHC format, float or compact
         mode (str): Bitwise operation to apply. Options:
             - "and": Intersection of masks
             - "or": Union of masks
             - "xor": Exclusive OR of masks
             - "left_shift": Left bit shift using mask_2 as shift amount
             - "right_shift": Right bit shift using mask_2 as shift amount
+        storage (str): Storage of the output mask: "float" on the MASK output, or the compact "bool", "uint8"
+            (0-255) or "packed" (1 bit per pixel) on the COMPACT_MASK output. Default: "float"
 
     Returns:
-        tuple[torch.Tensor]: A single-element tuple containing the resulting mask in BWHC format
+        tuple[torch.Tensor, Optional[torch.Tensor]]: Tuple containing the resulting mask in BWHC format as a float
+            mask and as a compact mask, only the one matching the storage is set
 
     Raises:
         ValueError: If mode is not one of the supported operations
@@ -29,19 +42,24 @@ class MaskBitwise:
     Notes:
         - Masks are converted to 8-bit (0-255) before operations and back to float (0-1) after
         - Shift operations use the second mask values as the number of bits to shift
+        - With two bool or packed masks, and, or and xor run as logical operations without any conversion
     """
 
     @classmethod
     def INPUT_TYPES(cls):
         return {
             "required": {
-                "mask_1": ("MASK",),
-                "mask_2": ("MASK",),
+                "mask_1": (MASK_OR_COMPACT,),
+                "mask_2": (MASK_OR_COMPACT,),
                 "mode": (["and", "or", "xor", "left_shift", "right_shift"],),
             },
+            "optional": {
+                "storage": (MASK_STORAGES,),
+            },
         }
 
-    RETURN_TYPES = ("MASK",)
+    RETURN_TYPES = ("MASK", COMPACT_MASK)
+    RETURN_NAMES = ("mask", "compact")
     FUNCTION = "execute"
     CATEGORY = MASK_CAT
     DESCRIPTION = """
@@ -50,11 +68,26 @@ class MaskBitwise:
     Useful for combining or comparing mask regions in precise ways.
     """
 
-    def execute(self, mask_1: torch.Tensor, mask_2: torch.Tensor, mode: str = "and") -> tuple[torch.Tensor]:
+    @staticmethod
+    def execute_compact(mask_1, mask_2, mode: str, storage: str):
+        binary = all(isinstance(mask, PackedMask) or mask.dtype == torch.bool for mask in (mask_1, mask_2))
+        if binary and mode in ("and", "or", "xor"):
+            result = getattr(torch, f"logical_{mode}")(to_binary(mask_1), to_binary(mask_2))
+        else:
+            try:
+                result = getattr(torch, f"bitwise_{mode}")(to_uint8(mask_1), to_uint8(mask_2))
+            except AttributeError:
+                raise ValueError(f"Invalid mode: {mode}")
+        return storage_outputs(result, storage)
+
+    def execute(self, mask_1: torch.Tensor, mask_2: torch.Tensor, mode: str = "and", storage: str = "float") -> tuple:
+        if storage != "float" or is_compact(mask_1) or is_compact(mask_2):
+            return self.execute_compact(mask_1, mask_2, mode, storage)
+
         input_mask_1 = TensorImage.from_BWHC(mask_1)
         input_mask_2 = TensorImage.from_BWHC(mask_2)
-        eight_bit_mask_1 = torch.tensor(input_mask_1 * 255, dtype=torch.uint8)
-        eight_bit_mask_2 = torch.tensor(input_mask_2 * 255, dtype=torch.uint8)
+        eight_bit_mask_1 = (input_mask_1 * 255).to(torch.uint8)
+        eight_bit_mask_2 = (input_mask_2 * 255).to(torch.uint8)
 
         try:
             result = getattr(torch, f"bitwise_{mode}")(eight_bit_mask_1, eight_bit_mask_2)
@@ -63,4 +96,4 @@ class MaskBitwise:
 
         float_result = result.float() / 255
         output_mask = TensorImage(float_result).get_BWHC()
-        return (output_mask,)
+        return (output_mask, None)
@@ -0,0 +1,292 @@
+import ast
+import string
+from functools import lru_cache
+from typing import Any, Callable
+
+import torch
+from kornia import filters
+
+from ...categories import MASK_CAT
+from .shared import (
+    COMPACT_MASK,
+    MASK_OR_COMPACT,
+    MASK_STORAGES,
+    PackedMask,
+    dilate,
+    erode,
+    storage_outputs,
+    to_float,
+)
+
+SLOT_NAMES = string.ascii_lowercase[:10]
+
+# A value is a tensor or a float constant, with whether the evaluation owns it and may overwrite it in place
+Value = tuple[Any, bool]
+Program = Callable[[dict], Value]
+
+
+def _as_float(value: Any) -> Any:
+    if isinstance(value, torch.Tensor) and value.dtype == torch.bool:
+        return value.float()
+    return value
+
+
+def _is_bool(value: Any) -> bool:
+    return isinstance(value, torch.Tensor) and value.dtype == torch.bool
+
+
+def _binary(bool_op: Callable, float_op: Callable) -> Callable[[Value, Value], Value]:
+    """Builds an operation that runs bool_op on two bool masks and float_op otherwise.
+
+    float_op writes into the left operand when the evaluation owns it and broadcasting keeps its shape.
+    """
+
+    def apply(left: Value, right: Value) -> Value:
+        (a, a_owned), (b, _) = left, right
+        if _is_bool(a) and _is_bool(b) and bool_op is not None:
+            return bool_op(a, b), True
+        a_float, b_float = _as_float(a), _as_float(b)
+        if not isinstance(a_float, torch.Tensor) and not isinstance(b_float, torch.Tensor):
+            return float_op(torch.tensor(a_float), torch.tensor(b_float)).item(), False
+        a_float = a_float if isinstance(a_float, torch.Tensor) else torch.tensor(a_float, device=b_float.device)
+        b_float = b_float if isinstance(b_float, torch.Tensor) else torch.tensor(b_float, device=a_float.device)
+        in_place = a_owned and a_float is a and a.is_floating_point()
+        if in_place and torch.broadcast_shapes(a.shape, b_float.shape) == a.shape:
+            return float_op(a_float, b_float, out=a_float), True
+        return float_op(a_float, b_float), True
+
+    return apply
+
+
+def _invert(operand: Value) -> Value:
+    value, owned = operand
+    if _is_bool(value):
+        return ~value, True
+    if isinstance(value, torch.Tensor):
+        return (value.neg_().add_(1.0) if owned else 1.0 - value), True
+    return 1.0 - value, False
+
+
+def _negate(operand: Value) -> Value:
+    value, owned = operand
+    value = _as_float(value)
+    if isinstance(value, torch.Tensor):
+        return (value.neg_() if owned else -value), True
+    return -value, False
+
+
+def _compare(operator: Callable) -> Callable[[Value, Value], Value]:
+    def apply(left: Value, right: Value) -> Value:
+        a, b = _as_float(left[0]), _as_float(right[0])
+        result = operator(a, b)
+        return result, isinstance(result, torch.Tensor)
+
+    return apply
+
+
+def _blur(operand: Value, radius: Value, sigma: Value | None = None) -> Value:
+    value = _as_float(operand[0])
+    size = 2 * round(radius[0]) + 1
+    if size <= 1:
+        return value, operand[1]
+    deviation = float(sigma[0]) if sigma is not None else max(radius[0] / 2, 0.5)
+    blurred = filters.gaussian_blur2d(value.unsqueeze(-3), (size, size), (deviation, deviation))
+    return blurred.squeeze(-3), True
+
+
+def _grow(operand: Value, radius: Value) -> Value:
+    result = dilate(operand[0], 2 * round(radius[0]) + 1, kernel_shape="disk")
+    # A radius below 0.5 returns the operand itself, which is only owned if the operand was
+    return result, result is not operand[0] or operand[1]
+
+
+def _shrink(operand: Value, radius: Value) -> Value:
+    result = erode(operand[0], 2 * round(radius[0]) + 1, kernel_shape="disk")
+    return result, result is not operand[0] or operand[1]
+
+
+def _clamp(operand: Value, low: Value, high: Value) -> Value:
+    value, owned = operand
+    value = _as_float(value)
+    if owned and value is operand[0]:
+        return value.clamp_(low[0], high[0]), True
+    return value.clamp(low[0], high[0]), True
+
+
+OPERATORS: dict[type, Callable] = {
+    ast.BitAnd: _binary(torch.logical_and, torch.minimum),
+    ast.BitOr: _binary(torch.logical_or, torch.maximum),
+    ast.BitXor: _binary(torch.logical_xor, lambda a, b, out=None: torch.sub(a, b, out=out).abs_()),
+    ast.Add: _binary(None, torch.add),
+    ast.Sub: _binary(None, torch.sub),
+    ast.Mult: _binary(None, torch.mul),
+    ast.Div: _binary(None, torch.div),
+    ast.Gt: _compare(lambda a, b: a > b),
+    ast.GtE: _compare(lambda a, b: a >= b),
+    ast.Lt: _compare(lambda a, b: a < b),
+    ast.LtE: _compare(lambda a, b: a <= b),
+}
+
+FUNCTIONS: dict[str, tuple[Callable, int, int]] = {
+    # name: (function, minimum arguments, maximum arguments)
+    "blur": (_blur, 2, 3),
+    "grow": (_grow, 2, 2),
+    "shrink": (_shrink, 2, 2),
+    "clamp": (_clamp, 3, 3),
+    "min": (_binary(torch.logical_and, torch.minimum), 2, 2),
+    "max": (_binary(torch.logical_or, torch.maximum), 2, 2),
+    "threshold": (OPERATORS[ast.Gt], 2, 2),
+}
+
+
+@lru_cache(maxsize=128)
+def compile_expression(expression: str) -> tuple[Program, tuple[str, ...]]:
+    """Parses a mask expression into a program, once per expression string.
+
+    Args:
+        expression (str): Expression over the mask slots a-j.
+
+    Returns:
+        tuple[Program, tuple[str, ...]]: The program, called with a dict of slot tensors, and the slots it uses.
+
+    Raises:
+        ValueError: If the expression is invalid or uses unsupported syntax.
+    """
+    try:
+        tree = ast.parse(expression, mode="eval").body
+    except SyntaxError as e:
+        raise ValueError(f"Invalid mask expression: {e.msg}")
+    names: set[str] = set()
+
+    def build(node: ast.AST) -> Program:
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            constant = float(node.value)
+            return lambda env: (constant, False)
+        if isinstance(node, ast.Name):
+            if node.id not in SLOT_NAMES:
+                raise ValueError(f"Unknown mask '{node.id}', use one of {', '.join(SLOT_NAMES)}")
+            names.add(node.id)
+            name = node.id
+            return lambda env: (env[name], False)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Invert, ast.Not, ast.USub, ast.UAdd)):
+            operand = build(node.operand)
+            if isinstance(node.op, ast.UAdd):
+                return operand
+            function = _negate if isinstance(node.op, ast.USub) else _invert
+            return lambda env: function(operand(env))
+        if isinstance(node, ast.BinOp) and type(node.op) in OPERATORS:
+            operator, left, right = OPERATORS[type(node.op)], build(node.left), build(node.right)
+            return lambda env: operator(left(env), right(env))
+        if isinstance(node, ast.BoolOp):
+            operator = OPERATORS[ast.BitAnd if isinstance(node.op, ast.And) else ast.BitOr]
+            operands = [build(value) for value in node.values]
+
+            def fold(env: dict) -> Value:
+                result = operands[0](env)
+                for operand in operands[1:]:
+                    result = operator(result, operand(env))
+                return result
+
+            return fold
+        if isinstance(node, ast.Compare) and all(type(op) in OPERATORS for op in node.ops):
+            operands = [build(node.left)] + [build(comparator) for comparator in node.comparators]
+            comparisons = [OPERATORS[type(op)] for op in node.ops]
+
+            def chain(env: dict) -> Value:
+                values = [operand(env) for operand in operands]
+                result = comparisons[0](values[0], values[1])
+                for index, comparison in enumerate(comparisons[1:], start=1):
+                    result = OPERATORS[ast.BitAnd](result, comparison(values[index], values[index + 1]))
+                return result
+
+            return chain
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS:
+            function, minimum, maximum = FUNCTIONS[node.func.id]
+            if node.keywords or not minimum <= len(node.args) <= maximum:
+                raise ValueError(f"{node.func.id}() takes {minimum} to {maximum} positional arguments")
+            arguments = [build(argument) for argument in node.args]
+            return lambda env: function(*(argument(env) for argument in arguments))
+        raise ValueError(f"Unsupported mask expression element: {ast.unparse(node)}")
+
+    program = build(tree)
+    if not names:
+        raise ValueError("The mask expression must use at least one mask")
+    return program, tuple(sorted(names))
+
+
+class MaskExpression:
+    """Combines and post-processes masks with a single expression.
+
+    Replaces chains of mask nodes (bitwise, invert, threshold, blur, grow) with one node. The expression is parsed
+    once and cached, then evaluated on the whole batch, reusing intermediate tensors in place where possible.
+
+    Args:
+        num_slots (str): Number of mask inputs shown.
+        value (str): Expression over the masks a-j, e.g. "blur((a & b) | ~c, 5) > 0.3".
+        a-j (torch.Tensor, optional): Input masks in BWHC format, float or compact.
+        storage (str): Storage of the output mask: "float" on the MASK output, or the compact "bool", "uint8"
+            (0-255) or "packed" (1 bit per pixel) on the COMPACT_MASK output. Default: "float"
+
+    Returns:
+        tuple[Optional[torch.Tensor], Optional[torch.Tensor]]: Tuple containing the resulting mask as a float mask
+            and as a compact mask, only the one matching the storage is set
+
+    Raises:
+        ValueError: If the expression is invalid or uses a mask that is not connected
+
+    Notes:
+        - & | ^ ~ are logical on binary masks and min, max, absolute difference and 1 - x on soft masks
+        - "and", "or" and "not" behave like & | ~
+        - + - * / work on soft values, comparisons (> >= < <=) give binary masks and can be chained
+        - Functions: blur(x, radius, sigma=radius/2), grow(x, radius), shrink(x, radius), clamp(x, min, max),
+          min(x, y), max(x, y), threshold(x, t)
+        - grow and shrink use a disk kernel with running max/min filters
+        - Masks with a batch size of 1 are broadcast against larger batches
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        inputs = {
+            "required": {
+                "num_slots": ([str(i) for i in range(1, 11)], {"default": "2"}),
+                "value": ("STRING", {"default": "a & b"}),
+            },
+            "optional": {
+                "storage": (MASK_STORAGES,),
+            },
+        }
+        for letter in SLOT_NAMES:
+            inputs["optional"][letter] = (MASK_OR_COMPACT, {"forceInput": True})
+        return inputs
+
+    RETURN_TYPES = ("MASK", COMPACT_MASK)
+    RETURN_NAMES = ("mask", "compact")
+    FUNCTION = "execute"
+    CATEGORY = MASK_CAT
+    CLASS_ID = "mask_expression"
+    DESCRIPTION = """
+    Combines and post-processes masks with a single expression, e.g. blur((a & b) | ~c, 5) > 0.3.
+    Supports logical operators, arithmetic, comparisons, blur, grow, shrink and clamp.
+    Replaces chains of mask nodes with a single batched evaluation.
+    """
+
+    def execute(self, num_slots: str = "2", value: str = "a & b", storage: str = "float", **kwargs) -> tuple:
+        program, names = compile_expression(value)
+        missing = [name for name in names if name not in kwargs]
+        if missing:
+            raise ValueError(f"The expression uses masks that are not connected: {', '.join(missing)}")
+
+        env = {}
+        for name in names:
+            mask = kwargs[name]
+            if isinstance(mask, PackedMask):
+                mask = mask.unpack()
+            env[name] = mask if mask.dtype == torch.bool else to_float(mask)
+
+        # In-place operations bump a tensor's version counter, so writes into the inputs are caught for free
+        versions = {name: mask._version for name, mask in env.items()}
+        result, _ = program(env)
+        modified = [name for name, mask in env.items() if mask._version != versions[name]]
+        if modified:
+            raise RuntimeError(f"The mask expression modified its inputs in place: {', '.join(modified)}")
+        return storage_outputs(result, storage)
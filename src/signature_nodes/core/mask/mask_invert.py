@@ -2,6 +2,7 @@ import torch
 from signature_core.img.tensor_image import TensorImage
 
 from ...categories import MASK_CAT
+from .shared import COMPACT_MASK, MASK_OR_COMPACT, MASK_STORAGES, PackedMask, is_compact, storage_outputs
 
 
 class MaskInvert:
@@ -10,10 +11,13 @@ class MaskInvert:
     Creates a negative version of the input mask where white becomes black and vice versa.
 
     Args:
-        mask (torch.Tensor): Input mask in BWHC format
+        mask (torch.Tensor): Input mask in BWHC format, float or compact
+        storage (str): Storage of the output mask: "float" on the MASK output, or the compact "bool", "uint8"
+            (0-255) or "packed" (1 bit per pixel) on the COMPACT_MASK output. Default: "float"
 
     Returns:
-        tuple[torch.Tensor]: Single-element tuple containing the inverted mask
+        tuple[torch.Tensor, Optional[torch.Tensor]]: Tuple containing the inverted mask as a float mask and as a
+            compact mask, only the one matching the storage is set
 
     Raises:
         ValueError: If mask is not a valid torch.Tensor
@@ -22,17 +26,23 @@ class MaskInvert:
         - Each pixel value is subtracted from 1.0
         - Useful for creating negative space masks
         - Preserves the mask's dimensions and format
+        - Compact masks are inverted in their own storage: logical not for bool and packed masks, 255 - value for
+          uint8 masks
     """
 
     @classmethod
     def INPUT_TYPES(cls):
         return {
             "required": {
-                "mask": ("MASK",),
-            }
+                "mask": (MASK_OR_COMPACT,),
+            },
+            "optional": {
+                "storage": (MASK_STORAGES,),
+            },
         }
 
-    RETURN_TYPES = ("MASK",)
+    RETURN_TYPES = ("MASK", COMPACT_MASK)
+    RETURN_NAMES = ("mask", "compact")
     FUNCTION = "execute"
     CATEGORY = MASK_CAT
     DESCRIPTION = """
@@ -41,8 +51,17 @@ class MaskInvert:
     Useful for creating negative space masks or reversing selection areas.
     """
 
-    def execute(self, mask: torch.Tensor) -> tuple[torch.Tensor]:
+    def execute(self, mask: torch.Tensor, storage: str = "float") -> tuple:
+        if storage != "float" or is_compact(mask):
+            if isinstance(mask, PackedMask) or mask.dtype == torch.bool:
+                inverted = ~mask
+            elif mask.dtype == torch.uint8:
+                inverted = 255 - mask
+            else:
+                inverted = 1.0 - mask
+            return storage_outputs(inverted, storage)
+
         step = TensorImage.from_BWHC(mask)
         step = 1.0 - step
         output = TensorImage(step).get_BWHC()
-        return (output,)
+        return (output, None)
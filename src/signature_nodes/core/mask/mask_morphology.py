@@ -1,17 +1,10 @@
 import torch
-from signature_core.functional.morphology import (
-    bottom_hat,
-    closing,
-    dilation,
-    erosion,
-    gradient,
-    opening,
-    top_hat,
-)
+from signature_core.functional.morphology import bottom_hat, closing, gradient, opening, top_hat
 from signature_core.img.tensor_image import TensorImage
 
 from ...categories import MASK_CAT
 from ...shared import MAX_INT
+from .shared import morphology
 
 
 class MaskMorphology:
@@ -32,6 +25,7 @@ class MaskMorphology:
             - "bottom_hat": Difference between closing and input
         kernel_size (int): Size of the morphological kernel. Default: 1
         iterations (int): Number of times to apply the operation. Default: 5
+        kernel_shape (str): "square" or "disk" (approximated by a union of rectangles). Default: "square"
 
     Returns:
         tuple[torch.Tensor]: A single-element tuple containing the processed mask in BWHC format
@@ -42,6 +36,10 @@ class MaskMorphology:
     Notes:
         - Larger kernel sizes and more iterations result in stronger morphological effects
         - Operations are performed using the TensorImage wrapper class for format consistency
+        - Dilation and erosion, and every operation with the disk kernel, use running max/min filters, so their
+          cost does not depend on kernel size or iterations
+        - The other operations with the square kernel use signature_core, so existing workflows keep its
+          definition of iterations for compound operations
     """
 
     @classmethod
@@ -68,7 +66,10 @@ class MaskMorphology:
                     "INT",
                     {"default": 5, "min": 1, "max": MAX_INT, "step": 1},
                 ),
-            }
+            },
+            "optional": {
+                "kernel_shape": (["square", "disk"],),
+            },
         }
 
     RETURN_TYPES = ("MASK",)
@@ -86,25 +87,20 @@ class MaskMorphology:
         operation: str = "dilation",
         kernel_size: int = 1,
         iterations: int = 5,
+        kernel_shape: str = "square",
     ) -> tuple[torch.Tensor]:
         step = TensorImage.from_BWHC(mask)
 
-        operations = {
-            "dilation": dilation,
-            "erosion": erosion,
+        compound_operations = {
             "opening": opening,
             "closing": closing,
             "gradient": gradient,
             "top_hat": top_hat,
             "bottom_hat": bottom_hat,
         }
+        if kernel_shape == "square" and operation in compound_operations:
+            output = compound_operations[operation](image=step, kernel_size=kernel_size, iterations=iterations)
+            return (output.get_BWHC(),)
 
-        if operation not in operations:
-            raise ValueError(f"Invalid operation: {operation}")
-
-        try:
-            output = operations[operation](image=step, kernel_size=kernel_size, iterations=iterations)
-        except KeyError:
-            raise ValueError(f"Invalid operation: {operation}")
-
-        return (output.get_BWHC(),)
+        output = morphology(step, operation, kernel_size, iterations, kernel_shape)
+        return (TensorImage(output).get_BWHC(),)
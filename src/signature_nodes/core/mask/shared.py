@@ -0,0 +1,365 @@
+import math
+from dataclasses import dataclass
+
+import torch
+
+# Storage of the masks output by the mask nodes. "float" is ComfyUI's format, the others are opt-in compact formats:
+# "bool" (binary, 1 byte per pixel), "uint8" (soft values quantized to 0-255, 1 byte per pixel) and "packed"
+# (binary, 1 bit per pixel)
+MASK_STORAGES = ["float", "bool", "uint8", "packed"]
+
+# Compact masks travel through their own socket type, so MASK sockets only ever carry float masks that every
+# ComfyUI node understands. Nodes that accept both declare MASK_OR_COMPACT, a union of the two socket types
+COMPACT_MASK = "COMPACT_MASK"
+MASK_OR_COMPACT = f"MASK,{COMPACT_MASK}"
+
+_BIT_SHIFTS = torch.arange(7, -1, -1, dtype=torch.uint8)
+
+
+@dataclass
+class PackedMask:
+    """Binary masks stored as 8 pixels per byte, for long mask batches.
+
+    Args:
+        bits (torch.Tensor): Flat uint8 tensor of packed pixels, most significant bit first.
+        shape (tuple[int, ...]): Shape of the unpacked masks.
+    """
+
+    bits: torch.Tensor
+    shape: tuple[int, ...]
+
+    @classmethod
+    def pack(cls, mask: torch.Tensor) -> "PackedMask":
+        flat = mask.reshape(-1).to(torch.uint8)
+        flat = torch.nn.functional.pad(flat, (0, -flat.numel() % 8))
+        shifts = _BIT_SHIFTS.to(flat.device)
+        bits = (flat.view(-1, 8) << shifts).sum(dim=1, dtype=torch.uint8)
+        return cls(bits, tuple(mask.shape))
+
+    def unpack(self) -> torch.Tensor:
+        shifts = _BIT_SHIFTS.to(self.bits.device)
+        flat = ((self.bits[:, None] >> shifts) & 1).bool().flatten()
+        return flat[: math.prod(self.shape)].view(self.shape)
+
+    def count(self) -> int:
+        """Number of set pixels, counted on the packed bytes."""
+        table = torch.tensor([bin(value).count("1") for value in range(256)], device=self.bits.device)
+        return int(table[self.bits.long()].sum())
+
+    def __invert__(self) -> "PackedMask":
+        bits = ~self.bits
+        # Padding bits of the last byte must stay unset so counts ignore them
+        padding = -math.prod(self.shape) % 8
+        if padding:
+            bits[-1] &= (0xFF << padding) & 0xFF
+        return PackedMask(bits, self.shape)
+
+
+def is_compact(mask) -> bool:
+    return isinstance(mask, PackedMask) or mask.dtype in (torch.bool, torch.uint8)
+
+
+def to_binary(mask, threshold: float = 0.5) -> torch.Tensor:
+    """Returns a bool tensor of the pixels above threshold, for a mask in any storage."""
+    if isinstance(mask, PackedMask):
+        return mask.unpack()
+    if mask.dtype == torch.bool:
+        return mask
+    if mask.dtype == torch.uint8:
+        return mask > threshold * 255
+    return mask > threshold
+
+
+def to_uint8(mask) -> torch.Tensor:
+    """Returns the mask quantized to 0-255 as uint8, for a mask in any storage."""
+    if isinstance(mask, PackedMask):
+        mask = mask.unpack()
+    if mask.dtype == torch.bool:
+        return mask.to(torch.uint8) * 255
+    if mask.dtype == torch.uint8:
+        return mask
+    return (mask * 255).round().clamp(0, 255).to(torch.uint8)
+
+
+def to_float(mask) -> torch.Tensor:
+    """Promotes a mask in any storage to ComfyUI's float format with values in range [0, 1]."""
+    if isinstance(mask, PackedMask):
+        mask = mask.unpack()
+    if mask.dtype == torch.bool:
+        return mask.float()
+    if mask.dtype == torch.uint8:
+        return mask.float() / 255
+    return mask
+
+
+def to_storage(mask, storage: str):
+    """Converts a mask in any storage to one of MASK_STORAGES. Binary storages threshold soft values at 0.5."""
+    if storage == "float":
+        return to_float(mask)
+    if storage == "bool":
+        return to_binary(mask)
+    if storage == "uint8":
+        return to_uint8(mask)
+    if storage == "packed":
+        return mask if isinstance(mask, PackedMask) else PackedMask.pack(to_binary(mask))
+    raise ValueError(f"Invalid storage: {storage}")
+
+
+def storage_outputs(mask, storage: str) -> tuple:
+    """Returns the (MASK, COMPACT_MASK) outputs of a node for a mask in any storage.
+
+    The "float" storage fills the MASK output, the compact storages fill the COMPACT_MASK output. The other output
+    is None, so a compact mask never reaches a node that expects a float mask.
+    """
+    if storage == "float":
+        return to_float(mask), None
+    return None, to_storage(mask, storage)
+
+
+def shift(tensor: torch.Tensor, dy: int, dx: int, fill: float) -> torch.Tensor:
+    """Returns tensor[..., y + dy, x + dx] for every (y, x), with fill outside the tensor."""
+    height, width = tensor.shape[-2:]
+    output = torch.full_like(tensor, fill)
+    y0, y1 = max(0, -dy), min(height, height - dy)
+    x0, x1 = max(0, -dx), min(width, width - dx)
+    if y0 < y1 and x0 < x1:
+        output[..., y0:y1, x0:x1] = tensor[..., y0 + dy : y1 + dy, x0 + dx : x1 + dx]
+    return output
+
+
+def squared_distance_to(foreground: torch.Tensor) -> torch.Tensor:
+    """Squared Euclidean distance from every pixel to the nearest foreground pixel of its mask.
+
+    Uses jump flooding: each pixel keeps the coordinates of the nearest foreground pixel seen so far and compares
+    them with its neighbours' at offsets halving from the image size down to 1, plus a final pass at 1. That is
+    O(log(size)) batched passes on the masks' device. Results are exact apart from rare one-pixel
+    discrepancies far from the foreground.
+
+    Args:
+        foreground (torch.Tensor): Boolean masks of shape (B, H, W).
+
+    Returns:
+        torch.Tensor: float32 tensor of shape (B, H, W), 0 on the foreground and inf in masks without foreground.
+    """
+    height, width = foreground.shape[-2:]
+    ys = torch.arange(height, device=foreground.device, dtype=torch.float32).view(-1, 1)
+    xs = torch.arange(width, device=foreground.device, dtype=torch.float32).view(1, -1)
+    inf = torch.tensor(math.inf, device=foreground.device)
+    seed_y = torch.where(foreground, ys, inf)
+    seed_x = torch.where(foreground, xs, inf)
+    best = torch.where(foreground, 0.0, inf)
+
+    step = 1 << max(math.ceil(math.log2(max(height, width))) - 1, 0)
+    steps = []
+    while step >= 1:
+        steps.append(step)
+        step //= 2
+    for step in steps + [1]:
+        for dy in (-step, 0, step):
+            for dx in (-step, 0, step):
+                if dy == 0 and dx == 0:
+                    continue
+                candidate_y = shift(seed_y, dy, dx, math.inf)
+                candidate_x = shift(seed_x, dy, dx, math.inf)
+                distance = (candidate_y - ys) ** 2 + (candidate_x - xs) ** 2
+                closer = distance < best
+                best = torch.where(closer, distance, best)
+                seed_y = torch.where(closer, candidate_y, seed_y)
+                seed_x = torch.where(closer, candidate_x, seed_x)
+    return best
+
+
+def grow_mask(mask: torch.Tensor, radii: list[float], threshold: float = 0.5) -> torch.Tensor:
+    """Grows (positive radius) or shrinks (negative radius) each mask of a batch by a Euclidean distance.
+
+    The distance transforms are computed once for the whole batch, whatever the radii. Pixels above threshold are
+    the mask. Values already in the mask are kept when growing, and soft values are kept inside the shrunk mask.
+
+    Args:
+        mask (torch.Tensor): Masks of shape (B, H, W) with values in range [0, 1].
+        radii (list[float]): Radius of each mask, in pixels.
+        threshold (float): Value above which a pixel belongs to the mask.
+
+    Returns:
+        torch.Tensor: Masks of shape (B, H, W) on the input's device.
+    """
+    radii_tensor = torch.tensor(radii, device=mask.device, dtype=torch.float32).view(-1, 1, 1)
+    limit = radii_tensor**2
+    output = mask.clone()
+    growing = radii_tensor.flatten() > 0
+    shrinking = radii_tensor.flatten() < 0
+    inside = mask > threshold
+    if growing.any():
+        grown = squared_distance_to(inside[growing]) <= limit[growing]
+        output[growing] = torch.maximum(mask[growing], grown.to(mask.dtype))
+    if shrinking.any():
+        kept = squared_distance_to(~inside[shrinking]) > limit[shrinking]
+        output[shrinking] = torch.minimum(mask[shrinking], kept.to(mask.dtype))
+    return output
+
+
+def sliding_extreme(tensor: torch.Tensor, dim: int, before: int, after: int, maximum: bool) -> torch.Tensor:
+    """Max or min over the window [i - before, i + after] along dim, ignoring positions outside the tensor.
+
+    Uses the van Herk/Gil-Werman algorithm: the padded axis is cut into blocks of the window length, and each
+    output is the extreme of a suffix of one block and a prefix of the next. The cost per element does not depend
+    on the window length. bool tensors are processed as uint8.
+
+    Args:
+        tensor (torch.Tensor): Input tensor, float, uint8 or bool.
+        dim (int): Axis to slide along.
+        before (int): Window extent before each element.
+        after (int): Window extent after each element.
+        maximum (bool): Max (dilation) if True, min (erosion) otherwise.
+
+    Returns:
+        torch.Tensor: Tensor of the same shape and dtype.
+    """
+    window = before + after + 1
+    if window == 1:
+        return tensor
+    is_bool = tensor.dtype == torch.bool
+    values = tensor.view(torch.uint8) if is_bool else tensor
+    if values.is_floating_point():
+        fill = -math.inf if maximum else math.inf
+    else:
+        info = torch.iinfo(values.dtype)
+        fill = info.min if maximum else info.max
+
+    values = values.movedim(dim, -1)
+    length = values.shape[-1]
+    blocks = math.ceil((length + window - 1) / window)
+    padded = torch.full((*values.shape[:-1], blocks * window), fill, dtype=values.dtype, device=values.device)
+    padded[..., before : before + length] = values
+    padded = padded.view(*values.shape[:-1], blocks, window)
+
+    cumulative = torch.cummax if maximum else torch.cummin
+    prefix = cumulative(padded, dim=-1).values.flatten(-2)
+    suffix = cumulative(padded.flip(-1), dim=-1).values.flip(-1).flatten(-2)
+    combine = torch.maximum if maximum else torch.minimum
+    output = combine(suffix[..., :length], prefix[..., window - 1 : window - 1 + length])
+
+    output = output.movedim(-1, dim).contiguous()
+    return output.view(torch.bool) if is_bool else output
+
+
+def disk_rectangles(radius: float, max_rectangles: int = 8) -> list[tuple[int, int]]:
+    """Half sizes (half_height, half_width) of centered rectangles whose union approximates a digital disk.
+
+    The union is the exact disk when it needs at most max_rectangles rectangles, otherwise evenly spaced ones are
+    kept, which slightly flattens the disk between them.
+    """
+    corners = [(math.floor(math.sqrt(max(radius**2 - dx**2, 0.0))), dx) for dx in range(math.floor(radius) + 1)]
+    # Rectangles with the same height as the next one are inside it
+    corners = [corner for index, corner in enumerate(corners[:-1]) if corner[0] > corners[index + 1][0]] + corners[-1:]
+    if len(corners) > max_rectangles:
+        picked = {round(index * (len(corners) - 1) / (max_rectangles - 1)) for index in range(max_rectangles)}
+        corners = [corners[index] for index in sorted(picked)]
+    return corners
+
+
+def _extreme(tensor: torch.Tensor, kernel_size: int, iterations: int, kernel_shape: str, maximum: bool):
+    def rectangle(top: int, bottom: int, left: int, right: int) -> torch.Tensor:
+        output = sliding_extreme(tensor, -2, top, bottom, maximum)
+        return sliding_extreme(output, -1, left, right, maximum)
+
+    if kernel_shape == "disk":
+        # Repeating a disk dilation grows the disk radius by the same amount each time
+        radius = iterations * (kernel_size - 1) / 2
+        combine = torch.maximum if maximum else torch.minimum
+        output = None
+        for half_height, half_width in disk_rectangles(radius):
+            step = rectangle(half_height, half_height, half_width, half_width)
+            output = step if output is None else combine(output, step)
+        return output
+    # Repeating a square is a larger square, with the window convention of kornia's morphology
+    before, after = iterations * (kernel_size // 2), iterations * (kernel_size - 1 - kernel_size // 2)
+    return rectangle(before, after, before, after)
+
+
+def dilate(tensor: torch.Tensor, kernel_size: int, iterations: int = 1, kernel_shape: str = "square") -> torch.Tensor:
+    """Flat dilation of the last two axes by a square or disk kernel, repeated iterations times."""
+    return _extreme(tensor, kernel_size, iterations, kernel_shape, maximum=True)
+
+
+def erode(tensor: torch.Tensor, kernel_size: int, iterations: int = 1, kernel_shape: str = "square") -> torch.Tensor:
+    """Flat erosion of the last two axes by a square or disk kernel, repeated iterations times."""
+    return _extreme(tensor, kernel_size, iterations, kernel_shape, maximum=False)
+
+
+def morphology(
+    tensor: torch.Tensor, operation: str, kernel_size: int, iterations: int = 1, kernel_shape: str = "square"
+) -> torch.Tensor:
+    """Applies a morphological operation with dilate and erode.
+
+    Args:
+        tensor (torch.Tensor): Masks with the spatial axes last, float, uint8 or bool.
+        operation (str): "dilation", "erosion", "opening", "closing", "gradient", "top_hat" or "bottom_hat".
+        kernel_size (int): Width of the square kernel or diameter of the disk kernel.
+        iterations (int): Number of times the kernel is applied. Opening and closing erode or dilate iterations
+            times, then apply the other operation iterations times. signature_core may define iterations of
+            compound operations differently, so MaskMorphology only uses them here with disk kernels.
+        kernel_shape (str): "square" or "disk".
+
+    Returns:
+        torch.Tensor: Result with the input's dtype. Differences are computed as logical operations on bool masks.
+
+    Raises:
+        ValueError: If the operation is unknown.
+    """
+    args = (kernel_size, iterations, kernel_shape)
+    if operation == "dilation":
+        return dilate(tensor, *args)
+    if operation == "erosion":
+        return erode(tensor, *args)
+    if operation == "opening":
+        return dilate(erode(tensor, *args), *args)
+    if operation == "closing":
+        return erode(dilate(tensor, *args), *args)
+
+    def difference(a: torch.Tensor, b: torch.Tensor) -> torch.Tensor:
+        return a & ~b if a.dtype == torch.bool else a - b
+
+    if operation == "gradient":
+        return difference(dilate(tensor, *args), erode(tensor, *args))
+    if operation == "top_hat":
+        return difference(tensor, dilate(erode(tensor, *args), *args))
+    if operation == "bottom_hat":
+        return difference(erode(dilate(tensor, *args), *args), tensor)
+    raise ValueError(f"Invalid operation: {operation}")
+
+
+def connected_components(foreground: torch.Tensor, connectivity: int = 8) -> tuple[torch.Tensor, torch.Tensor]:
+    """Labels the connected components of a batch of binary masks.
+
+    Every foreground pixel starts with its own flat index as label. Labels are then propagated to the neighbours
+    with a running max, and each label jumps to the label of the pixel it points to, which roughly halves the
+    remaining path at every step. This repeats until nothing changes. Components end up labelled by their last
+    pixel, and are then renumbered consecutively from 1 within each mask.
+
+    Args:
+        foreground (torch.Tensor): Boolean masks of shape (B, H, W).
+        connectivity (int): 8 to connect diagonal neighbours, 4 otherwise.
+
+    Returns:
+        tuple[torch.Tensor, torch.Tensor]: int64 labels of shape (B, H, W), 0 on the background, and the number
+            of components of each mask, of shape (B,).
+    """
+    batch, height, width = foreground.shape
+    size = height * width
+    flat_index = torch.arange(1, batch * size + 1, device=foreground.device).view(batch, height, width)
+    labels = torch.where(foreground, flat_index, 0)
+    kernel_shape = "square" if connectivity == 8 else "disk"
+    while True:
+        propagated = torch.where(foreground, dilate(labels, 3, kernel_shape=kernel_shape), 0)
+        flat = propagated.flatten()
+        # Pointer jumping, a label is the flat index of a pixel of the same component plus one
+        jumped = torch.where(flat > 0, flat[(flat - 1).clamp(min=0)], 0).view_as(labels)
+        if torch.equal(jumped, labels):
+            break
+        labels = jumped
+
+    roots = (labels == flat_index) & foreground
+    ranks = roots.view(batch, -1).cumsum(dim=1).flatten()
+    renumbered = torch.where(labels > 0, ranks[(labels - 1).clamp(min=0)], 0)
+    return renumbered, roots.view(batch, -1).sum(dim=1)
@@ -1,5 +1,6 @@
 import random
 
+import comfy.model_management  # type: ignore
 import folder_paths  # type: ignore
 import torch
 from nodes import SaveImage  # type: ignore  # type: ignore
@@ -8,6 +9,8 @@ from signature_core.img.tensor_image import TensorImage
 from signature_core.models.salient_object_detection import SalientObjectDetection
 
 from ...categories import MODELS_CAT
+from ...model_registry import model_key, model_registry
+from ...tiling import TILING_INPUTS, TiledExecutor, tiling_memory_budget
 
 
 class BackgroundRemoval(SaveImage):
@@ -28,6 +31,11 @@ class BackgroundRemoval(SaveImage):
             - "rgba": Shows the transparent background result
             - "none": No preview
         filename_prefix (str, optional): Prefix to use for saved output files. Defaults to "Signature".
+        tiled (bool, optional): Segments the image in overlapping tiles to bound memory. Each tile is segmented
+            without the context of the whole image, so use it for very large inputs only. Defaults to False.
+        tile_size (int, optional): Tile size in pixels, 0 picks it from the memory budget. Defaults to 0.
+        tile_overlap (int, optional): Overlap between tiles in pixels. Defaults to 32.
+        tile_batch_size (int, optional): Number of tiles processed together. Defaults to 1.
         prompt (str, optional): Text prompt for metadata. Defaults to None.
         extra_pnginfo (dict, optional): Additional metadata to save with output images. Defaults to None.
 
@@ -38,7 +46,7 @@ class BackgroundRemoval(SaveImage):
             - mask: Binary segmentation mask in BWHC format
 
     Notes:
-        - The model automatically handles memory cleanup after processing
+        - Loaded models are kept in the shared model registry and reused by later executions
         - Temporary files are saved with random suffixes to prevent naming conflicts
         - Preview images are saved at compression level 4 for balance of quality and size
         - Different models may perform better on different types of images
@@ -61,6 +69,7 @@ class BackgroundRemoval(SaveImage):
                 "preview": (cls.preview_types,),
                 "image": ("IMAGE",),
             },
+            "optional": TILING_INPUTS,
             "hidden": {"prompt": "PROMPT", "extra_pnginfo": "EXTRA_PNGINFO"},
         }
 
@@ -93,12 +102,26 @@ class BackgroundRemoval(SaveImage):
         image: torch.Tensor,
         prompt: str,
         extra_pnginfo: dict,
+        tiled: bool = False,
+        tile_size: int = 0,
+        tile_overlap: int = 32,
+        tile_batch_size: int = 1,
     ) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
         filename_prefix = "Signature"
 
-        model = SalientObjectDetection(model_name=model_name)
+        device = comfy.model_management.get_torch_device()
+        model = model_registry.get_or_load(
+            model_key("SalientObjectDetection", model_name, device),
+            lambda: SalientObjectDetection(model_name=model_name),
+        )
         input_image = TensorImage.from_BWHC(image)
-        masks = model.forward(input_image)
+        if tiled:
+            executor = TiledExecutor(
+                tile_size, tile_overlap, tile_batch_size, memory_budget=tiling_memory_budget(device)
+            )
+            masks = executor(lambda tiles: model.forward(TensorImage(tiles)), input_image)
+        else:
+            masks = model.forward(input_image)
 
         output_masks = TensorImage(masks)
         rgb, rgba = cutout(input_image, output_masks)
@@ -122,6 +145,4 @@ class BackgroundRemoval(SaveImage):
                 )
             }
         )
-        model = None
-        del model
         return result
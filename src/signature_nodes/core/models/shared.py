@@ -0,0 +1,229 @@
+import math
+import os
+from dataclasses import dataclass, field
+
+import comfy  # type: ignore
+import folder_paths  # type: ignore
+import torch
+import torch.nn.functional as F
+from spandrel import ImageModelDescriptor, ModelLoader  # type: ignore
+
+from ...model_registry import model_key, model_registry
+from ...tiling import TiledExecutor
+
+
+def mask_bounding_box(mask: torch.Tensor, threshold: float = 0.0) -> tuple[int, int, int, int] | None:
+    """Returns the bounding box of the mask pixels above threshold.
+
+    Args:
+        mask (torch.Tensor): Mask of shape (H, W).
+        threshold (float): Pixels strictly above this value are part of the mask.
+
+    Returns:
+        tuple[int, int, int, int] | None: (top, bottom, left, right) with exclusive ends, or None for an empty mask.
+    """
+    active = mask > threshold
+    rows = torch.nonzero(active.any(dim=1)).flatten()
+    if rows.numel() == 0:
+        return None
+    columns = torch.nonzero(active.any(dim=0)).flatten()
+    return int(rows[0]), int(rows[-1]) + 1, int(columns[0]), int(columns[-1]) + 1
+
+
+def expand_box(box: tuple[int, int, int, int], margin: int, height: int, width: int) -> tuple[int, int, int, int]:
+    """Grows a (top, bottom, left, right) box by margin pixels on every side, clipped to the image."""
+    top, bottom, left, right = box
+    return max(top - margin, 0), min(bottom + margin, height), max(left - margin, 0), min(right + margin, width)
+
+
+def feather_mask(mask: torch.Tensor, radius: int) -> torch.Tensor:
+    """Softens the outer edge of a BCHW mask over radius pixels, keeping the masked area fully opaque.
+
+    Two box blurs approximate a gaussian falloff.
+    """
+    if radius <= 0:
+        return mask
+    half = max(radius // 2, 1)
+    size = 2 * half + 1
+    blurred = mask
+    for _ in range(2):
+        blurred = F.avg_pool2d(F.pad(blurred, (half, half, half, half), mode="replicate"), size, stride=1)
+    return torch.maximum(mask, blurred)
+
+
+def resize_to_fit(tensor: torch.Tensor, max_size: int, mode: str = "bilinear") -> torch.Tensor:
+    """Downscales a BCHW tensor so its longest side is at most max_size. 0 disables the limit."""
+    height, width = tensor.shape[-2:]
+    if max_size <= 0 or max(height, width) <= max_size:
+        return tensor
+    scale = max_size / max(height, width)
+    size = (max(round(height * scale), 1), max(round(width * scale), 1))
+    if mode == "nearest":
+        return F.interpolate(tensor, size=size, mode=mode)
+    return F.interpolate(tensor, size=size, mode=mode, antialias=True, align_corners=False)
+
+
+def load_upscale_model(model_name: str, device: torch.device) -> ImageModelDescriptor:
+    """Returns the upscale model from the "upscale_models" folder, loaded on device.
+
+    Models are kept in the shared model registry keyed by path and modification time, so repeated executions reuse
+    the weights already on the device and a replaced file is loaded again.
+
+    Args:
+        model_name (str): File name of the model.
+        device (torch.device): Device the weights are kept on.
+
+    Returns:
+        ImageModelDescriptor: Loaded model in eval mode.
+
+    Raises:
+        ValueError: If the file is not a single-image model.
+    """
+    model_path = folder_paths.get_full_path("upscale_models", model_name)
+    mtime = os.stat(model_path).st_mtime_ns
+
+    def load() -> ImageModelDescriptor:
+        # Drop the weights of an earlier version of the file
+        model_registry.discard("UpscaleModel", model_path)
+        sd = comfy.utils.load_torch_file(model_path, safe_load=True)
+        if "module.layers.0.residual_group.blocks.0.norm1.weight" in sd:
+            sd = comfy.utils.state_dict_prefix_replace(sd, {"module.": ""})
+        model = ModelLoader().load_from_state_dict(sd)
+        if not isinstance(model, ImageModelDescriptor):
+            raise ValueError("Upscale model must be a single-image model.")
+        return model.to(device).eval()
+
+    return model_registry.get_or_load(model_key("UpscaleModel", model_path, device, mtime=mtime), load)
+
+
+def upscale_with_model(
+    image: torch.Tensor,
+    upscale_model: ImageModelDescriptor,
+    device: torch.device,
+    tile: int = 512,
+    overlap: int = 32,
+) -> torch.Tensor:
+    """Upscales a BWHC image by the model's scale, in tiles.
+
+    Args:
+        image (torch.Tensor): Image in BWHC format.
+        upscale_model (ImageModelDescriptor): Model loaded with load_upscale_model.
+        device (torch.device): Device the model is on.
+        tile (int): Tile size in pixels, halved on out-of-memory errors.
+        overlap (int): Overlap between tiles in pixels.
+
+    Returns:
+        torch.Tensor: Upscaled image in BWHC format, clamped to [0, 1], on the input's device.
+    """
+    memory_required = comfy.model_management.module_size(upscale_model.model)
+    memory_required += (tile * tile * 3) * image.element_size() * max(upscale_model.scale, 1.0) * 384.0
+    comfy.model_management.free_memory(memory_required, device)
+    # Only the tiles of one micro-batch are moved to the device, the stitched output stays on the input's device
+    in_img = image.movedim(-1, -3)
+
+    pbar = comfy.utils.ProgressBar(in_img.shape[0])
+    executor = TiledExecutor(
+        tile_size=tile,
+        overlap=overlap,
+        device=device,
+        progress=lambda done, total: pbar.update_absolute(done, total),
+    )
+    with torch.inference_mode():
+        output = executor(upscale_model, in_img, scale=upscale_model.scale)
+    return torch.clamp(output.movedim(-3, -1), min=0, max=1.0)
+
+
+@dataclass
+class UpscalePass:
+    input_size: tuple[int, int]
+    output_size: tuple[int, int]
+
+
+@dataclass
+class UpscalePlan:
+    """Model passes planned by plan_upscale, with their cost in megapixels fed to the model."""
+
+    passes: list[UpscalePass] = field(default_factory=list)
+    model_megapixels: float = 0.0
+    naive_megapixels: float = 0.0
+    peak_megapixels: float = 0.0
+
+    def describe(self) -> str:
+        steps = " -> ".join(
+            f"{p.input_size[1]}x{p.input_size[0]}>{p.output_size[1]}x{p.output_size[0]}" for p in self.passes
+        )
+        return (
+            f"{len(self.passes)} pass(es) [{steps or 'none'}], {self.model_megapixels:.2f}MP through the model "
+            f"(repeat-until-large-enough: {self.naive_megapixels:.2f}MP), peak output {self.peak_megapixels:.2f}MP"
+        )
+
+
+def plan_upscale(
+    height: int, width: int, target_size: float, model_scale: float, allow_input_downscale: bool = False
+) -> UpscalePlan:
+    """Plans the model passes needed to bring the longest side of an image to at least target_size.
+
+    The number of passes is the smallest one that reaches the target. Before each pass after the first, the
+    intermediate result is downscaled to the size that this and the remaining passes need to land just on the target,
+    so e.g. 5x with a 4x model runs the second pass on a 1.25x image instead of a 4x one. The original input is only
+    downscaled before the first pass when allow_input_downscale is set (e.g. 2.1x with a 4x model then runs one pass
+    on a 0.525x input), as that discards input detail. Results are never smaller than target_size, the final
+    resample only shrinks.
+
+    Args:
+        height (int): Input height.
+        width (int): Input width.
+        target_size (float): Minimum longest side after the passes.
+        model_scale (float): Scale of the upscale model. Models with a scale of 1 or less run a single pass.
+        allow_input_downscale (bool): Whether the original input may be downscaled before the first pass.
+
+    Returns:
+        UpscalePlan: Planned passes and their cost.
+    """
+    plan = UpscalePlan()
+    longest = max(height, width)
+    factor = target_size / longest
+    if factor <= 1:
+        return plan
+
+    if model_scale <= 1:
+        count = 1
+    else:
+        count = max(math.ceil(math.log(factor) / math.log(model_scale) - 1e-9), 1)
+
+    size = (height, width)
+    naive_size = (height, width)
+    for index in range(count):
+        wanted = factor / model_scale ** (count - index) if model_scale > 1 else 1.0
+        if index == 0 and not allow_input_downscale:
+            wanted = max(wanted, 1.0)
+        # Never make the input of a pass larger than what the previous pass produced
+        wanted_size = (max(math.ceil(height * wanted), 1), max(math.ceil(width * wanted), 1))
+        if wanted_size[0] < size[0] and wanted_size[1] < size[1]:
+            size = wanted_size
+        output_size = (round(size[0] * model_scale), round(size[1] * model_scale))
+        plan.passes.append(UpscalePass(size, output_size))
+        plan.model_megapixels += size[0] * size[1] / 1e6
+        plan.peak_megapixels = max(plan.peak_megapixels, output_size[0] * output_size[1] / 1e6)
+        size = output_size
+
+    naive_longest = longest
+    while naive_longest < target_size:
+        plan.naive_megapixels += naive_size[0] * naive_size[1] / 1e6
+        naive_size = (round(naive_size[0] * model_scale), round(naive_size[1] * model_scale))
+        naive_longest = max(naive_size)
+        if model_scale <= 1:
+            break
+    return plan
+
+
+def resample(image: torch.Tensor, size: tuple[int, int], method: str = "bicubic") -> torch.Tensor:
+    """Resizes a BWHC image to (height, width), antialiased when the method supports it."""
+    if tuple(image.shape[1:3]) == tuple(size):
+        return image
+    bchw = image.movedim(-1, -3)
+    if method in ("bilinear", "bicubic"):
+        output = F.interpolate(bchw, size=size, mode=method, antialias=True, align_corners=False)
+    else:
+        output = F.interpolate(bchw, size=size, mode=method)
+    return output.clamp(0, 1).movedim(-3, -1)
@@ -1,6 +1,7 @@
 import random
 from typing import Optional
 
+import comfy.model_management  # type: ignore
 import folder_paths  # type: ignore
 import torch
 from nodes import SaveImage  # type: ignore  # type: ignore
@@ -8,6 +9,8 @@ from signature_core.img.tensor_image import TensorImage
 from signature_core.models.seemore import SeeMore
 
 from ...categories import MODELS_CAT
+from ...model_registry import model_key, model_registry
+from ...tiling import TILING_INPUTS, TiledExecutor, tiling_memory_budget
 
 
 class Unblur(SaveImage):
@@ -22,6 +25,10 @@ class Unblur(SaveImage):
             - "on": Saves preview images
             - "off": No preview images
         filename_prefix (str, optional): Prefix to use for saved output files. Defaults to "Signature".
+        tiled (bool, optional): Processes the image in overlapping tiles to bound memory. Defaults to False.
+        tile_size (int, optional): Tile size in pixels, 0 picks it from the memory budget. Defaults to 0.
+        tile_overlap (int, optional): Overlap between tiles in pixels. Defaults to 32.
+        tile_batch_size (int, optional): Number of tiles processed together. Defaults to 1.
         prompt (str, optional): Text prompt for metadata. Defaults to None.
         extra_pnginfo (dict, optional): Additional metadata to save with output images. Defaults to None.
 
@@ -29,7 +36,7 @@ class Unblur(SaveImage):
         tuple[torch.Tensor]: Single-element tuple containing the unblurred image in BWHC format.
 
     Notes:
-        - The model automatically handles memory cleanup after processing
+        - Loaded models are kept in the shared model registry and reused by later executions
         - Temporary files are saved with random suffixes to prevent naming conflicts
         - Preview images are saved at compression level 4 for balance of quality and size
     """
@@ -47,6 +54,7 @@ class Unblur(SaveImage):
                 "image": ("IMAGE",),
                 "preview": (["on", "off"],),
             },
+            "optional": TILING_INPUTS,
             "hidden": {"prompt": "PROMPT", "extra_pnginfo": "EXTRA_PNGINFO"},
         }
 
@@ -66,21 +74,30 @@ class Unblur(SaveImage):
         preview: str = "on",
         prompt: Optional[str] = None,
         extra_pnginfo: Optional[dict] = None,
+        tiled: bool = False,
+        tile_size: int = 0,
+        tile_overlap: int = 32,
+        tile_batch_size: int = 1,
     ):
         if preview not in ["on", "off"]:
             raise ValueError("Preview must be either 'on' or 'off'")
 
         filename_prefix = "Signature"
 
-        model = SeeMore()
+        device = comfy.model_management.get_torch_device()
+        model = model_registry.get_or_load(model_key("SeeMore", device=device), SeeMore)
         input_image = TensorImage.from_BWHC(image)
-        output_image = model.forward(input_image)
+        if tiled:
+            executor = TiledExecutor(
+                tile_size, tile_overlap, tile_batch_size, memory_budget=tiling_memory_budget(device)
+            )
+            output_image = executor(lambda tiles: model.forward(TensorImage(tiles)), input_image)
+        else:
+            output_image = model.forward(input_image)
         output_images = TensorImage(output_image).get_BWHC()
 
         if preview == "off":
             return (output_images,)
         result = self.save_images(output_images, filename_prefix, prompt, extra_pnginfo)
         result.update({"result": (output_images,)})
-        model = None
-        del model
         return result
@@ -0,0 +1,129 @@
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable
+
+import boto3
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+class BackendCredentialProvider:
+    """Process-wide cache of backend Cognito secrets and client_credentials access tokens.
+
+    Secrets are read from AWS Secrets Manager once per ``secret_ttl`` and access tokens are reused until
+    ``refresh_margin`` seconds before they expire. Concurrent callers needing the same secret or token wait for
+    a single refresh instead of each calling AWS or Cognito.
+
+    Args:
+        secret_ttl (float): Seconds a secret is reused before it is read again (secrets may be rotated).
+        refresh_margin (float): Seconds before expiry at which a token is considered stale.
+        http_post (Callable[..., Any]): Function used to call the token endpoint, requests.post by default.
+        clock (Callable[[], float]): Monotonic clock, replaceable in tests.
+    """
+
+    def __init__(
+        self,
+        secret_ttl: float = 3600.0,
+        refresh_margin: float = 60.0,
+        http_post: Callable[..., Any] = requests.post,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.secret_ttl = secret_ttl
+        self.refresh_margin = refresh_margin
+        self.http_post = http_post
+        self.clock = clock
+        self._secrets: dict[tuple, tuple[dict, float]] = {}
+        self._tokens: dict[tuple, tuple[str, float]] = {}
+        self._clients: dict[str | None, Any] = {}
+        self._locks: dict[tuple, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def _lock(self, key: tuple) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _secrets_client(self, region_name: str | None):
+        if region_name not in self._clients:
+            self._clients[region_name] = boto3.Session().client(service_name="secretsmanager", region_name=region_name)
+        return self._clients[region_name]
+
+    def get_secret(self, secret_name: str, region_name: str | None = None) -> dict:
+        """Returns the JSON secret stored under secret_name.
+
+        Raises:
+            ValueError: If the secret does not exist or has no string value.
+        """
+        key = ("secret", secret_name, region_name)
+        cached = self._secrets.get(key)
+        if cached is not None and cached[1] > self.clock():
+            return cached[0]
+
+        with self._lock(key):
+            cached = self._secrets.get(key)
+            if cached is not None and cached[1] > self.clock():
+                return cached[0]
+            with self._locks_lock:
+                client = self._secrets_client(region_name)
+            response = client.get_secret_value(SecretId=secret_name)
+            if "SecretString" not in response:
+                raise ValueError(f"Backend Cognito Secret with name {secret_name} is not found")
+            secret = json.loads(response["SecretString"])
+            self._secrets[key] = (secret, self.clock() + self.secret_ttl)
+            return secret
+
+    def get_token(self, secret_name: str, region_name: str | None = None, scope: str = "read") -> str:
+        """Returns a client_credentials access token for the Cognito client stored under secret_name.
+
+        Args:
+            secret_name (str): Name of the secret holding client_id, client_secret, scope and cognito_oauth_url.
+            region_name (str | None): Region of the secret. None uses the default AWS region.
+            scope (str): Scope suffix appended to the secret's scope.
+
+        Raises:
+            ValueError: If the token endpoint does not return an access token.
+        """
+        key = ("token", secret_name, region_name, scope)
+        cached = self._tokens.get(key)
+        if cached is not None and cached[1] > self.clock():
+            return cached[0]
+
+        with self._lock(key):
+            cached = self._tokens.get(key)
+            if cached is not None and cached[1] > self.clock():
+                return cached[0]
+
+            secret = self.get_secret(secret_name, region_name)
+            client_id = secret["client_id"]
+            client_secret = secret["client_secret"]
+            client_scope = secret["scope"]
+            data = (
+                f"grant_type=client_credentials&client_id={client_id}&client_secret={client_secret}"
+                f"&scope={client_scope}/{scope}"
+            )
+            requested_at = self.clock()
+            response = self.http_post(
+                secret["cognito_oauth_url"],
+                data=data,
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+            )
+            payload = response.json()
+            if "access_token" not in payload:
+                raise ValueError(f"Error getting access token: {response.status_code}")
+
+            expires_at = requested_at + float(payload.get("expires_in", 3600)) - self.refresh_margin
+            self._tokens[key] = (payload["access_token"], expires_at)
+            logger.debug(f"Fetched access token for {secret_name}, valid for {expires_at - requested_at:.0f}s")
+            return payload["access_token"]
+
+    def invalidate(self, secret_name: str | None = None) -> None:
+        """Drops cached secrets and tokens, for one secret or all of them (e.g. after a 401)."""
+        for cache in (self._secrets, self._tokens):
+            for key in list(cache):
+                if secret_name is None or key[1] == secret_name:
+                    cache.pop(key, None)
+
+
+credentials = BackendCredentialProvider()
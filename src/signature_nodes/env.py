@@ -18,6 +18,13 @@ class Environment:
         ("JENKINS_URL", True, None, None),
         ("JENKINS_AUTH", True, None, None),
         ("PARALLEL_PROCESSING", False, "False", ["True", "False"]),
+        ("LAZY_NODE_LOADING", False, "False", ["True", "False"]),
+        ("BACKGROUND_NODE_LOADING", False, "False", ["True", "False"]),
+        ("NODE_MANIFEST_PATH", False, None, None),
+        ("PROFILE_NODE_LOADING", False, "False", ["True", "False"]),
+        ("NODE_LOADING_PROFILE_PATH", False, None, None),
+        ("MODEL_REGISTRY_MEMORY_MB", False, "8192", None),
+        ("TILE_MEMORY_BUDGET_MB", False, "2048", None),
         ("AWS_ACCESS_KEY_ID", True, None, None),
         ("AWS_SECRET_ACCESS_KEY", True, None, None),
         ("AWS_DEFAULT_REGION", True, None, None),
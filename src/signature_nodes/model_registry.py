@@ -0,0 +1,314 @@
+import gc
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import torch
+
+from .env import env
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+def model_key(model_class: str, weights: Any = None, device: Any = None, precision: Any = None, **options) -> tuple:
+    """Builds the registry key of a model.
+
+    Args:
+        model_class (str): Name of the model class.
+        weights (Any): Weights identifier (model name, path or id).
+        device (Any): Device the model runs on.
+        precision (Any): Precision the weights are loaded in.
+        **options: Any other constructor option that changes the loaded model.
+
+    Returns:
+        tuple: Hashable key.
+    """
+    return (
+        model_class,
+        None if weights is None else str(weights),
+        None if device is None else str(device),
+        None if precision is None else str(precision),
+        tuple(sorted((name, str(value)) for name, value in options.items())),
+    )
+
+
+def estimate_model_size(model: Any, max_depth: int = 4) -> int:
+    """Estimates the memory held by a model object, in bytes.
+
+    Wrapper classes keep their networks in attributes, containers or closures (e.g. an upscale function), so
+    those are searched for modules and tensors. Each tensor storage is counted once.
+
+    Args:
+        model (Any): Loaded model object.
+        max_depth (int): Maximum attribute depth searched.
+
+    Returns:
+        int: Estimated size in bytes.
+    """
+    seen_objects: set[int] = set()
+    seen_storages: set[int] = set()
+
+    def tensor_size(tensor: torch.Tensor) -> int:
+        try:
+            storage = tensor.untyped_storage()
+            pointer = storage.data_ptr()
+            if pointer in seen_storages:
+                return 0
+            seen_storages.add(pointer)
+            return storage.nbytes()
+        except (RuntimeError, NotImplementedError):
+            return tensor.numel() * tensor.element_size()
+
+    def visit(obj: Any, depth: int) -> int:
+        if obj is None or isinstance(obj, (str, bytes, int, float, bool)) or id(obj) in seen_objects:
+            return 0
+        seen_objects.add(id(obj))
+        if isinstance(obj, torch.Tensor):
+            return tensor_size(obj)
+        if isinstance(obj, torch.nn.Module):
+            tensors = list(obj.parameters()) + list(obj.buffers())
+            return sum(tensor_size(tensor) for tensor in tensors)
+        if depth >= max_depth:
+            return 0
+        if isinstance(obj, dict):
+            children = list(obj.values())
+        elif isinstance(obj, (list, tuple, set)):
+            children = list(obj)
+        elif callable(obj) and getattr(obj, "__closure__", None):
+            children = [cell.cell_contents for cell in obj.__closure__]
+        elif hasattr(obj, "__dict__"):
+            children = list(vars(obj).values())
+        else:
+            return 0
+        return sum(visit(child, depth + 1) for child in children)
+
+    return visit(model, 0)
+
+
+@dataclass
+class RegistryEntry:
+    model: Any
+    size: int
+    device: str | None
+    load_seconds: float
+    hits: int = 0
+
+
+class ModelRegistry:
+    """Process-wide LRU registry of loaded models, shared by the nodes that wrap signature_core and neurochain
+    models.
+
+    Models are kept loaded between executions, keyed by (class, weights, device, precision). When the estimated
+    size of the loaded models exceeds the memory budget the least recently used ones are released. The registry
+    also hooks into comfy.model_management so ComfyUI can evict these models when it needs memory for its own.
+
+    Args:
+        memory_budget (int): Maximum estimated size of the loaded models, in bytes. 0 disables caching and models
+            are released after each use.
+    """
+
+    def __init__(self, memory_budget: int):
+        self.memory_budget = memory_budget
+        self._entries: OrderedDict[tuple, RegistryEntry] = OrderedDict()
+        self._lock = threading.RLock()
+        self._key_locks: dict[tuple, threading.Lock] = {}
+        self._hooks_installed = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+
+    @property
+    def total_size(self) -> int:
+        return sum(entry.size for entry in self._entries.values())
+
+    def _key_lock(self, key: tuple) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get_or_load(self, key: tuple, loader: Callable[[], Any]) -> Any:
+        """Returns the model registered under key, loading it with loader on a miss.
+
+        Args:
+            key (tuple): Key built with model_key.
+            loader (Callable[[], Any]): Builds the model.
+
+        Returns:
+            Any: Loaded model.
+        """
+        self.install_comfy_hooks()
+        with self._key_lock(key):
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    entry.hits += 1
+                    self.hits += 1
+                    return entry.model
+
+            start = time.perf_counter()
+            model = loader()
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.misses += 1
+                self.load_seconds += elapsed
+                if self.memory_budget <= 0:
+                    return model
+                size = estimate_model_size(model)
+                self._entries[key] = RegistryEntry(model, size, key[2], elapsed)
+                logger.info(f"Loaded {key[0]} ({size / MB:.0f}MB) in {elapsed:.2f}s")
+                self._evict_to_budget(keep=key)
+            return model
+
+    def _release(self, key: tuple) -> RegistryEntry:
+        entry = self._entries.pop(key)
+        self.evictions += 1
+        logger.info(f"Released {key[0]} ({entry.size / MB:.0f}MB) from the model registry")
+        return entry
+
+    def _evict_to_budget(self, keep: tuple | None = None) -> None:
+        released = False
+        for key in list(self._entries):
+            if self.total_size <= self.memory_budget:
+                break
+            if key != keep:
+                self._release(key)
+                released = True
+        if released:
+            self._empty_cache()
+
+    def _in_use(self, key: tuple) -> bool:
+        # The entry and getrefcount's argument are the only references of a model nobody else holds. Releasing a
+        # model still referenced elsewhere, e.g. by the node that triggered the request, frees no memory
+        return sys.getrefcount(self._entries[key].model) > 2
+
+    def free(self, memory_required: int, device: Any) -> int:
+        """Releases least recently used models on a device until ComfyUI reports enough free memory.
+
+        Models still referenced outside the registry are skipped, and releasing stops as soon as a release does
+        not increase the free memory, so one large request cannot empty the registry without gaining memory.
+
+        Args:
+            memory_required (int): Bytes of free memory needed on the device.
+            device (Any): Device to free memory on.
+
+        Returns:
+            int: Number of models released.
+        """
+        import comfy.model_management  # type: ignore
+
+        device = torch.device(device)
+        released = 0
+        with self._lock:
+            free_memory = comfy.model_management.get_free_memory(device)
+            for key in list(self._entries):
+                if free_memory >= memory_required:
+                    break
+                entry_device = self._entries[key].device
+                if entry_device is not None and torch.device(entry_device).type != device.type:
+                    continue
+                if self._in_use(key):
+                    continue
+                self._release(key)
+                released += 1
+                self._empty_cache()
+                previous_free_memory = free_memory
+                free_memory = comfy.model_management.get_free_memory(device)
+                if free_memory <= previous_free_memory:
+                    break
+        return released
+
+    def discard(self, model_class: str, weights: Any = None) -> int:
+        """Releases the models of a class, or of one weights identifier of it.
+
+        Returns:
+            int: Number of models released.
+        """
+        weights = None if weights is None else str(weights)
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == model_class and weights in (None, key[1])]
+            for key in keys:
+                self._release(key)
+        if keys:
+            self._empty_cache()
+        return len(keys)
+
+    def clear(self) -> None:
+        """Releases every registered model."""
+        with self._lock:
+            for key in list(self._entries):
+                self._release(key)
+        self._empty_cache()
+
+    def _empty_cache(self) -> None:
+        gc.collect()
+        try:
+            import comfy.model_management  # type: ignore
+
+            comfy.model_management.soft_empty_cache()
+        except ImportError:
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+
+    def install_comfy_hooks(self) -> None:
+        """Wraps comfy.model_management.free_memory and unload_all_models so ComfyUI also releases these models.
+
+        When ComfyUI needs memory for one of its models, registry models on that device are released first, least
+        recently used first, and only as many as needed.
+        """
+        if self._hooks_installed:
+            return
+        with self._lock:
+            if self._hooks_installed:
+                return
+            self._hooks_installed = True
+            try:
+                import comfy.model_management  # type: ignore
+            except ImportError:
+                return
+
+            original_free_memory = comfy.model_management.free_memory
+            original_unload_all_models = comfy.model_management.unload_all_models
+
+            def free_memory(memory_required, device, *args, **kwargs):
+                self.free(memory_required, device)
+                return original_free_memory(memory_required, device, *args, **kwargs)
+
+            def unload_all_models(*args, **kwargs):
+                self.clear()
+                return original_unload_all_models(*args, **kwargs)
+
+            comfy.model_management.free_memory = free_memory
+            comfy.model_management.unload_all_models = unload_all_models
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": [
+                    {
+                        "model": key[0],
+                        "weights": key[1],
+                        "device": key[2],
+                        "precision": key[3],
+                        "size_mb": round(entry.size / MB, 1),
+                        "load_seconds": round(entry.load_seconds, 3),
+                        "hits": entry.hits,
+                    }
+                    for key, entry in self._entries.items()
+                ],
+                "total_size_mb": round(self.total_size / MB, 1),
+                "memory_budget_mb": round(self.memory_budget / MB, 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "load_seconds": round(self.load_seconds, 3),
+            }
+
+
+model_registry = ModelRegistry(memory_budget=int(env.get("MODEL_REGISTRY_MEMORY_MB")) * MB)
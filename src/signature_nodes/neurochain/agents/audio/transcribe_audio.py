@@ -5,6 +5,7 @@ import folder_paths  # type: ignore
 from neurochain.agents.audio.audio_transcriber import AudioTranscriber
 
 from ....categories import AUDIO_CAT
+from ....model_registry import model_key, model_registry
 
 SIG_MODELS_DIR = "sig_models"
 
@@ -30,7 +31,10 @@ class TranscribeAudio:
             os.makedirs(base_model_path)
 
         device = comfy.model_management.get_torch_device()
-        transcriber = AudioTranscriber(base_model_path, device)
+        transcriber = model_registry.get_or_load(
+            model_key("AudioTranscriber", base_model_path, device),
+            lambda: AudioTranscriber(base_model_path, device),
+        )
 
         audio_tensor = audio["waveform"]
         sample_rate = audio["sample_rate"]
@@ -10,6 +10,7 @@ from neurochain.utils.florence2 import get_florence_processor
 from signature_core.img.tensor_image import TensorImage
 
 from ....categories import AGENT_CAT
+from ....model_registry import model_key, model_registry
 
 SIG_MODELS_DIR = "sig_models"
 
@@ -95,7 +96,10 @@ class Florence2:
             text_prompt = None
 
         device = comfy.model_management.get_torch_device()
-        florence2 = Florence2Neurochain(base_model_path, device, attention, precision)
+        florence2 = model_registry.get_or_load(
+            model_key("Florence2", base_model_path, device, precision, attention=attention),
+            lambda: Florence2Neurochain(base_model_path, device, attention, precision),
+        )
         raw_task_resp = florence2.generate(base64_string, f"<{task_token}>", text_prompt, num_beams)
 
         final_resp: Tuple[Optional[torch.Tensor], Optional[torch.Tensor], dict, str]
@@ -1,10 +1,12 @@
 from typing import Optional
 
+import comfy.model_management  # type: ignore
 from neurochain.detectors.dino import DINOSimilarity
 from signature_core.img.tensor_image import TensorImage
 from torch import Tensor
 
 from ...categories import LABS_CAT
+from ...model_registry import model_key, model_registry
 
 
 class DINOHeatmap:
@@ -59,7 +61,8 @@ class DINOHeatmap:
         template = TensorImage.from_BWHC(template)
         mask = TensorImage.from_BWHC(mask) if mask is not None else None
 
-        model = DINOSimilarity()
+        device = comfy.model_management.get_torch_device()
+        model = model_registry.get_or_load(model_key("DINOSimilarity", device=device), DINOSimilarity)
         output = model.predict(image, template, mask)
 
         output = TensorImage(output).get_BWHC()
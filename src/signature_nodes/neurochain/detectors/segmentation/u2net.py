@@ -1,10 +1,12 @@
 from pathlib import Path
 
+import comfy.model_management  # type: ignore
 import folder_paths  # type: ignore
 import torch
 from neurochain.detectors.segmentation.u2net import U2Net
 
 from ....categories import SEGMENTATION_CAT
+from ....model_registry import model_key, model_registry
 
 
 class U2NetNode:
@@ -23,6 +25,10 @@ class U2NetNode:
 
     def process(self, image: torch.Tensor, clearml_model_id: str):
         checkpoint_dir = Path(folder_paths.models_dir) / "checkpoints"  # TODO: Decide on a directory for models
-        model = U2Net(model_id=clearml_model_id, checkpoint_dir=checkpoint_dir)
+        device = comfy.model_management.get_torch_device()
+        model = model_registry.get_or_load(
+            model_key("U2Net", clearml_model_id, device),
+            lambda: U2Net(model_id=clearml_model_id, checkpoint_dir=checkpoint_dir),
+        )
         output = model.predict(image)
         return (output,)
@@ -1,10 +1,9 @@
 import os
 
-import boto3
 import requests
-from neurochain.utils.utils import get_secret
 
 from ....categories import S3_CAT
+from ....credentials import credentials
 from ....env import env
 from ...utils import COMFY_IMAGES_DIR
 
@@ -29,23 +28,7 @@ class DownloadFromS3:
         environment = env.get("ENVIRONMENT")
         host = f"https://signature-generate.signature-eks-{environment}.signature.ai"
 
-        session = boto3.Session()
-        backend_cognito_secret = get_secret(
-            session,
-            env.get("BACKEND_COGNITO_SECRET"),
-        )
-        if not backend_cognito_secret:
-            raise ValueError("Back-end Cognito Secret not found")
-
-        client_id = backend_cognito_secret["client_id"]
-        client_secret = backend_cognito_secret["client_secret"]
-        client_scope = backend_cognito_secret["scope"]
-        cognito_response = requests.post(
-            backend_cognito_secret["cognito_oauth_url"],
-            data=f"grant_type=client_credentials&client_id={client_id}&client_secret={client_secret}&scope={client_scope}/read",
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-        )
-        token = cognito_response.json()["access_token"]
+        token = credentials.get_token(env.get("BACKEND_COGNITO_SECRET"))
 
         url = f"{host}/api/v1/assets/download"
         params = {"file_name": file_name, "prefix": prefix}
@@ -1,4 +1,3 @@
-import cv2 as cv
 import torch
 from torchvision import ops
 from torchvision.transforms import v2
@@ -7,25 +6,28 @@ from .categories import LABS_CAT
 
 
 class OTSUThreshold:
-    """A node that performs Otsu's thresholding on an input image.
+    """A node that performs Otsu's thresholding on a batch of images.
 
     This node implements Otsu's method, which automatically determines an optimal threshold
-    value by minimizing intra-class intensity variance. It converts the input image to
-    grayscale and applies binary thresholding using the computed optimal threshold.
+    value by minimizing intra-class intensity variance. It converts the input images to
+    grayscale and applies binary thresholding using the optimal threshold of each image.
 
     Args:
         image (torch.Tensor): The input image tensor to threshold.
                             Expected shape: (B, H, W, C)
 
     Returns:
-        tuple[float, torch.Tensor]: A tuple containing:
-            - The computed Otsu threshold value
+        tuple[float, torch.Tensor, torch.Tensor, list[float]]: A tuple containing:
+            - The Otsu threshold of the first image
             - The thresholded binary image as a tensor with shape (B, H, W, C)
+            - The thresholded binary mask as a tensor with shape (B, H, W)
+            - The Otsu threshold of every image
 
     Notes:
         - The input image is automatically converted to grayscale before thresholding
-        - The output binary image contains values of 0 and 255
-        - The threshold computation is performed using OpenCV's implementation
+        - Thresholds are on the 0-255 scale and pixels strictly above them are foreground
+        - The output binary image contains values of 0 and 255, the mask values of 0 and 1
+        - Histograms and thresholds are computed for the whole batch at once on the input's device
     """
 
     CLASS_ID = "otsu_threshold"
@@ -39,21 +41,52 @@ class OTSUThreshold:
             }
         }
 
-    RETURN_TYPES = ("FLOAT", "IMAGE")
+    RETURN_TYPES = ("FLOAT", "IMAGE", "MASK", "FLOAT")
+    RETURN_NAMES = ("threshold", "image", "mask", "thresholds")
+    OUTPUT_IS_LIST = (False, False, False, True)
     FUNCTION = "execute"
 
-    def execute(self, image: torch.Tensor) -> tuple[float, torch.Tensor]:
-        img_transformed = v2.Compose(
+    @staticmethod
+    def otsu_thresholds(gray: torch.Tensor) -> torch.Tensor:
+        """Computes the Otsu threshold of each image of a uint8 batch.
+
+        Args:
+            gray (torch.Tensor): Grayscale images of shape (B, H, W) and dtype uint8.
+
+        Returns:
+            torch.Tensor: Thresholds of shape (B,), as int64. Images with a single intensity get 0.
+        """
+        batch = gray.shape[0]
+        offsets = torch.arange(batch, device=gray.device)[:, None] * 256
+        bins = (gray.reshape(batch, -1).long() + offsets).flatten()
+        # float64 keeps near-equal variances apart on large images, MPS only has float32
+        dtype = torch.float32 if gray.device.type == "mps" else torch.float64
+        histogram = torch.bincount(bins, minlength=batch * 256).view(batch, 256).to(dtype)
+        probability = histogram / histogram.sum(dim=1, keepdim=True)
+
+        levels = torch.arange(256, device=gray.device, dtype=dtype)
+        background_weight = probability.cumsum(dim=1)
+        background_mean = (probability * levels).cumsum(dim=1)
+        total_mean = background_mean[:, -1:]
+        # Between-class variance of splitting after each level, undefined when one class is empty
+        foreground_weight = 1.0 - background_weight
+        variance = (total_mean * background_weight - background_mean) ** 2 / (background_weight * foreground_weight)
+        valid = (background_weight > 1e-12) & (foreground_weight > 1e-12)
+        variance = torch.where(valid, variance, torch.full_like(variance, -1.0))
+        return variance.argmax(dim=1).clamp(min=0)
+
+    def execute(self, image: torch.Tensor) -> tuple[float, torch.Tensor, torch.Tensor, list[float]]:
+        gray = v2.Compose(
             [
                 ops.Permute(dims=[0, 3, 1, 2]),
                 v2.Grayscale(),
                 v2.ToDtype(torch.uint8, scale=True),
             ]
-        )(image)
-        img_np = img_transformed.squeeze().cpu().numpy()
+        )(image)[:, 0]
 
-        thresh, out = cv.threshold(img_np, 0, 255, cv.THRESH_BINARY + cv.THRESH_OTSU)
+        thresholds = self.otsu_thresholds(gray)
+        foreground = gray > thresholds.to(gray.dtype)[:, None, None]
 
-        out_torch = torch.from_numpy(out).to(image.device).unsqueeze(0).unsqueeze(0)
-        out_transformed = v2.Compose([v2.RGB(), ops.Permute(dims=[0, 2, 3, 1])])(out_torch)
-        return (thresh, out_transformed)
+        out_image = (foreground.to(torch.uint8) * 255).unsqueeze(-1).expand(-1, -1, -1, 3)
+        thresholds_list = [float(value) for value in thresholds.tolist()]
+        return (thresholds_list[0], out_image, foreground.float(), thresholds_list)
@@ -0,0 +1,170 @@
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+
+MB = 1024 * 1024
+
+# Parts are uploaded concurrently and each one is held in memory while in flight (16MB x 10). The client pool
+# holds one connection per concurrent part plus headroom for the listing calls of other requests.
+MULTIPART_CHUNK_SIZE = 16 * MB
+MAX_CONCURRENCY = 10
+MAX_POOL_CONNECTIONS = 32
+
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=MULTIPART_CHUNK_SIZE,
+    multipart_chunksize=MULTIPART_CHUNK_SIZE,
+    max_concurrency=MAX_CONCURRENCY,
+    use_threads=True,
+)
+
+
+@lru_cache(maxsize=1)
+def get_s3_client():
+    """Returns the process-wide S3 client.
+
+    boto3 clients are thread safe, so one client with a connection pool sized for parallel part uploads is
+    shared by every request instead of creating a client (and its connections) per request.
+    """
+    return boto3.client(
+        "s3",
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        region_name=os.getenv("AWS_DEFAULT_REGION"),
+        config=Config(max_pool_connections=MAX_POOL_CONNECTIONS, retries={"max_attempts": 5, "mode": "adaptive"}),
+    )
+
+
+class ProgressReporter:
+    """Accumulates transferred bytes from upload threads and reports them at a bounded rate.
+
+    Args:
+        total_size (int): Total number of bytes to transfer.
+        report (Callable[[int, int], None]): Called with (transferred, total_size).
+        interval (float): Minimum number of seconds between two reports.
+    """
+
+    def __init__(self, total_size: int, report: Callable[[int, int], None], interval: float = 0.5):
+        self.total_size = total_size
+        self.report = report
+        self.interval = interval
+        self.transferred = 0
+        self._last_report = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, bytes_amount: int) -> None:
+        with self._lock:
+            self.transferred += bytes_amount
+            now = time.monotonic()
+            if now - self._last_report < self.interval and self.transferred < self.total_size:
+                return
+            self._last_report = now
+            transferred = self.transferred
+        self.report(transferred, self.total_size)
+
+
+def _find_multipart_upload(s3_client, bucket: str, key: str) -> str | None:
+    """Returns the id of the most recent unfinished multipart upload of a key, if any."""
+    response = s3_client.list_multipart_uploads(Bucket=bucket, Prefix=key)
+    uploads = [upload for upload in response.get("Uploads", []) if upload["Key"] == key]
+    if not uploads:
+        return None
+    return max(uploads, key=lambda upload: upload["Initiated"])["UploadId"]
+
+
+def _list_parts(s3_client, bucket: str, key: str, upload_id: str) -> dict[int, dict]:
+    parts = {}
+    paginator = s3_client.get_paginator("list_parts")
+    for page in paginator.paginate(Bucket=bucket, Key=key, UploadId=upload_id):
+        for part in page.get("Parts", []):
+            parts[part["PartNumber"]] = {"ETag": part["ETag"], "Size": part["Size"]}
+    return parts
+
+
+def upload_file_resumable(
+    file_path: str,
+    bucket: str,
+    key: str,
+    progress: Callable[[int], None] | None = None,
+    s3_client=None,
+    part_size: int = MULTIPART_CHUNK_SIZE,
+    max_concurrency: int = MAX_CONCURRENCY,
+) -> bool:
+    """Uploads a file to S3 with parallel multipart parts, resuming an interrupted upload of the same key.
+
+    An unfinished multipart upload of the key is reused when its parts have the expected size, and only the
+    missing parts are sent. Keys are content addressed (checksum prefix), so parts of an earlier attempt belong
+    to the same file. Files smaller than one part are sent with a managed single upload.
+
+    Args:
+        file_path (str): Local file to upload.
+        bucket (str): Target bucket.
+        key (str): Target key.
+        progress (Callable[[int], None] | None): Called with the number of bytes sent since the last call.
+        s3_client: Client to use. Defaults to the shared client.
+        part_size (int): Size of each part in bytes.
+        max_concurrency (int): Number of parts uploaded in parallel.
+
+    Returns:
+        bool: True if an earlier upload was resumed.
+    """
+    s3_client = s3_client or get_s3_client()
+    file_size = os.path.getsize(file_path)
+    if file_size <= part_size:
+        s3_client.upload_file(file_path, bucket, key, Config=TRANSFER_CONFIG, Callback=progress)
+        return False
+
+    part_count = math.ceil(file_size / part_size)
+    expected_sizes = {
+        number: min(part_size, file_size - (number - 1) * part_size) for number in range(1, part_count + 1)
+    }
+
+    resumed = False
+    completed: dict[int, str] = {}
+    upload_id = _find_multipart_upload(s3_client, bucket, key)
+    if upload_id is not None:
+        existing = _list_parts(s3_client, bucket, key, upload_id)
+        if all(part["Size"] == expected_sizes.get(number) for number, part in existing.items()):
+            completed = {number: part["ETag"] for number, part in existing.items()}
+            resumed = True
+            logging.info(f"Resuming S3 upload {upload_id} of {key}: {len(completed)}/{part_count} parts present")
+        else:
+            logging.info(f"Discarding S3 upload {upload_id} of {key} with a different part layout")
+            s3_client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+            upload_id = None
+    if upload_id is None:
+        upload_id = s3_client.create_multipart_upload(Bucket=bucket, Key=key)["UploadId"]
+
+    if progress is not None and completed:
+        progress(sum(expected_sizes[number] for number in completed))
+
+    def upload_part(number: int) -> tuple[int, str]:
+        with open(file_path, "rb") as f:
+            f.seek((number - 1) * part_size)
+            body = f.read(expected_sizes[number])
+        response = s3_client.upload_part(Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=body)
+        if progress is not None:
+            progress(len(body))
+        return number, response["ETag"]
+
+    missing = [number for number in expected_sizes if number not in completed]
+    # Failed parts leave the multipart upload open so the next attempt resumes from them
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        for number, etag in executor.map(upload_part, missing):
+            completed[number] = etag
+
+    s3_client.complete_multipart_upload(
+        Bucket=bucket,
+        Key=key,
+        UploadId=upload_id,
+        MultipartUpload={"Parts": [{"PartNumber": number, "ETag": completed[number]} for number in sorted(completed)]},
+    )
+    return resumed
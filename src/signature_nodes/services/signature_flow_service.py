@@ -1,27 +1,147 @@
+import asyncio
 import imghdr
 import json
 import logging
 import os
 import sys
 import traceback
+import uuid
 
 import aiohttp
-from aiohttp import web
+from aiohttp import hdrs, web
 from signature_flows.manifests import WorkflowManifest
 from signature_flows.workflow import Workflow
 
 from ..shared import BASE_COMFY_DIR
+from .workflow_cache import WorkflowResultCache, model_folders_state, workflow_hash
 
 current_dir = os.getcwd()
 sys.path.append(BASE_COMFY_DIR)
+import folder_paths  # type: ignore # noqa: E402
 from server import PromptServer  # type: ignore # noqa: E402
 
 sys.path.append(current_dir)
 
 
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
 class SignatureFlowService:
+    workflow_cache = WorkflowResultCache()
+    _session: aiohttp.ClientSession | None = None
+
+    @classmethod
+    def get_session(cls) -> aiohttp.ClientSession:
+        """Returns the client session shared by all outgoing requests, so connections are pooled and reused."""
+        if cls._session is None or cls._session.closed:
+            connector = aiohttp.TCPConnector(limit=32, ttl_dns_cache=300)
+            cls._session = aiohttp.ClientSession(connector=connector)
+        return cls._session
+
+    @classmethod
+    async def close_session(cls, app=None):
+        if cls._session is not None and not cls._session.closed:
+            await cls._session.close()
+        cls._session = None
+
     @classmethod
     def setup_routes(cls):
+        if hasattr(PromptServer.instance, "app"):
+            PromptServer.instance.app.on_cleanup.append(cls.close_session)
+
+        def quote_parameter(value):
+            # Escaped like browsers do in multipart forms, a quote or line break would end the parameter
+            value = value.replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+            return f'"{value}"'
+
+        def multipart_header(boundary, name, filename=None, content_type=None):
+            disposition = f"form-data; name={quote_parameter(name)}"
+            if filename:
+                disposition += f"; filename={quote_parameter(filename)}"
+            header = f"--{boundary}\r\n{hdrs.CONTENT_DISPOSITION}: {disposition}\r\n"
+            if content_type:
+                header += f"{hdrs.CONTENT_TYPE}: {content_type}\r\n"
+            return (header + "\r\n").encode("utf-8")
+
+        async def fetch_cover_image(url):
+            logging.info(f"Processing coverImageUrl: {url}")
+            timeout = aiohttp.ClientTimeout(total=10)
+            async with cls.get_session().get(url, timeout=timeout) as response:
+                logging.info(f"Cover image fetch status: {response.status}")
+                if response.status != 200:
+                    logging.warning("Failed to fetch cover image")
+                    raise Exception(f"Failed to fetch image: {response.status}")
+                image_data = await response.read()
+            logging.info(f"Successfully fetched image data, size: {len(image_data)} bytes")
+            # Extract filename from URL
+            image_name = url.split("/")[-1]
+            image_format = imghdr.what(None, h=image_data)
+            logging.info(f"Image format: {image_format}, image name: {image_name}")
+            return image_name, image_format, image_data
+
+        async def stream_submission(form_data, boundary):
+            """Re-encodes the incoming multipart form as it is read, so file parts are never held in memory.
+
+            The cover image is fetched concurrently with reading the remaining parts and appended last. A failed
+            fetch raises before the closing chunk is sent, which aborts the upload and fails the submission.
+            """
+            cover_task = None
+            try:
+                async for part in form_data:
+                    if not isinstance(part, aiohttp.BodyPartReader) or part.name is None:
+                        continue
+
+                    field_name = part.name
+                    logging.info(f"Processing field: {field_name}")
+
+                    if part.filename:
+                        content_type = part.headers.get(hdrs.CONTENT_TYPE, "application/octet-stream")
+                        yield multipart_header(boundary, field_name, part.filename, content_type)
+                        while chunk := await part.read_chunk(STREAM_CHUNK_SIZE):
+                            yield chunk
+                        yield b"\r\n"
+                    else:
+                        content = await part.text()
+                        if field_name == "coverImageUrl":
+                            cover_task = asyncio.create_task(fetch_cover_image(content))
+                        else:
+                            yield multipart_header(boundary, field_name, content_type="text/plain; charset=utf-8")
+                            yield content.encode("utf-8") + b"\r\n"
+
+                if cover_task is not None:
+                    try:
+                        image_name, image_format, image_data = await cover_task
+                    except Exception as e:
+                        logging.error(f"Error processing coverImageUrl: {str(e)}")
+                        raise
+                    yield multipart_header(
+                        boundary, "coverImage", f"{image_name}.{image_format}", f"image/{image_format}"
+                    )
+                    yield image_data + b"\r\n"
+                    logging.info("Added coverImage to form data")
+
+                yield f"--{boundary}--\r\n".encode("utf-8")
+            finally:
+                if cover_task is not None and not cover_task.done():
+                    cover_task.cancel()
+
+        def build_manifest(workflow_data):
+            wf = Workflow(workflow_data)
+            manifest = WorkflowManifest(workflow=wf, comfy_dir=BASE_COMFY_DIR)
+            return manifest.get_json()
+
+        def build_workflow_data(workflow_data):
+            wf = Workflow(workflow_data)
+            return {
+                "workflow_api": wf.get_dict(),
+                "inputs": wf.get_inputs(),
+                "outputs": wf.get_outputs(),
+            }
+
+        @PromptServer.instance.routes.get("/flow/cache_stats")
+        async def cache_stats(request):
+            return web.json_response(cls.workflow_cache.stats(), status=200)
+
         @PromptServer.instance.routes.post("/flow/create_manifest")
         async def create_manifest(request):
             try:
@@ -29,11 +149,14 @@ class SignatureFlowService:
                 workflow_data = json_data.get("workflow")
                 if not workflow_data:
                     return web.json_response(text="No workflow data provided", status=400)
+                # The manifest resolves the workflow's models on disk, so it is only reused while the model
+                # files are unchanged. Walking the model folders is blocking I/O, so it runs off the event loop
+                folders_state = await asyncio.to_thread(model_folders_state, folder_paths.folder_names_and_paths)
+                key = ("manifest", workflow_hash(workflow_data), folders_state)
                 if isinstance(workflow_data, dict):
                     workflow_data = json.dumps(workflow_data)
-                wf = Workflow(workflow_data)
-                manifest = WorkflowManifest(workflow=wf, comfy_dir=BASE_COMFY_DIR)
-                return web.json_response(manifest.get_json(), status=200)
+                manifest = await cls.workflow_cache.get_or_compute(key, lambda: build_manifest(workflow_data))
+                return web.json_response(manifest, status=200)
             except Exception as e:
                 error_msg = f"Error creating manifest: {str(e)}\n{traceback.format_exc()}"
                 logging.error(error_msg)
@@ -47,15 +170,11 @@ class SignatureFlowService:
                 if not workflow_data:
                     return web.json_response(text="No workflow data provided", status=400)
 
+                key = ("workflow_data", workflow_hash(workflow_data))
                 if isinstance(workflow_data, dict):
                     workflow_data = json.dumps(workflow_data)
 
-                wf = Workflow(workflow_data)
-                io = {
-                    "workflow_api": wf.get_dict(),
-                    "inputs": wf.get_inputs(),
-                    "outputs": wf.get_outputs(),
-                }
+                io = await cls.workflow_cache.get_or_compute(key, lambda: build_workflow_data(workflow_data))
                 return web.json_response(io, status=200)
             except Exception as e:
                 error_msg = f"Error creating manifest: {str(e)}\n{traceback.format_exc()}"
@@ -75,68 +194,23 @@ class SignatureFlowService:
                 auth = f"Basic {jenkins_auth}"
 
                 form_data = await request.multipart()
-                new_form_data = aiohttp.FormData()
+                boundary = uuid.uuid4().hex
 
-                logging.info("Starting to process form data")
-                async for part in form_data:
-                    if not isinstance(part, aiohttp.BodyPartReader) or part.name is None:
-                        continue
-
-                    field_name = part.name
-                    logging.info(f"Processing field: {field_name}")
-
-                    if part.filename:
-                        content = await part.read()
-                        new_form_data.add_field(field_name, content, filename=part.filename)
-                    else:
-                        content = await part.text()
-                        if field_name == "coverImageUrl":
-                            logging.info(f"Processing coverImageUrl: {content}")
-                            try:
-                                async with aiohttp.ClientSession() as session:
-                                    timeout = aiohttp.ClientTimeout(total=10)
-                                    async with session.get(content, timeout=timeout) as response:
-                                        logging.info(f"Cover image fetch status: {response.status}")
-                                        if response.status == 200:
-                                            image_data = await response.read()
-                                            logging.info(
-                                                f"Successfully fetched image data, size: {len(image_data)} bytes"
-                                            )
-                                            # Extract filename from URL
-                                            image_name = content.split("/")[-1]
-                                            # Add logging for image details
-                                            image_format = imghdr.what(None, h=image_data)
-                                            logging.info(f"Image format: {image_format}")
-                                            logging.info(f"Image name: {image_name}")
-                                            new_form_data.add_field(
-                                                name="coverImage",
-                                                value=image_data,
-                                                content_type=f"image/{image_format}",
-                                                filename=f"{image_name}.{image_format}",  # Add filename to form data
-                                            )
-                                            logging.info("Added coverImage to form data")
-                                        else:
-                                            logging.warning("Failed to fetch cover image")
-                                            raise Exception(f"Failed to fetch image: {response.status}")
-                            except Exception as e:
-                                logging.error(f"Error processing coverImageUrl: {str(e)}")
-                                raise
-                        else:
-                            new_form_data.add_field(field_name, content)
-
-                # Log the final form data fields
-                logging.info("Final form data fields:")
-
-                async with aiohttp.ClientSession() as session:
-                    headers = {"Authorization": auth}
-                    async with session.post(jenkins_url, data=new_form_data, headers=headers) as resp:
-                        if resp.status != 201:
-                            logging.error(
-                                "Workflow submission failed with status: %d",
-                                resp.status,
-                            )
-                            return web.json_response(text="Workflow submission failed", status=502)
-                        return web.json_response(text="Workflow submitted successfully", status=200)
+                logging.info("Starting to stream form data")
+                headers = {
+                    "Authorization": auth,
+                    hdrs.CONTENT_TYPE: f"multipart/form-data; boundary={boundary}",
+                }
+                async with cls.get_session().post(
+                    jenkins_url, data=stream_submission(form_data, boundary), headers=headers
+                ) as resp:
+                    if resp.status != 201:
+                        logging.error(
+                            "Workflow submission failed with status: %d",
+                            resp.status,
+                        )
+                        return web.json_response(text="Workflow submission failed", status=502)
+                    return web.json_response(text="Workflow submitted successfully", status=200)
 
             except Exception as e:
                 base_error_msg = "Error while submitting workflow"
@@ -1,14 +1,19 @@
+import asyncio
+import hashlib
 import logging
 import os
+import shutil
 import sys
+import tempfile
 import traceback
 
-import boto3
 from aiohttp import web
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 
+from ..model_registry import model_registry
 from ..shared import BASE_COMFY_DIR
+from .s3_transfer import ProgressReporter, get_s3_client, upload_file_resumable
 
 sys.path.append(BASE_COMFY_DIR)
 import folder_paths  # type: ignore # noqa: E402
@@ -26,18 +31,22 @@ class SignatureModelService:
     def setup_routes(cls):
         # Configure maximum upload size (10GB) - Still relevant for local uploads
         MAX_UPLOAD_SIZE = 10 * 1024 * 1024 * 1024  # 10GB in bytes
+        UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # 8MB read from the request per step
 
         # Update the server's maximum client size
         if hasattr(PromptServer.instance, "app"):
             PromptServer.instance.app._client_max_size = MAX_UPLOAD_SIZE
 
-        def get_s3_client():
-            # Consider memoization or a shared client instance if performance is critical
-            return boto3.client(
-                "s3",
-                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-                region_name=os.getenv("AWS_DEFAULT_REGION"),
+        def send_upload_progress(client_id, filename, checksum, transferred, total_size):
+            PromptServer.instance.send_sync(
+                "signature.s3_upload_progress",
+                {
+                    "name": filename,
+                    "checksum": checksum,
+                    "transferred": transferred,
+                    "total": total_size,
+                },
+                client_id,
             )
 
         # Updated validation for S3 path-based upload
@@ -56,14 +65,14 @@ class SignatureModelService:
                 raise FileNotFoundError(f"Model file not found at path: {model_path}")
 
         # Validation for local file upload (multipart)
-        def validate_local_upload_parts(file_part, model_type, filename, file_data):
+        def validate_local_upload_parts(file_part, model_type, filename, file_size):
             if not file_part:
                 raise ValueError("No file part received")
             if not model_type:
                 raise ValueError("No type part received")
             if not filename:
                 raise ValueError("No filename provided")
-            if not file_data:
+            if not file_size:
                 raise ValueError("No file data received")
 
         def validate_model_directory(model_type):
@@ -84,27 +93,53 @@ class SignatureModelService:
 
             return model_dir
 
-        def write_file_data(filepath, file_data):
-            logging.info("Starting to write file data...")
-            total_size = len(file_data)
-            logging.info(f"Writing {total_size / (1024 * 1024):.2f} MB of data")
+        def write_chunk(f, digest, chunk):
+            f.write(chunk)
+            digest.update(chunk)
 
-            with open(filepath, "wb") as f:
-                f.write(file_data)
-                f.flush()
-                os.fsync(f.fileno())
+        async def stream_file_part(part, target_dir):
+            """Streams a multipart file part to a temporary file, hashing it on the way.
 
-            # Verify file was written correctly
-            actual_size = os.path.getsize(filepath)
-            logging.info(f"File write complete. Expected size: {total_size}, Actual size: {actual_size}")
-
-            if actual_size == 0:
-                raise ValueError("File was created but contains no data")
+            Only one chunk is held in memory at a time. The temporary file is removed if the upload fails or
+            the client disconnects.
+            """
+            fd, tmp_path = tempfile.mkstemp(dir=target_dir, prefix=".upload-", suffix=".part")
+            digest = hashlib.sha256()
+            total_size = 0
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    while chunk := await part.read_chunk(UPLOAD_CHUNK_SIZE):
+                        total_size += len(chunk)
+                        if total_size > MAX_UPLOAD_SIZE:
+                            raise ValueError("File size exceeds maximum allowed size")
+                        await asyncio.to_thread(write_chunk, f, digest, chunk)
+                    await asyncio.to_thread(os.fsync, f.fileno())
+            except BaseException:
+                remove_partial_file(tmp_path)
+                raise
+
+            logging.info(f"Received {total_size / (1024 * 1024):.2f} MB, sha256 {digest.hexdigest()}")
+            return tmp_path, total_size, digest.hexdigest()
+
+        def remove_partial_file(path):
+            if path and os.path.exists(path):
+                try:
+                    os.remove(path)
+                    logging.info(f"Cleaned up partial local file: {path}")
+                except Exception as cleanup_error:
+                    logging.error(f"Error cleaning up partial local file: {str(cleanup_error)}")
 
+        def finalize_file(tmp_path, filepath, total_size):
+            actual_size = os.path.getsize(tmp_path)
+            logging.info(f"File write complete. Expected size: {total_size}, Actual size: {actual_size}")
             if actual_size != total_size:
                 raise ValueError(f"File size mismatch. Expected: {total_size}, Got: {actual_size}")
 
-            return total_size
+            if os.path.dirname(tmp_path) == os.path.dirname(filepath):
+                os.replace(tmp_path, filepath)
+            else:
+                # The file arrived before its type, so it was buffered outside the model directory
+                shutil.move(tmp_path, filepath)
 
         @PromptServer.instance.routes.post("/upload/s3-model")
         async def upload_s3_model(request):
@@ -115,6 +150,7 @@ class SignatureModelService:
                 checksum = data.get("checksum")
                 filename = data.get("filename")
                 model_type = data.get("type")
+                client_id = data.get("client_id")
 
                 logging.info(
                     f"Processing S3 path upload request: path={model_path}, checksum={checksum}, filename={filename}"
@@ -133,12 +169,11 @@ class SignatureModelService:
 
                 # --- Check S3 before upload ---
                 try:
-                    list_response = s3_client.list_objects_v2(Bucket=s3_bucket, Prefix=s3_key_prefix, MaxKeys=5)
+                    list_response = await asyncio.to_thread(
+                        s3_client.list_objects_v2, Bucket=s3_bucket, Prefix=s3_key_prefix, MaxKeys=5
+                    )
                     objects_found = list_response.get("Contents", [])
 
-                    print("objects_found", objects_found)
-                    print("s3_key_prefix", s3_key_prefix)
-
                     if objects_found:
                         exact_match_found = False
                         found_key = ""
@@ -196,9 +231,17 @@ class SignatureModelService:
                 # --- Proceed with Upload (Only if Scenario 3) ---
                 logging.info(f"Uploading to S3: {s3_bucket}/{target_s3_key} from local path: {model_path}")
                 try:
-                    with open(model_path, "rb") as f:
-                        s3_client.upload_fileobj(f, s3_bucket, target_s3_key)
-                    logging.info("S3 upload successful")
+                    progress = ProgressReporter(
+                        os.path.getsize(model_path),
+                        lambda transferred, total: send_upload_progress(
+                            client_id, filename, checksum, transferred, total
+                        ),
+                    )
+                    # Run the transfer off the event loop so the server keeps serving while parts upload
+                    resumed = await asyncio.to_thread(
+                        upload_file_resumable, model_path, s3_bucket, target_s3_key, progress, s3_client
+                    )
+                    logging.info(f"S3 upload successful{' (resumed)' if resumed else ''}")
 
                     return web.json_response(
                         {
@@ -237,6 +280,7 @@ class SignatureModelService:
 
         @PromptServer.instance.routes.post("/upload/local-model")
         async def upload_local_model(request):
+            tmp_path = None
             try:
                 # This route still handles direct file uploads via multipart
                 request._client_max_size = MAX_UPLOAD_SIZE
@@ -247,31 +291,38 @@ class SignatureModelService:
                 file_part = None
                 model_type = None
                 filename = None
-                file_data = None
+                total_size = 0
+                checksum = None
 
                 async for part in reader:
                     if part.name == "file":
+                        if file_part is not None:
+                            raise ValueError("Only one file can be uploaded per request")
                         file_part = part
                         filename = part.filename
-                        file_data = await file_part.read()
+                        # Stream into the model directory when the type is already known so the final
+                        # rename is atomic, otherwise into the temp directory
+                        target_dir = validate_model_directory(model_type) if model_type else None
+                        tmp_path, total_size, checksum = await stream_file_part(part, target_dir)
                     elif part.name == "type":
                         model_type = await part.text()
                     else:
-                        await part.read()
+                        await part.release()
 
                 # Use the original validation for local uploads
-                validate_local_upload_parts(file_part, model_type, filename, file_data)
+                validate_local_upload_parts(file_part, model_type, filename, total_size)
 
                 logging.info(f"Processing local upload - Type: {model_type}, File: {filename}")
 
                 model_dir = validate_model_directory(model_type)
                 if not isinstance(model_dir, str) or not isinstance(filename, str):
                     raise ValueError("Invalid model directory or filename type")
-                filepath = os.path.join(model_dir, filename)
+                filepath = os.path.join(model_dir, os.path.basename(filename))
                 logging.info(f"Target filepath: {filepath}")
 
                 try:
-                    total_size = write_file_data(filepath, file_data)
+                    await asyncio.to_thread(finalize_file, tmp_path, filepath, total_size)
+                    tmp_path = None
                     logging.info(f"Model uploaded locally successfully to {filepath}")
                     return web.json_response(
                         {
@@ -280,17 +331,12 @@ class SignatureModelService:
                             "type": model_type,
                             "path": filepath,
                             "size": total_size,
+                            "checksum": checksum,
                         }
                     )
                 except Exception as e:
                     logging.error(f"Error while writing local file: {str(e)}")
                     logging.error(traceback.format_exc())
-                    if os.path.exists(filepath):
-                        try:
-                            os.remove(filepath)
-                            logging.info(f"Cleaned up partial local file: {filepath}")
-                        except Exception as cleanup_error:
-                            logging.error(f"Error cleaning up partial local file: {str(cleanup_error)}")
                     raise
 
             except ValueError as e:
@@ -304,6 +350,12 @@ class SignatureModelService:
                 logging.error(f"Error uploading local model: {error_msg}")
                 logging.error(traceback.format_exc())
                 return web.Response(status=500, text=f"Error uploading local model: {error_msg}")
+            finally:
+                remove_partial_file(tmp_path)
+
+        @PromptServer.instance.routes.get("/models/registry_stats")
+        async def model_registry_stats(request):
+            return web.json_response(model_registry.stats(), status=200)
 
         def setup_routes(cls):
             cls.upload_local_model()
@@ -0,0 +1,128 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Callable
+
+
+def workflow_hash(workflow_data: dict | str) -> str:
+    """Returns a hash of the workflow that does not depend on key order or whitespace."""
+    if isinstance(workflow_data, str):
+        try:
+            workflow_data = json.loads(workflow_data)
+        except ValueError:
+            return hashlib.sha256(workflow_data.encode("utf-8")).hexdigest()
+    canonical = json.dumps(workflow_data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+EXCLUDED_DIR_NAMES = {".git", "__pycache__", "node_modules"}
+
+
+def model_folders_state(folder_names_and_paths: dict) -> str:
+    """Returns a digest of the path, size and modification time of every model file in the model directories.
+
+    Only folder types with registered file extensions are walked, which leaves out custom_nodes, and only files
+    with those extensions are listed, like ComfyUI's own model lists. Subdirectories are included and files
+    replaced in place change their size or mtime, so any change that can alter a manifest built from the same
+    workflow changes the digest. Symlinked directories are followed once, so link loops end the walk.
+    """
+    digest = hashlib.sha256()
+    for name in sorted(folder_names_and_paths):
+        paths, extensions = folder_names_and_paths[name][0], folder_names_and_paths[name][1]
+        if not extensions:
+            continue
+        suffixes = tuple(extension.lower() for extension in extensions)
+        for root_path in paths:
+            digest.update(f"{name}\0{root_path}\n".encode("utf-8", "surrogateescape"))
+            visited = set()
+            for directory, subdirectories, files in os.walk(root_path, followlinks=True):
+                try:
+                    stat = os.stat(directory)
+                except OSError:
+                    subdirectories.clear()
+                    continue
+                if (stat.st_dev, stat.st_ino) in visited:
+                    subdirectories.clear()
+                    continue
+                visited.add((stat.st_dev, stat.st_ino))
+                subdirectories[:] = sorted(d for d in subdirectories if d not in EXCLUDED_DIR_NAMES)
+                for filename in sorted(files):
+                    if not filename.lower().endswith(suffixes):
+                        continue
+                    path = os.path.join(directory, filename)
+                    try:
+                        stat = os.stat(path)
+                        entry = f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\n"
+                    except OSError:
+                        entry = f"{path}\0missing\n"
+                    digest.update(entry.encode("utf-8", "surrogateescape"))
+    return digest.hexdigest()
+
+
+class WorkflowResultCache:
+    """LRU cache of results computed from workflows, with coalescing of identical concurrent requests.
+
+    The first request for a key computes the result in a worker thread; identical requests arriving meanwhile
+    await the same computation instead of starting their own. Failed computations are not cached.
+
+    Args:
+        max_entries (int): Maximum number of results kept.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, Any] = OrderedDict()
+        self._in_flight: dict[tuple, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_compute(self, key: tuple, compute: Callable[[], Any]) -> Any:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(in_flight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await asyncio.to_thread(compute)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting for it
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+        future.set_result(result)
+        self._entries[key] = result
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            logging.debug(f"Evicted workflow cache entry {evicted}")
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,211 @@
+import logging
+import math
+from typing import Callable
+
+import torch
+
+from .env import env
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Optional inputs of the model nodes that can run tiled. tile_size 0 picks the largest tile that fits the memory budget.
+TILING_INPUTS = {
+    "tiled": ("BOOLEAN", {"default": False}),
+    "tile_size": ("INT", {"default": 0, "min": 0, "max": 8192, "step": 64}),
+    "tile_overlap": ("INT", {"default": 32, "min": 0, "max": 512, "step": 8}),
+    "tile_batch_size": ("INT", {"default": 1, "min": 1, "max": 64}),
+}
+
+
+def tile_starts(length: int, tile: int, overlap: int) -> list[int]:
+    """Returns the start offsets of tiles covering length, the last tile being aligned with the end."""
+    if length <= tile:
+        return [0]
+    stride = max(tile - overlap, 1)
+    starts = list(range(0, length - tile, stride))
+    starts.append(length - tile)
+    return starts
+
+
+def blend_window(height: int, width: int, overlap_y: int, overlap_x: int, device=None) -> torch.Tensor:
+    """Returns a (1, 1, height, width) weight window that ramps linearly over the overlap on every side.
+
+    Weights never reach zero, so pixels covered by a single tile (the image borders) keep their value after
+    normalisation, while overlapping tiles cross-fade.
+    """
+
+    def ramp(length: int, overlap: int) -> torch.Tensor:
+        position = torch.arange(length, dtype=torch.float32, device=device) + 0.5
+        if overlap <= 0:
+            return torch.ones(length, dtype=torch.float32, device=device)
+        return torch.minimum(position, length - position).div(overlap).clamp(max=1.0)
+
+    return (ramp(height, overlap_y)[:, None] * ramp(width, overlap_x)[None, :])[None, None]
+
+
+def tile_size_for_budget(
+    memory_budget: int,
+    channels: int,
+    element_size: int = 4,
+    scale: float = 1.0,
+    batch_size: int = 1,
+    activation_factor: float = 384.0,
+    min_tile_size: int = 128,
+    max_tile_size: int = 4096,
+    multiple: int = 64,
+) -> int:
+    """Returns the largest square tile whose estimated peak memory fits the budget.
+
+    The estimate follows ComfyUI's rule of thumb for image models: activations take about activation_factor times
+    the size of the output tile.
+
+    Args:
+        memory_budget (int): Bytes available for one micro-batch of tiles.
+        channels (int): Number of input channels.
+        element_size (int): Bytes per element.
+        scale (float): Output to input size ratio of the model.
+        batch_size (int): Number of tiles processed together.
+        activation_factor (float): Peak memory per output element, in elements.
+        min_tile_size (int): Smallest tile returned.
+        max_tile_size (int): Largest tile returned.
+        multiple (int): Tile sizes are rounded down to a multiple of this.
+
+    Returns:
+        int: Tile size in pixels.
+    """
+    per_pixel = channels * element_size * max(scale, 1.0) ** 2 * activation_factor * batch_size
+    tile = int(math.sqrt(max(memory_budget, 0) / per_pixel)) // multiple * multiple
+    return max(min(tile, max_tile_size), min_tile_size)
+
+
+def tiling_memory_budget(device: torch.device | None = None) -> int:
+    """Returns the memory available for tiles: the configured TILE_MEMORY_BUDGET_MB, limited by the free memory of
+    the device as reported by ComfyUI."""
+    budget = int(env.get("TILE_MEMORY_BUDGET_MB")) * MB
+    try:
+        import comfy.model_management  # type: ignore
+
+        free_memory = comfy.model_management.get_free_memory(device)
+        return min(budget, int(free_memory)) if free_memory else budget
+    except ImportError:
+        return budget
+
+
+class TiledExecutor:
+    """Runs an image-to-image function over overlapping tiles and stitches the outputs with weighted blending.
+
+    Tiles are grouped into micro-batches, moved to the execution device one micro-batch at a time and written
+    into an output buffer on the input's device, so peak memory is bounded by the tile size rather than the image
+    size. The output scale and channel count are taken from the function's first output. On out-of-memory errors
+    the tile size is halved until min_tile_size.
+
+    Args:
+        tile_size (int): Tile size in input pixels. 0 picks the largest tile that fits the memory budget.
+        overlap (int): Overlap between neighbouring tiles in input pixels.
+        batch_size (int): Number of tiles passed to the function at once.
+        device (torch.device | None): Device the function runs on. Defaults to the input's device.
+        memory_budget (int | None): Bytes available per micro-batch when tile_size is 0. Defaults to
+            tiling_memory_budget(device).
+        min_tile_size (int): Smallest tile size tried after out-of-memory errors.
+        progress (Callable[[int, int], None] | None): Called with (done, total) tile counts.
+    """
+
+    def __init__(
+        self,
+        tile_size: int = 512,
+        overlap: int = 32,
+        batch_size: int = 1,
+        device: torch.device | None = None,
+        memory_budget: int | None = None,
+        min_tile_size: int = 128,
+        progress: Callable[[int, int], None] | None = None,
+    ):
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.batch_size = max(batch_size, 1)
+        self.device = device
+        self.memory_budget = memory_budget
+        self.min_tile_size = min_tile_size
+        self.progress = progress
+
+    def resolve_tile_size(self, image: torch.Tensor, scale: float = 1.0) -> int:
+        if self.tile_size > 0:
+            return self.tile_size
+        memory_budget = self.memory_budget
+        if memory_budget is None:
+            memory_budget = tiling_memory_budget(self.device or image.device)
+        return tile_size_for_budget(
+            memory_budget,
+            channels=image.shape[1],
+            element_size=image.element_size(),
+            scale=scale,
+            batch_size=self.batch_size,
+            min_tile_size=self.min_tile_size,
+        )
+
+    def __call__(self, function: Callable[[torch.Tensor], torch.Tensor], image: torch.Tensor, scale: float = 1.0):
+        """Applies function to image tile by tile.
+
+        Args:
+            function (Callable[[torch.Tensor], torch.Tensor]): Maps a (N, C, h, w) batch of tiles to
+                (N, C_out, h * s, w * s) for a fixed integer scale s.
+            image (torch.Tensor): Input in BCHW format.
+            scale (float): Expected scale of the function, only used to pick the tile size.
+
+        Returns:
+            torch.Tensor: Output in BCHW format on the input's device.
+        """
+        tile = self.resolve_tile_size(image, scale)
+        while True:
+            try:
+                return self._run(function, image, tile)
+            except torch.cuda.OutOfMemoryError:
+                if tile // 2 < self.min_tile_size:
+                    raise
+                tile //= 2
+                logger.warning(f"Out of memory while tiling, retrying with {tile}px tiles")
+                if torch.cuda.is_available():
+                    torch.cuda.empty_cache()
+
+    def _run(self, function: Callable[[torch.Tensor], torch.Tensor], image: torch.Tensor, tile: int) -> torch.Tensor:
+        batch, _, height, width = image.shape
+        tile_h, tile_w = min(tile, height), min(tile, width)
+        overlap = min(self.overlap, tile_h // 2, tile_w // 2)
+        positions = [(y, x) for y in tile_starts(height, tile_h, overlap) for x in tile_starts(width, tile_w, overlap)]
+        device = self.device or image.device
+        total = batch * len(positions)
+
+        output = weights = window = None
+        out_h = out_w = 0
+        done = 0
+        for index in range(batch):
+            for start in range(0, len(positions), self.batch_size):
+                group = positions[start : start + self.batch_size]
+                tiles = torch.cat([image[index : index + 1, :, y : y + tile_h, x : x + tile_w] for y, x in group])
+                result = function(tiles.to(device))
+
+                if output is None:
+                    out_h, out_w = result.shape[-2:]
+                    output = torch.zeros(
+                        (batch, result.shape[1], round(height * out_h / tile_h), round(width * out_w / tile_w)),
+                        dtype=result.dtype,
+                        device=image.device,
+                    )
+                    weights = torch.zeros((1, 1, *output.shape[-2:]), dtype=result.dtype, device=image.device)
+                    overlap_y, overlap_x = round(overlap * out_h / tile_h), round(overlap * out_w / tile_w)
+                    window = blend_window(out_h, out_w, overlap_y, overlap_x, device=image.device).to(result.dtype)
+
+                result = result.to(image.device)
+                for (y, x), tile_result in zip(group, result):
+                    out_y, out_x = round(y * out_h / tile_h), round(x * out_w / tile_w)
+                    output[index, :, out_y : out_y + out_h, out_x : out_x + out_w] += tile_result * window[0]
+                    if index == 0:
+                        weights[..., out_y : out_y + out_h, out_x : out_x + out_w] += window
+
+                done += len(group)
+                if self.progress is not None:
+                    self.progress(done, total)
+
+        return output / weights
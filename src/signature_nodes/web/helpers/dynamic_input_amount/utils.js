@@ -1,8 +1,18 @@
 import { app } from "../../../../scripts/app.js";
 
-const extNames = ["signature.batch_builder", "signature.list_builder", "signature.math_operator"];
-
-const classNames = ["signature_list_builder", "signature_batch_builder", "signature_math_operator"];
+const extNames = [
+  "signature.batch_builder",
+  "signature.list_builder",
+  "signature.math_operator",
+  "signature.mask_expression",
+];
+
+const classNames = [
+  "signature_list_builder",
+  "signature_batch_builder",
+  "signature_math_operator",
+  "signature_mask_expression",
+];
 
 const updateTypesBasedOnConnection = (node) => {
   // Find if there's at least one connected input among visible and hidden inputs
@@ -16,8 +26,8 @@ const updateTypesBasedOnConnection = (node) => {
       app.graph.links[connectedInput.link].origin_slot
     ].type;
   }
-  // prevent math operator node from updating types on inputs
-  if (node.comfyClass === "signature_math_operator") {
+  // prevent math operator and mask expression nodes from updating types on inputs
+  if (node.comfyClass === "signature_math_operator" || node.comfyClass === "signature_mask_expression") {
     return;
   }
   // Update all inputs (visible and hidden) with the same type and name
@@ -184,11 +184,11 @@ const uploadButton = $el("button", {
       uploadButton.style.opacity = "0.7";
       uploadButton.style.cursor = "not-allowed";
 
-      // Create FormData
+      // Create FormData. The type goes first so the server can stream the file straight into the model folder
       const formData = new FormData();
-      formData.append("file", file);
       formData.append("type", modelType);
       formData.append("overwrite", "true");
+      formData.append("file", file);
 
       try {
         const response = await fetch("/upload/local-model", {
@@ -5,6 +5,7 @@ import {
   checkUnlinkedNodes,
   findNodesWithRandomizedControlAfterGenerateWidget,
 } from "../../../quality_checks/main.js";
+import { api } from "../../../../../scripts/api.js";
 import { getManifest, getWorkflowById } from "../../../signature_api/main.js";
 import { getLoadingSpinner, showMessage } from "../utils.js";
 import { showForm } from "./style.js";
@@ -120,6 +121,7 @@ const uploadModelToS3 = async (modelName, modelData) => {
     formData.append("checksum", modelData.checksum);
     formData.append("filename", modelName); // Also send the original filename
     formData.append("type", "model"); // Keep type if needed by backend logic
+    formData.append("client_id", api.clientId); // Progress events are sent to this client only
 
     console.log(`Uploading model: ${modelName} from path: ${modelData.path} with checksum: ${modelData.checksum}`);
 
@@ -159,6 +161,11 @@ const uploadModelToS3 = async (modelName, modelData) => {
   }
 };
 
+api.addEventListener("signature.s3_upload_progress", ({ detail }) => {
+  const percent = detail.total ? Math.round((detail.transferred / detail.total) * 100) : 100;
+  console.log(`Uploading model ${detail.name} to S3: ${percent}%`);
+});
+
 const uploadModelsToS3 = async (models) => {
   const uploadResults = [];
   for (const [modelName, modelData] of Object.entries(models)) {
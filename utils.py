@@ -1,14 +1,209 @@
 import concurrent.futures
+import itertools
 import logging
+import multiprocessing
 import os
+import threading
 import traceback
-from typing import Any, Callable
+from collections import deque
+from typing import Any, Callable, Iterable, Iterator
+
+ERROR_POLICIES = ("dict", "return", "raise")
+BACKENDS = ("thread", "process")
+
+_worker_local = threading.local()
+
+
+class ParallelTaskError(Exception):
+    """Error raised by the function of a parallel task, captured with the index of the item that failed.
+
+    Args:
+        index (int): Index of the item in the input.
+        message (str): The original exception message.
+        exc_type (str): Name of the original exception type.
+        traceback_str (str): Formatted traceback of the original exception.
+    """
+
+    def __init__(self, index: int, message: str, exc_type: str, traceback_str: str):
+        super().__init__(index, message, exc_type, traceback_str)
+        self.index = index
+        self.message = message
+        self.exc_type = exc_type
+        self.traceback = traceback_str
+
+    def __str__(self) -> str:
+        return f"Item {self.index} failed with {self.exc_type}: {self.message}"
+
+    def to_dict(self) -> dict:
+        return {"error": self.message, "traceback": self.traceback}
+
+
+def _init_thread_worker(counter: Iterator[int]) -> None:
+    _worker_local.worker_id = next(counter)
+
+
+def _init_process_worker(counter) -> None:
+    with counter.get_lock():
+        _worker_local.worker_id = counter.value
+        counter.value += 1
+
+
+def _run_chunk(
+    function: Callable[..., Any],
+    start: int,
+    chunk: list[Any],
+    kwargs: dict,
+    stop_on_error: bool,
+    stop_events: tuple[threading.Event, ...],
+) -> list[Any]:
+    """Runs the function on a chunk of items, returning fewer results than items if it was stopped early."""
+    worker_id = getattr(_worker_local, "worker_id", 0)
+    results = []
+    for offset, item in enumerate(chunk):
+        if any(event.is_set() for event in stop_events):
+            break
+        idx = start + offset
+        try:
+            results.append(function(item, idx, worker_id, **kwargs))
+        except Exception as e:
+            logging.info("[red]Error in worker %d processing item %d: %s", worker_id, idx, str(e))
+            results.append(ParallelTaskError(idx, str(e), type(e).__name__, traceback.format_exc()))
+            if stop_on_error:
+                if stop_events:
+                    stop_events[0].set()
+                break
+    return results
+
+
+def _chunked(items: Iterable[Any], chunk_size: int) -> Iterator[tuple[int, list[Any]]]:
+    iterator = iter(items)
+    start = 0
+    while chunk := list(itertools.islice(iterator, chunk_size)):
+        yield start, chunk
+        start += len(chunk)
+
+
+def parallel_imap(
+    function: Callable[..., Any],
+    items: Iterable[Any],
+    max_workers: int | None = None,
+    chunk_size: int = 1,
+    max_in_flight: int | None = None,
+    backend: str = "thread",
+    on_error: str = "dict",
+    cancel_event: threading.Event | None = None,
+    **kwargs,
+) -> Iterator[Any]:
+    """Lazily executes a function in parallel across items, yielding results in input order.
+
+    Items are grouped into chunks that idle workers pick up as they finish, so a slow item only delays its own
+    chunk. At most ``max_in_flight`` items are submitted or buffered at any time, which bounds memory for long
+    or lazily produced inputs.
+
+    Args:
+        function (Callable[..., Any]): Function to execute. Should accept (item, index, worker_id) as arguments.
+            With the process backend it must be picklable (defined at module level).
+        items (Iterable[Any]): Items to process. Consumed lazily.
+        max_workers (int | None): Maximum number of workers. If None, uses CPU count.
+        chunk_size (int): Number of items handed to a worker at once.
+        max_in_flight (int | None): Maximum number of items submitted but not yet yielded. Defaults to
+            twice the number of items the workers can hold.
+        backend (str): "thread" for I/O bound or GIL releasing work, "process" for CPU bound Python work.
+        on_error (str): What a failing item produces:
+            - "dict": a {"error": ..., "traceback": ...} dict in place of its result
+            - "return": a ParallelTaskError in place of its result
+            - "raise": pending work is cancelled and the ParallelTaskError is raised
+        cancel_event (threading.Event | None): When set, no further items are started and CancelledError is raised.
+            Thread workers check it before every item, process workers only between chunks.
+        **kwargs: Additional keyword arguments passed to the function.
+
+    Yields:
+        Any: The result of each item, in the same order as the input.
+
+    Raises:
+        ParallelTaskError: If an item fails and on_error is "raise".
+        concurrent.futures.CancelledError: If cancel_event is set before all items are processed.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend}, expected one of {BACKENDS}")
+    if on_error not in ERROR_POLICIES:
+        raise ValueError(f"Unknown error policy {on_error}, expected one of {ERROR_POLICIES}")
+
+    max_workers = max_workers or os.cpu_count() or 1
+    chunk_size = max(1, chunk_size)
+    max_in_flight = max_in_flight or max_workers * chunk_size * 2
+    max_chunks_in_flight = max(1, max_in_flight // chunk_size)
+
+    stop_event = threading.Event()
+    if backend == "thread":
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, initializer=_init_thread_worker, initargs=(itertools.count(),)
+        )
+        stop_events = (stop_event,) + ((cancel_event,) if cancel_event is not None else ())
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_init_process_worker, initargs=(multiprocessing.Value("i", 0),)
+        )
+        stop_events = ()
+
+    chunks = _chunked(items, chunk_size)
+    pending: deque[tuple[int, concurrent.futures.Future]] = deque()
+
+    def submit_next() -> bool:
+        if cancel_event is not None and cancel_event.is_set():
+            return False
+        next_chunk = next(chunks, None)
+        if next_chunk is None:
+            return False
+        start, chunk = next_chunk
+        future = executor.submit(_run_chunk, function, start, chunk, kwargs, on_error == "raise", stop_events)
+        pending.append((len(chunk), future))
+        return True
+
+    def first_pending_error() -> ParallelTaskError | None:
+        for _, future in pending:
+            for result in future.result():
+                if isinstance(result, ParallelTaskError):
+                    return result
+        return None
+
+    try:
+        while len(pending) < max_chunks_in_flight and submit_next():
+            pass
+
+        while pending:
+            expected, future = pending.popleft()
+            results = future.result()
+            for result in results:
+                if not isinstance(result, ParallelTaskError):
+                    yield result
+                elif on_error == "raise":
+                    stop_event.set()
+                    raise result
+                else:
+                    yield result if on_error == "return" else result.to_dict()
+
+            if len(results) < expected or (cancel_event is not None and cancel_event.is_set()):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise concurrent.futures.CancelledError("Parallel execution was cancelled")
+                # Stopped early because a later chunk failed
+                error = first_pending_error()
+                if error is not None:
+                    raise error
+            submit_next()
+    finally:
+        stop_event.set()
+        executor.shutdown(wait=True, cancel_futures=True)
 
 
 def parallel_for(
     function: Callable[..., Any],
     items: list[Any],
     max_workers: int | None = None,
+    chunk_size: int | None = None,
+    backend: str = "thread",
+    on_error: str = "dict",
+    cancel_event: threading.Event | None = None,
     **kwargs,
 ) -> list[Any]:
     """Execute a function in parallel across multiple items.
@@ -16,15 +211,20 @@ def parallel_for(
     Args:
         function (Callable[..., Any]): Function to execute. Should accept (item, index, worker_id) as arguments.
         items (list[Any]): List of items to process.
-        max_workers (int | None): Maximum number of worker threads. If None, uses CPU count.
+        max_workers (int | None): Maximum number of workers. If None, uses CPU count.
+        chunk_size (int | None): Number of items handed to a worker at once. If None, about four chunks per
+            worker are used.
+        backend (str): "thread" or "process". See parallel_imap.
+        on_error (str): "dict", "return" or "raise". See parallel_imap.
+        cancel_event (threading.Event | None): Stops processing when set. See parallel_imap.
         **kwargs: Additional keyword arguments passed to the function.
 
     Returns:
         list[Any]: List of results in the same order as input items.
 
     Note:
-        The function is executed in parallel using ThreadPoolExecutor. Each worker processes
-        a batch of items to reduce overhead. Results maintain the original order of items.
+        Chunks are scheduled dynamically: each worker takes the next chunk as soon as it finishes its current
+        one, so uneven item costs are balanced across workers. Results maintain the original order of items.
     """
     if not items:
         # log.info("No items to process, returning empty list")
@@ -40,65 +240,26 @@ def parallel_for(
         logging.info("No max_workers provided, using %d workers", max_workers)
 
     total_items = len(items)
-    results = [None] * total_items
-
     actual_workers = min(max_workers or 1, total_items)
+    if chunk_size is None:
+        chunk_size = max(1, total_items // (actual_workers * 4))
 
-    batches = []
-    items_per_worker = total_items // actual_workers
-    extra_items = total_items % actual_workers
+    logging.info("Starting processing with %d %s workers", actual_workers, backend)
+    logging.info("Total items: %d in chunks of %d", total_items, chunk_size)
 
-    start = 0
-    for worker_id in range(actual_workers):
-        batch_size = items_per_worker + (1 if worker_id < extra_items else 0)
-        if batch_size > 0:
-            end = start + batch_size
-            batches.append((worker_id, start, end))
-            start = end
-
-    def process_batch(worker_id: int, start_idx: int, end_idx: int) -> list[tuple]:
-        batch_results = []
-        batch_items = items[start_idx:end_idx]
-
-        for i, item in enumerate(batch_items):
-            actual_idx = start_idx + i
-            try:
-                result = function(item, actual_idx, worker_id, **kwargs)
-                batch_results.append((actual_idx, result))
-            except Exception as e:
-                logging.info(
-                    "[red]Error in worker %d processing item %d: %s",
-                    worker_id,
-                    actual_idx,
-                    str(e),
-                )
-                batch_results.append((actual_idx, {"error": str(e), "traceback": traceback.format_exc()}))
-        return batch_results
-
-    logging.info("Starting processing with %d workers", actual_workers)
-    logging.info("Total items: %d", total_items)
-    for worker_id, start, end in batches:
-        logging.info(
-            "Worker %d assigned items %d-%d (%d items)",
-            worker_id,
-            start,
-            end - 1,
-            end - start,
+    results = list(
+        parallel_imap(
+            function,
+            items,
+            max_workers=actual_workers,
+            chunk_size=chunk_size,
+            max_in_flight=total_items,
+            backend=backend,
+            on_error=on_error,
+            cancel_event=cancel_event,
+            **kwargs,
         )
-
-    with concurrent.futures.ThreadPoolExecutor(max_workers=actual_workers) as executor:
-        futures = []
-
-        for worker_id, start, end in batches:
-            futures.append(executor.submit(process_batch, worker_id, start, end))
-
-        for future in concurrent.futures.as_completed(futures):
-            try:
-                for idx, result in future.result():
-                    results[idx] = result
-            except Exception as e:
-                logging.info("[red]Error collecting results: %s", str(e))
-                raise
+    )
 
     logging.info("[green]All processing completed!")
     return results